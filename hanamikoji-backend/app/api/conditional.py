@@ -0,0 +1,29 @@
+"""條件式 GET - 以狀態版本作為 ETag，If-None-Match 相符時直接回 304，不需要序列化"""
+
+from fastapi import Request, Response
+
+# 要求瀏覽器每次都帶 If-None-Match 重新驗證
+CACHE_CONTROL = "no-cache"
+
+
+def make_etag(*parts) -> str:
+    return '"' + "-".join(str(part) for part in parts) + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match 是否包含此 ETag (弱比較，忽略 W/ 前綴)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
@@ -1,18 +1,26 @@
 """遊戲相關的API路由"""
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
 from sqlalchemy.orm import Session
 from typing import Dict, Any, Optional
 import uuid
 
+from app.api.conditional import etag_matches, make_etag, not_modified, set_etag
+from app.config.settings import settings
 from app.database.connection import get_db
+from app.domain.engine.validation import ActionValidationError
 from app.domain.factories.game_factory import GameInitializationService
 from app.schemas.game import (
     GameCreateRequest, 
     GameStateResponse, 
     ActionRequest,
-    GameStatusResponse
+    GameStatusResponse,
+    GameUpdateResponse,
+    HintRequest,
+    HintResponse,
+    WinProbabilityResponse
 )
+from app.services.analysis_service import AnalysisService, AnalysisTimeoutError
 from app.services.game_service import GameService
 
 router = APIRouter()
@@ -24,11 +32,15 @@ async def create_game(
     db: Session = Depends(get_db)
 ) -> Dict[str, Any]:
     """創建新遊戲"""
+    # 種子決定整副牌的順序，只開放除錯模式使用
+    if request.seed is not None and not settings.debug:
+        raise HTTPException(status_code=403, detail="只有除錯模式可以指定種子")
     try:
         game_service = GameService(db)
         game_data = game_service.create_game(
             request.player1_name, 
-            request.player2_name
+            request.player2_name,
+            seed=request.seed
         )
         
         return game_data
@@ -39,13 +51,22 @@ async def create_game(
 @router.get("/{game_id}", response_model=GameStateResponse)
 async def get_game_state(
     game_id: str,
+    request: Request,
+    response: Response,
     creator_token: Optional[str] = None,
     db: Session = Depends(get_db)
 ) -> Dict[str, Any]:
-    """獲取遊戲狀態"""
+    """獲取遊戲狀態 (If-None-Match 與目前版本相符時回 304)"""
+    game_service = GameService(db)
+    version = game_service.get_version(game_id)
+    if version is not None:
+        # 回應中的 player_assignment 依 creator_token 而不同，因此身份也是 ETag 的一部分
+        etag = make_etag(version, "creator" if game_service.is_creator(game_id, creator_token) else "joiner")
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
     try:
         print(f"🔍 API接收到請求: game_id={game_id}, creator_token={creator_token}")
-        game_service = GameService(db)
         game_state = game_service.get_game_state(game_id, creator_token)
         
         if not game_state:
@@ -65,13 +86,26 @@ async def execute_action(
     game_id: str,
     action: ActionRequest,
     creator_token: Optional[str] = None,
+    since: Optional[int] = None,
     db: Session = Depends(get_db)
 ) -> Dict[str, Any]:
-    """執行遊戲動作"""
+    """執行遊戲動作 (帶 since 時只回傳該版本之後的差異)"""
     try:
         print(f"🎮 接收到動作請求: 遊戲={game_id}, 玩家={action.player_id}, 動作={action.action_type}, 卡牌={action.card_ids}, token={creator_token}")
         game_service = GameService(db)
-        result = game_service.execute_action(game_id, action)
+        delta = game_service.execute_action(game_id, action)
+        
+        if since is not None:
+            # 客戶端停在動作前的版本時直接使用執行時算好的差異
+            if since == delta["base_version"]:
+                update = {"version": delta["version"], "delta": delta, "game_state": None}
+            else:
+                update = game_service.get_state_update(game_id, since)
+            return {
+                "success": True,
+                "message": "動作執行成功",
+                **update
+            }
         
         # 執行動作後，重新獲取包含player_assignment的完整狀態
         full_state = game_service.get_game_state(game_id, creator_token)
@@ -81,6 +115,9 @@ async def execute_action(
             "message": "動作執行成功",
             "game_state": full_state
         }
+    except ActionValidationError as e:
+        print(f"❌ 動作驗證錯誤: {e.code.value} {e.message}")
+        raise HTTPException(status_code=422, detail=e.to_dict())
     except ValueError as e:
         print(f"❌ 動作驗證錯誤: {str(e)}")
         raise HTTPException(status_code=422, detail=str(e))
@@ -89,14 +126,84 @@ async def execute_action(
         raise HTTPException(status_code=500, detail=f"執行動作失敗: {str(e)}")
 
 
+@router.get("/{game_id}/updates", response_model=GameUpdateResponse)
+async def get_state_update(
+    game_id: str,
+    since: Optional[int] = None,
+    db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """取得 since 版本之後的狀態差異 (差距過大或版本無效時回傳完整狀態)"""
+    try:
+        game_service = GameService(db)
+        return game_service.get_state_update(game_id, since)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"獲取狀態更新失敗: {str(e)}")
+
+
+@router.get("/{game_id}/wait", response_model=GameUpdateResponse)
+async def wait_for_update(
+    game_id: str,
+    since: int,
+    timeout: Optional[float] = None,
+    db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """長輪詢：等到版本超過 since 才回傳差異，逾時仍沒有新版本時回 204"""
+    game_service = GameService(db)
+    limit = settings.long_poll_timeout if timeout is None else timeout
+    limit = min(max(limit, 0.0), settings.long_poll_max_timeout)
+    try:
+        updated = await game_service.wait_for_update(game_id, since, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    if not updated:
+        return Response(status_code=204)
+    try:
+        return game_service.get_state_update(game_id, since)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"獲取狀態更新失敗: {str(e)}")
+
+
+@router.get("/{game_id}/replay", response_model=GameStateResponse)
+async def replay_game(
+    game_id: str,
+    upto: Optional[int] = None,
+    db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """從種子與動作記錄重建遊戲狀態 (upto 指定只重播前幾個動作)"""
+    try:
+        game_service = GameService(db)
+        if game_service.get_game(game_id) is None:
+            raise HTTPException(status_code=404, detail="遊戲未找到")
+        return game_service.replay_game(game_id, upto)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"重播遊戲失敗: {str(e)}")
+
+
 @router.get("/{game_id}/status", response_model=GameStatusResponse)
 async def get_game_status(
     game_id: str,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db)
 ) -> Dict[str, Any]:
-    """獲取遊戲簡要狀態"""
+    """獲取遊戲簡要狀態 (If-None-Match 與目前版本相符時回 304)"""
+    game_service = GameService(db)
+    version = game_service.get_version(game_id)
+    if version is not None:
+        etag = make_etag(version)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
     try:
-        game_service = GameService(db)
         status = game_service.get_game_status(game_id)
         
         if not status:
@@ -109,12 +216,51 @@ async def get_game_status(
         raise HTTPException(status_code=500, detail=f"獲取遊戲狀態失敗: {str(e)}")
 
 
+@router.get("/{game_id}/win-probability", response_model=WinProbabilityResponse)
+async def get_win_probability(
+    game_id: str,
+    db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """估計雙方勝率 (旁觀者視角的隨機模擬，結果依局面快取)"""
+    try:
+        analysis_service = AnalysisService(GameService(db))
+        return await analysis_service.win_probability(game_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except AnalysisTimeoutError as e:
+        print(f"⏱️ 勝率估計逾時: 遊戲={game_id}")
+        raise HTTPException(status_code=503, detail={"error": "AnalysisTimeout", "message": str(e)})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"勝率估計失敗: {str(e)}")
+
+
+@router.post("/{game_id}/hint", response_model=HintResponse)
+async def get_hint(
+    game_id: str,
+    request: HintRequest,
+    db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """為目前行動的玩家排序合法動作 (搜尋樹在同一局的請求間延續)"""
+    try:
+        analysis_service = AnalysisService(GameService(db))
+        return await analysis_service.hint(game_id, request.player_id, request.max_results)
+    except ActionValidationError as e:
+        raise HTTPException(status_code=422, detail=e.to_dict())
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except AnalysisTimeoutError as e:
+        print(f"⏱️ 提示搜尋逾時: 遊戲={game_id}")
+        raise HTTPException(status_code=503, detail={"error": "AnalysisTimeout", "message": str(e)})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"取得提示失敗: {str(e)}")
+
+
 @router.post("/{game_id}/reset")
 async def reset_game(
     game_id: str,
     db: Session = Depends(get_db)
 ) -> Dict[str, Any]:
-    """重置遊戲"""
+    """以新的發牌重置遊戲 (玩家不變，版本繼續累加)"""
     try:
         game_service = GameService(db)
         result = game_service.reset_game(game_id)
@@ -124,6 +270,8 @@ async def reset_game(
             "message": "遊戲重置成功",
             "game_state": result
         }
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"重置遊戲失敗: {str(e)}")
 
@@ -1,6 +1,6 @@
 """房間相關的API路由"""
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
 from typing import Dict, Any, Optional
 from sqlalchemy.orm import Session
 
@@ -13,6 +13,7 @@ from app.schemas.room import (
     ErrorResponse,
     RoomStatus
 )
+from app.api.conditional import etag_matches, make_etag, not_modified, set_etag
 from app.services.room_service import RoomService
 from app.database.connection import get_db
 
@@ -62,8 +63,9 @@ async def join_room(request: JoinRoomRequest, room_service: RoomService = Depend
 
 
 @router.get("/{room_id}", response_model=RoomResponse)
-async def get_room(room_id: str, room_service: RoomService = Depends(get_room_service)) -> Dict[str, Any]:
-    """獲取房間詳細資訊"""
+async def get_room(room_id: str, request: Request, response: Response,
+                   room_service: RoomService = Depends(get_room_service)) -> Dict[str, Any]:
+    """獲取房間詳細資訊 (If-None-Match 與目前版本相符時回 304)"""
     try:
         room = room_service.get_room(room_id)
         
@@ -76,6 +78,11 @@ async def get_room(room_id: str, room_service: RoomService = Depends(get_room_se
                 }
             )
         
+        etag = make_etag(room.version)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
+        
         return room.to_dict()
         
     except HTTPException:
@@ -131,6 +138,38 @@ async def leave_room(
         )
 
 
+@router.post("/{room_id}/bot", response_model=RoomResponse)
+async def fill_room_with_bot(room_id: str, room_service: RoomService = Depends(get_room_service)) -> Dict[str, Any]:
+    """以電腦玩家 (MCTS) 補滿等待中的房間並開始遊戲"""
+    try:
+        result = room_service.fill_with_bot(room_id)
+        
+        # 檢查是否有錯誤
+        if "error" in result:
+            status_code = {
+                "RoomNotFound": 404,
+                "InvalidOperation": 422,
+            }.get(result["error"], 400)
+            
+            raise HTTPException(
+                status_code=status_code,
+                detail=result
+            )
+        
+        return result
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "error": "InternalServerError",
+                "message": f"加入電腦玩家失敗: {str(e)}"
+            }
+        )
+
+
 @router.get("/", response_model=RoomListResponse)
 async def get_room_list(
     status: Optional[RoomStatus] = None,
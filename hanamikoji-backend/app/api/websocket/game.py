@@ -0,0 +1,113 @@
+"""遊戲 WebSocket 端點 - 動作執行後由伺服器推送最新狀態，取代輪詢"""
+
+import json
+import logging
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+
+from app.domain.engine.validation import ActionValidationError
+from app.schemas.game import ActionRequest
+from app.services.channels import Connection, game_channels, make_message, now_ms
+from app.services.game_service import GameService
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+def error_message(error_code: str, message: str, details: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """錯誤通知訊息"""
+    data = {"error_code": error_code, "message": message}
+    if details:
+        data["details"] = details
+    return make_message("error", data)
+
+
+@router.websocket("/ws/game/{game_id}")
+async def game_socket(websocket: WebSocket, game_id: str, player_id: Optional[str] = None):
+    """訂閱遊戲狀態 (player_id 省略時為旁觀)
+
+    連線時送出一次完整狀態，之後每個動作推送 game_state_delta；也可以直接送出 player_action，
+    或以 sync 要求補送漏掉的版本。
+    """
+    await websocket.accept()
+    game_service = GameService()
+    game = game_service.get_game(game_id)
+
+    if game is None:
+        await websocket.send_json(error_message("GAME_NOT_FOUND", "遊戲不存在"))
+        await websocket.close(code=1008)
+        return
+    if player_id is not None and game.player_by_id(player_id) is None:
+        await websocket.send_json(error_message("UNKNOWN_PLAYER", "玩家不在此遊戲中"))
+        await websocket.close(code=1008)
+        return
+
+    connection = Connection(websocket, player_id)
+    connection.start()
+    game_channels.subscribe(game_id, connection)
+    logger.info("WebSocket 已連線: 遊戲 %s, 玩家 %s", game_id, player_id or "旁觀者")
+
+    try:
+        connection.send_message(make_message("connection_established", {
+            "player_id": player_id,
+            "game_id": game_id,
+            "connection_time": now_ms()
+        }))
+        connection.send_message(make_message("game_state_update", game_service._serialize(game)))
+
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+            except ValueError:
+                connection.send_message(error_message("INVALID_MESSAGE", "訊息必須是 JSON"))
+                continue
+            message_type = message.get("type") if isinstance(message, dict) else None
+
+            if message_type == "ping":
+                connection.send_message({"type": "pong", "timestamp": now_ms()})
+            elif message_type == "player_action":
+                _handle_action(game_service, connection, game_id, message.get("data") or {})
+            elif message_type == "sync":
+                _handle_sync(game_service, connection, game_id, message.get("data") or {})
+            else:
+                connection.send_message(error_message("UNKNOWN_MESSAGE", f"不支援的訊息類型: {message_type}"))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        game_channels.unsubscribe(game_id, connection)
+        await connection.close()
+        logger.info("WebSocket 已中斷: 遊戲 %s, 玩家 %s", game_id, player_id or "旁觀者")
+
+
+def _handle_action(game_service: GameService, connection: Connection, game_id: str, data: Dict[str, Any]) -> None:
+    """執行連線玩家送出的動作；成功時的狀態差異由 execute_action 推送給所有訂閱者
+
+    電腦玩家的回應在背景計算，完成後另外推送一次 game_state_delta。
+    """
+    if connection.player_id is None:
+        connection.send_message(error_message("SPECTATOR", "旁觀連線無法執行動作"))
+        return
+    try:
+        action = ActionRequest(**{**data, "player_id": connection.player_id})
+        game_service.execute_action(game_id, action)
+    except ActionValidationError as e:
+        connection.send_message(error_message(e.code.value, e.message))
+    except ValidationError as e:
+        connection.send_message(error_message("INVALID_ACTION", "動作格式錯誤", {"errors": e.errors(include_url=False)}))
+    except ValueError as e:
+        connection.send_message(error_message("INVALID_ACTION", str(e)))
+
+
+def _handle_sync(game_service: GameService, connection: Connection, game_id: str, data: Dict[str, Any]) -> None:
+    """客戶端漏掉推送時 (版本不連續) 補送 since 之後的差異，差距過大時補送完整狀態"""
+    since = data.get("since")
+    if not isinstance(since, int):
+        since = None
+    update = game_service.get_state_update(game_id, since)
+    if update["delta"] is not None:
+        connection.send_message(make_message("game_state_delta", update["delta"]))
+    else:
+        connection.send_message(make_message("game_state_update", update["game_state"]))
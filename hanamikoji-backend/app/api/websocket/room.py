@@ -0,0 +1,71 @@
+"""房間 WebSocket 端點 - 推送玩家加入/離開與遊戲開始事件，取代輪詢房間狀態"""
+
+import json
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
+
+from app.api.routes.room import get_room_service
+from app.api.websocket.game import error_message
+from app.services.channels import Connection, make_message, now_ms, room_channels
+from app.services.room_service import RoomService
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.websocket("/ws/room/{room_id}")
+async def room_socket(websocket: WebSocket, room_id: str, player_id: Optional[str] = None,
+                      room_service: RoomService = Depends(get_room_service)):
+    """訂閱房間事件 (player_id 省略時只接收事件)"""
+    await websocket.accept()
+    room = room_service.get_room(room_id)
+
+    if room is None:
+        await websocket.send_json(error_message("ROOM_NOT_FOUND", "房間不存在"))
+        await websocket.close(code=1008)
+        return
+    if player_id is not None and room.get_player(player_id) is None:
+        await websocket.send_json(error_message("PLAYER_NOT_IN_ROOM", "玩家不在此房間中"))
+        await websocket.close(code=1008)
+        return
+
+    connection = Connection(websocket, player_id)
+    connection.start()
+    room_channels.subscribe(room_id, connection)
+    logger.info("房間 WebSocket 已連線: 房間 %s, 玩家 %s", room_id, player_id or "旁觀者")
+
+    try:
+        # 連線時附上目前的房間狀態，之後只推送事件
+        connection.send_message(make_message("connection_established", {
+            "player_id": player_id,
+            "room_id": room_id,
+            "connection_time": now_ms(),
+            "room": room.to_dict()
+        }))
+
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+            except ValueError:
+                connection.send_message(error_message("INVALID_MESSAGE", "訊息必須是 JSON"))
+                continue
+            message_type = message.get("type") if isinstance(message, dict) else None
+
+            if message_type == "ping":
+                connection.send_message({"type": "pong", "timestamp": now_ms()})
+            elif message_type == "leave_room" and player_id is not None:
+                # 成功時 player_left 由 leave_room 推送給房間內所有連線
+                result = room_service.leave_room(room_id, player_id)
+                if "error" in result:
+                    connection.send_message(error_message(result["error"], result["message"]))
+            else:
+                connection.send_message(error_message("UNKNOWN_MESSAGE", f"不支援的訊息類型: {message_type}"))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        room_channels.unsubscribe(room_id, connection)
+        await connection.close()
+        logger.info("房間 WebSocket 已中斷: 房間 %s, 玩家 %s", room_id, player_id or "旁觀者")
@@ -0,0 +1,167 @@
+"""遊戲建立流程基準測試 - 分階段量測吞吐量、延遲與配置量
+
+階段：
+    load        GameDataLoader 讀取並解析藝妓/卡牌 JSON (每次使用新的載入器)
+    geishas     GeishaFactory.create_all_geishas
+    deck        CardFactory.create_shuffled_deck
+    deal        GameFactory._deal_initial_cards
+    serialize   GameInitializationService._create_game_state_response
+    end_to_end  GameInitializationService.initialize_new_game (建立 + 序列化)
+
+每個階段回報 ops/sec、p50/p99 延遲 (微秒) 與每次操作的配置位元組數 (tracemalloc 峰值)，
+並與保存的基準比較，吞吐量下降超過容許值即視為退步。
+
+用法:
+    python -m app.benchmarks.game_creation --iterations 5000
+    python -m app.benchmarks.game_creation --save-baseline
+    python -m app.benchmarks.game_creation --fail-on-regression
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+from app.domain.factories.game_factory import GameDataLoader, GameInitializationService
+
+DEFAULT_BASELINE_PATH = "app/benchmarks/baseline.json"
+DEFAULT_TOLERANCE = 0.2
+ALLOCATION_SAMPLES = 200
+
+
+def percentile(sorted_values: List[int], fraction: float) -> int:
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure_allocations(op: Callable[[], object], samples: int) -> float:
+    """每次操作的配置位元組數 (tracemalloc 峰值相對於操作前的平均)"""
+    tracemalloc.start()
+    total = 0
+    try:
+        for _ in range(samples):
+            current = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            op()
+            total += tracemalloc.get_traced_memory()[1] - current
+    finally:
+        tracemalloc.stop()
+    return total / samples
+
+
+def bench(op: Callable[[], object], iterations: int, warmup: int) -> Dict:
+    """量測單一階段"""
+    for _ in range(warmup):
+        op()
+    gc.collect()
+    timings = []
+    clock = time.perf_counter_ns
+    started = clock()
+    for _ in range(iterations):
+        begin = clock()
+        op()
+        timings.append(clock() - begin)
+    elapsed = clock() - started
+    timings.sort()
+    return {
+        "iterations": iterations,
+        "ops_per_sec": round(iterations / (elapsed / 1e9), 1),
+        "p50_us": round(percentile(timings, 0.50) / 1000, 2),
+        "p99_us": round(percentile(timings, 0.99) / 1000, 2),
+        "alloc_bytes_per_op": round(measure_allocations(op, min(iterations, ALLOCATION_SAMPLES)), 1),
+    }
+
+
+def stages(data_dir: str, seed: int) -> Dict[str, Callable[[], object]]:
+    """各階段的操作 (只包含被量測的部分，準備工作在外面完成)"""
+    service = GameInitializationService(data_dir)
+    factory = service.game_factory
+    rng = random.Random(seed)
+    game = factory.create_new_game("玩家1", "玩家2")
+    deck = factory.card_factory.create_shuffled_deck(rng)
+
+    def load() -> object:
+        loader = GameDataLoader(data_dir)
+        return loader.load_geisha_templates(), loader.load_card_templates()
+
+    return {
+        "load": load,
+        "geishas": factory.geisha_factory.create_all_geishas,
+        "deck": lambda: factory.card_factory.create_shuffled_deck(rng),
+        "deal": lambda: factory._deal_initial_cards(game, deck),
+        "serialize": lambda: service._create_game_state_response(game),
+        "end_to_end": lambda: service.initialize_new_game("玩家1", "玩家2"),
+    }
+
+
+def run(iterations: int, warmup: int = 100, data_dir: str = "app/domain/data", seed: int = 0,
+        only: Optional[List[str]] = None) -> Dict:
+    results = {}
+    for name, op in stages(data_dir, seed).items():
+        if only and name not in only:
+            continue
+        results[name] = bench(op, iterations, warmup)
+    return {
+        "python": sys.version.split()[0],
+        "iterations": iterations,
+        "stages": results,
+    }
+
+
+def compare(report: Dict, baseline: Dict, tolerance: float) -> Dict[str, Dict]:
+    """與基準比較吞吐量，回傳各階段的變化與是否退步"""
+    comparison = {}
+    for name, result in report["stages"].items():
+        base = baseline.get("stages", {}).get(name)
+        if base is None:
+            continue
+        ratio = result["ops_per_sec"] / base["ops_per_sec"] if base["ops_per_sec"] else None
+        comparison[name] = {
+            "baseline_ops_per_sec": base["ops_per_sec"],
+            "ratio": round(ratio, 3) if ratio is not None else None,
+            "alloc_delta_bytes": round(result["alloc_bytes_per_op"] - base["alloc_bytes_per_op"], 1),
+            "regression": ratio is not None and ratio < 1.0 - tolerance,
+        }
+    return comparison
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="花見小路遊戲建立流程基準測試")
+    parser.add_argument("--iterations", type=int, default=2000, help="每個階段的量測次數")
+    parser.add_argument("--warmup", type=int, default=100, help="暖身次數")
+    parser.add_argument("--stages", nargs="+", default=None, help="只量測指定階段")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH, help="基準檔案")
+    parser.add_argument("--save-baseline", action="store_true", help="把本次結果寫成新的基準")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="容許的吞吐量下降比例")
+    parser.add_argument("--fail-on-regression", action="store_true", help="有階段退步時以狀態碼 1 結束")
+    parser.add_argument("--data-dir", default="app/domain/data", help="遊戲資料目錄")
+    args = parser.parse_args()
+
+    report = run(args.iterations, args.warmup, args.data_dir, only=args.stages)
+
+    regressed = False
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        report["baseline_saved"] = args.baseline
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            comparison = compare(report, json.load(f), args.tolerance)
+        report["comparison"] = comparison
+        regressed = any(item["regression"] for item in comparison.values())
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if regressed:
+        print("⚠️ 有階段的吞吐量低於基準", file=sys.stderr)
+        if args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
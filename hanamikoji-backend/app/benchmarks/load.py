@@ -0,0 +1,262 @@
+"""行程內負載測試 - 透過 ASGI transport 直接驅動 FastAPI 應用 (不需要網路)
+
+模擬玩家依指定的到達率 (卜瓦松過程) 陸續進場：
+    POST /api/v1/rooms/join → 輪詢 GET /api/v1/rooms/{id} 直到配對成功
+    → 輪詢 GET /api/v1/games/{id}，輪到自己時思考一段時間後 POST /api/v1/games/{id}/action
+直到遊戲結束或達到指定回合數。
+
+結果以 JSON 輸出：整體吞吐量、各路由延遲百分位數與錯誤數，以及事件迴圈延遲
+(監控協程的睡眠超時量；服務中的同步呼叫會直接反映在這裡)。
+
+MongoDB 無法連線時每個請求都會等到伺服器選擇逾時，可用 --mongodb-url 指定較短的逾時，例如
+    mongodb://localhost:30017/hanamikoji_game?serverSelectionTimeoutMS=50
+
+用法:
+    python -m app.benchmarks.load --players 40 --arrival-rate 20 --think-time 0.05
+    python -m app.benchmarks.load --players 200 --arrival-rate 100 --rounds 1 --poll-interval 0.02
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import httpx
+
+# 每種行動需要的卡牌數
+ACTION_CARD_COUNTS = {"SECRET": 1, "DISCARD": 2, "GIFT": 3, "COMPETE": 4}
+LAG_INTERVAL = 0.01
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """毫秒延遲樣本的百分位數"""
+    if not samples:
+        return {"p50_ms": 0.0, "p90_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    ordered = sorted(samples)
+    return {
+        "p50_ms": round(percentile(ordered, 0.50), 2),
+        "p90_ms": round(percentile(ordered, 0.90), 2),
+        "p99_ms": round(percentile(ordered, 0.99), 2),
+        "max_ms": round(ordered[-1], 2),
+    }
+
+
+def choose_action(state: Dict, player_id: str, rng: random.Random) -> Optional[Dict]:
+    """依遊戲狀態隨機選一個合法動作 (包含回應對手的獻禮/競爭)"""
+    offer = state.get("pending_offer")
+    if offer:
+        if offer["responder_id"] != player_id:
+            return None
+        if offer["groupings"]:
+            chosen = rng.choice(offer["groupings"])
+        else:
+            chosen = [rng.choice(offer["cards"])["id"]]
+        return {"player_id": player_id, "action_type": offer["action_type"], "card_ids": chosen}
+
+    player = state["players"][player_id]
+    hand = [card["id"] for card in player["hand_cards"]]
+    available = [
+        action for action, count in ACTION_CARD_COUNTS.items()
+        if action not in player["used_actions"] and len(hand) >= count
+    ]
+    if not available:
+        return None
+    action = rng.choice(available)
+    cards = rng.sample(hand, ACTION_CARD_COUNTS[action])
+    request = {"player_id": player_id, "action_type": action, "card_ids": cards}
+    if action == "COMPETE":
+        request["groupings"] = [cards[:2], cards[2:]]
+    return request
+
+
+class LoadStats:
+    """各路由的延遲與錯誤統計"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.lag: List[float] = []
+        self.players_joined = 0
+        self.games_started = set()
+        self.games_finished = set()
+        self.actions = 0
+        self.failed_players = 0
+
+    def report(self, elapsed: float) -> Dict:
+        total = sum(len(samples) for samples in self.latencies.values())
+        return {
+            "elapsed_s": round(elapsed, 3),
+            "requests": total,
+            "throughput_rps": round(total / elapsed, 1) if elapsed else 0.0,
+            "players_joined": self.players_joined,
+            "failed_players": self.failed_players,
+            "games_started": len(self.games_started),
+            "games_finished": len(self.games_finished),
+            "actions": self.actions,
+            "actions_per_sec": round(self.actions / elapsed, 1) if elapsed else 0.0,
+            "routes": {
+                route: {"count": len(samples), "errors": self.errors[route], **summarize(samples)}
+                for route, samples in sorted(self.latencies.items())
+            },
+            "event_loop_lag": summarize(self.lag),
+        }
+
+
+class LoadRunner:
+    """模擬玩家的負載產生器"""
+
+    def __init__(self, client: httpx.AsyncClient, args: argparse.Namespace):
+        self.client = client
+        self.args = args
+        self.stats = LoadStats()
+        self.rng = random.Random(args.seed)
+
+    async def request(self, route: str, method: str, url: str, **kwargs) -> httpx.Response:
+        """送出請求並以路由樣板記錄延遲 (4xx/5xx 計為錯誤)"""
+        started = time.perf_counter()
+        response = await self.client.request(method, url, **kwargs)
+        self.stats.latencies[route].append((time.perf_counter() - started) * 1000)
+        if response.status_code >= 400:
+            self.stats.errors[route] += 1
+        return response
+
+    async def wait_for_game(self, room_id: str) -> Optional[str]:
+        """輪詢房間直到遊戲開始"""
+        deadline = time.perf_counter() + self.args.match_timeout
+        while time.perf_counter() < deadline:
+            response = await self.request("GET /api/v1/rooms/{room_id}", "GET", f"/api/v1/rooms/{room_id}")
+            if response.status_code == 200 and response.json().get("game_id"):
+                return response.json()["game_id"]
+            await asyncio.sleep(self.args.poll_interval)
+        return None
+
+    async def play(self, index: int) -> None:
+        """單一模擬玩家的完整流程"""
+        rng = random.Random(self.rng.getrandbits(64))
+        name = f"負載玩家{index:05d}"
+        response = await self.request("POST /api/v1/rooms/join", "POST", "/api/v1/rooms/join",
+                                      json={"player_name": name})
+        if response.status_code != 200:
+            self.stats.failed_players += 1
+            return
+        self.stats.players_joined += 1
+        room = response.json()
+
+        game_id = room.get("game_id") or await self.wait_for_game(room["room_id"])
+        if game_id is None:
+            self.stats.failed_players += 1
+            return
+        self.stats.games_started.add(game_id)
+
+        player_id = None
+        while True:
+            response = await self.request("GET /api/v1/games/{game_id}", "GET", f"/api/v1/games/{game_id}")
+            if response.status_code != 200:
+                self.stats.failed_players += 1
+                return
+            state = response.json()
+            if player_id is None:
+                player_id = next(pid for pid, player in state["players"].items() if player["name"] == name)
+            if state["status"] == "FINISHED" or (self.args.rounds and state["round_number"] > self.args.rounds):
+                self.stats.games_finished.add(game_id)
+                return
+
+            action = choose_action(state, player_id, rng) if state["current_player_id"] == player_id else None
+            if action is None:
+                await asyncio.sleep(self.args.poll_interval)
+                continue
+
+            await asyncio.sleep(rng.expovariate(1.0 / self.args.think_time) if self.args.think_time else 0)
+            response = await self.request("POST /api/v1/games/{game_id}/action", "POST",
+                                          f"/api/v1/games/{game_id}/action", json=action)
+            if response.status_code == 200:
+                self.stats.actions += 1
+
+    async def monitor_lag(self, stop: asyncio.Event) -> None:
+        """量測事件迴圈延遲：固定間隔睡眠的實際超時量"""
+        loop = asyncio.get_running_loop()
+        while not stop.is_set():
+            started = loop.time()
+            await asyncio.sleep(LAG_INTERVAL)
+            self.stats.lag.append(max(0.0, (loop.time() - started - LAG_INTERVAL) * 1000))
+
+    async def run(self) -> Dict:
+        stop = asyncio.Event()
+        monitor = asyncio.create_task(self.monitor_lag(stop))
+        started = time.perf_counter()
+
+        players = []
+        for index in range(self.args.players):
+            players.append(asyncio.create_task(self.play(index)))
+            if self.args.arrival_rate:
+                await asyncio.sleep(self.rng.expovariate(self.args.arrival_rate))
+        done, pending = await asyncio.wait(players, timeout=self.args.timeout)
+        for task in pending:
+            task.cancel()
+        elapsed = time.perf_counter() - started
+
+        stop.set()
+        await monitor
+        errors = [task.exception() for task in done if task.exception() is not None]
+        report = self.stats.report(elapsed)
+        report["timed_out_players"] = len(pending)
+        report["crashed_players"] = len(errors)
+        if errors:
+            report["first_error"] = repr(errors[0])
+        return report
+
+
+async def run_load(args: argparse.Namespace) -> Dict:
+    """啟動應用 (含 lifespan) 並執行負載"""
+    from main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load") as client:
+            report = await LoadRunner(client, args).run()
+    report["config"] = {
+        "players": args.players,
+        "arrival_rate": args.arrival_rate,
+        "think_time": args.think_time,
+        "poll_interval": args.poll_interval,
+        "rounds": args.rounds,
+        "seed": args.seed,
+    }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="花見小路行程內負載測試")
+    parser.add_argument("--players", type=int, default=20, help="模擬玩家總數 (兩兩配對)")
+    parser.add_argument("--arrival-rate", type=float, default=10.0, help="每秒到達的玩家數 (0 表示同時到達)")
+    parser.add_argument("--think-time", type=float, default=0.05, help="輪到自己時的平均思考秒數 (指數分布)")
+    parser.add_argument("--poll-interval", type=float, default=0.05, help="輪詢房間/遊戲狀態的間隔秒數")
+    parser.add_argument("--rounds", type=int, default=0, help="每局只進行幾回合 (0 表示打到結束)")
+    parser.add_argument("--match-timeout", type=float, default=30.0, help="等待配對的秒數上限")
+    parser.add_argument("--timeout", type=float, default=300.0, help="整體執行秒數上限")
+    parser.add_argument("--seed", type=int, default=0, help="到達時間與動作選擇的亂數種子")
+    parser.add_argument("--mongodb-url", default=None, help="覆寫 MONGODB_URL")
+    args = parser.parse_args()
+
+    if args.mongodb_url:
+        os.environ["MONGODB_URL"] = args.mongodb_url
+
+    # 服務的執行紀錄改寫到 stderr，stdout 只留 JSON 結果
+    with contextlib.redirect_stdout(sys.stderr):
+        report = asyncio.run(run_load(args))
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
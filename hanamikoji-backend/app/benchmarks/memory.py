@@ -0,0 +1,96 @@
+"""記憶體基準測試 - 每個存活的遊戲與房間佔用的位元組數
+
+模擬 GameService._games 與 RoomService._active_rooms 中長期保存的物件：
+遊戲建立後序列化一次 (會建立並快取綁定的藝妓視圖)，房間加入兩位玩家。
+以 tracemalloc 量測建立 N 個物件前後的差額再平均。
+
+用法: python -m app.benchmarks.memory --games 2000 --rooms 2000
+"""
+
+import argparse
+import gc
+import json
+import sys
+import tracemalloc
+from typing import Callable, Dict, List
+
+from app.domain.entities.card import Geisha, GiftCard
+from app.domain.entities.game import Game
+from app.domain.entities.room import Room, RoomPlayer
+from app.domain.entities.user import ActionMarker, Player
+from app.domain.factories.game_factory import GameInitializationService
+from app.domain.enums.game_enums import ActionType
+
+
+def measure(create: Callable[[], object], count: int) -> Dict:
+    """建立 count 個物件並保持存活，回傳平均每個的配置位元組數"""
+    create()  # 先暖身 (載入模板、快取等一次性配置不計入)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    alive: List[object] = [create() for _ in range(count)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    total = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    # 扣除保存物件的 list 本身
+    total -= sys.getsizeof(alive)
+    return {"count": count, "bytes_total": total, "bytes_per_object": round(total / count, 1)}
+
+
+def instance_sizes() -> Dict[str, int]:
+    """各實體單一實例的大小 (不含引用的物件；有 __dict__ 時一併計入)"""
+    service = GameInitializationService()
+    game = service.game_factory.create_new_game("玩家1", "玩家2")
+    room = Room()
+    samples = {
+        "Game": game,
+        "Player": game.player1,
+        "Geisha": game.geishas[0],
+        "GiftCard": GiftCard(game, 0),
+        "ActionMarker": ActionMarker(ActionType.SECRET),
+        "Room": room,
+        "RoomPlayer": RoomPlayer("player_1", "玩家1"),
+        "GameState": game.state,
+    }
+    sizes = {}
+    for name, obj in samples.items():
+        size = sys.getsizeof(obj)
+        if hasattr(obj, "__dict__"):
+            size += sys.getsizeof(obj.__dict__)
+        sizes[name] = size
+    return sizes
+
+
+def run(games: int, rooms: int) -> Dict:
+    service = GameInitializationService()
+
+    def create_game() -> Game:
+        game = service.game_factory.create_new_game("玩家1", "玩家2")
+        service._create_game_state_response(game)
+        return game
+
+    def create_room() -> Room:
+        room = Room()
+        room.add_player("player_1", "玩家1")
+        room.add_player("player_2", "玩家2")
+        room.to_dict()
+        return room
+
+    return {
+        "python": sys.version.split()[0],
+        "per_game": measure(create_game, games),
+        "per_room": measure(create_room, rooms),
+        "instance_bytes": instance_sizes(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="花見小路記憶體基準測試")
+    parser.add_argument("--games", type=int, default=2000, help="建立的遊戲數")
+    parser.add_argument("--rooms", type=int, default=2000, help="建立的房間數")
+    args = parser.parse_args()
+    print(json.dumps(run(args.games, args.rooms), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
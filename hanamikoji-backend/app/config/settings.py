@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 
 
@@ -21,6 +23,26 @@ class Settings(BaseSettings):
     # 安全設定
     secret_key: str = "dev-secret-key"
 
+    # 電腦玩家 (MCTS) 設定
+    bot_time_limit: float = 0.5  # 每步思考秒數
+    bot_iterations: Optional[int] = None  # 每步迭代上限 (None 表示只看時間)
+    bot_workers: int = 1  # 根平行搜尋的行程數
+    bot_endgame_draws: int = 1  # 牌庫剩下幾張以內改用殘局求解器 (每多一張耗時約多一個數量級)
+    opening_book_path: str = "app/domain/data/opening_book.bin"  # 開局庫 (python -m app.simulation.opening_book 產生)
+
+    # 對局分析 (勝率估計、提示) 設定
+    analysis_time_limit: float = 0.2  # 每次分析的時間上限 (秒)
+    analysis_workers: int = 2  # 分析使用的工作行程數
+    analysis_cache_size: int = 1024  # 快取的分析結果數
+    hint_time_limit: float = 0.3  # 每次提示的搜尋時間 (秒)
+    hint_tree_limit: int = 256  # 保留搜尋樹的遊戲數
+
+    # WebSocket 設定
+    ws_send_queue_size: int = 64  # 每條連線最多暫存的待送訊息數 (超過即中斷連線)
+    delta_max_gap: int = 8  # 增量更新最多跨越的版本數 (超過改送完整狀態)
+    long_poll_timeout: float = 25.0  # 長輪詢預設等待秒數
+    long_poll_max_timeout: float = 60.0  # 長輪詢最長等待秒數
+
     class Config:
         env_file = ".env"
         case_sensitive = False
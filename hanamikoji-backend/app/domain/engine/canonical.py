@@ -0,0 +1,131 @@
+"""對稱正規化 - 將等價的局面對應到同一個鍵
+
+魅力值與卡牌數相同的藝妓 (三位2分、兩位3分) 可以互換，同一位藝妓的禮物卡也可以互換；
+此外以行動玩家的視角表示局面 (自己固定為座位0)，即可消去座位交換。
+正規鍵只包含行動玩家看得到的資訊，因此同一資訊集的確定化共用同一個鍵。
+"""
+
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+
+from .layout import DeckLayout
+from .moves import Move
+from .state import GameState, iter_bits
+from ..enums.game_enums import ActionType
+
+# 正規化的動作：(行動類型, 卡牌的正規藝妓位置, 第一組的正規藝妓位置)；回應的行動類型為 None
+CanonicalMove = Tuple[Optional[ActionType], Tuple[int, ...], Tuple[int, ...]]
+
+
+@lru_cache(maxsize=None)
+def symmetry_classes(layout: DeckLayout) -> Tuple[Tuple[int, ...], ...]:
+    """依 (魅力值, 卡牌數) 分組的可互換藝妓"""
+    sizes = [0] * layout.geisha_count
+    for geisha in layout.card_geisha:
+        sizes[geisha] += 1
+    groups = {}
+    for geisha in range(layout.geisha_count):
+        groups.setdefault((layout.charms[geisha], sizes[geisha]), []).append(geisha)
+    return tuple(tuple(group) for _, group in sorted(groups.items(), reverse=True))
+
+
+def _geisha_counts(layout: DeckLayout, mask: int) -> List[int]:
+    counts = [0] * layout.geisha_count
+    card_geisha = layout.card_geisha
+    for card in iter_bits(mask):
+        counts[card_geisha[card]] += 1
+    return counts
+
+
+def canonicalize(state: GameState, seat: Optional[int] = None) -> Tuple[tuple, Tuple[int, ...]]:
+    """回傳 (正規鍵, 正規位置 -> 實際藝妓索引)
+
+    seat 預設為行動玩家。
+    """
+    layout = state.layout
+    me = state.to_move if seat is None else seat
+    opp = 1 - me
+    zones = [
+        _geisha_counts(layout, mask) for mask in (
+            state.hands[me], state.secrets[me], state.discards[me],
+            state.allocated[me], state.allocated[opp], state.pending_offer, state.pending_split,
+        )
+    ]
+    favor_me, favor_opp = state.favor[me], state.favor[opp]
+    rows = [
+        tuple(zone[geisha] for zone in zones) + ((favor_me >> geisha & 1) | (favor_opp >> geisha & 1) << 1,)
+        for geisha in range(layout.geisha_count)
+    ]
+
+    perm: List[int] = []
+    body = []
+    for group in symmetry_classes(layout):
+        ordered = sorted(group, key=lambda g: rows[g])
+        perm.extend(ordered)
+        body.append(tuple(rows[g] for g in ordered))
+
+    pending = None if state.pending_action is None else state.pending_action.value
+    key = (
+        tuple(body),
+        state.used[me], state.used[opp], state.phase, pending, state.current == me,
+        state.hands[opp].bit_count(), len(state.order) - 1 - state.draw_pos,
+    )
+    return key, tuple(perm)
+
+
+def canonical_hash(state: GameState, seat: Optional[int] = None) -> int:
+    """正規鍵的雜湊值"""
+    return hash(canonicalize(state, seat)[0])
+
+
+def _slot_of(perm: Sequence[int]) -> List[int]:
+    """實際藝妓索引 -> 正規位置"""
+    slot_of = [0] * len(perm)
+    for slot, geisha in enumerate(perm):
+        slot_of[geisha] = slot
+    return slot_of
+
+
+def _slots(layout: DeckLayout, mask: int, slot_of: Sequence[int]) -> Tuple[int, ...]:
+    return tuple(sorted(slot_of[layout.card_geisha[card]] for card in iter_bits(mask)))
+
+
+def _pick(layout: DeckLayout, mask: int, slots: Sequence[int], perm: Sequence[int]) -> int:
+    """從 mask 中挑出符合正規藝妓位置的卡牌"""
+    chosen = 0
+    for slot in slots:
+        geisha = perm[slot]
+        for card in iter_bits(mask & ~chosen):
+            if layout.card_geisha[card] == geisha:
+                chosen |= 1 << card
+                break
+        else:
+            raise ValueError("正規動作與局面不符")
+    return chosen
+
+
+def canonical_move(state: GameState, move: Move, perm: Sequence[int]) -> CanonicalMove:
+    """將實際動作轉換為正規動作"""
+    slot_of = _slot_of(perm)
+    action, cards, split = move
+    return action, _slots(state.layout, cards, slot_of), _slots(state.layout, split, slot_of)
+
+
+def resolve_move(state: GameState, move: CanonicalMove, perm: Sequence[int]) -> Move:
+    """將正規動作還原為此局面中的實際動作"""
+    layout = state.layout
+    action, card_slots, split_slots = move
+    if action is None:
+        if state.pending_split:
+            # 競爭回應只能選其中一組，找出藝妓組合相符的那組
+            slot_of = _slot_of(perm)
+            for group in (state.pending_split, state.pending_offer ^ state.pending_split):
+                if _slots(layout, group, slot_of) == card_slots:
+                    return None, group, 0
+            raise ValueError("正規動作與局面不符")
+        return None, _pick(layout, state.pending_offer, card_slots, perm), 0
+
+    cards = _pick(layout, state.hands[state.current], card_slots, perm)
+    split = _pick(layout, cards, split_slots, perm) if split_slots else 0
+    return action, cards, split
+
@@ -0,0 +1,81 @@
+"""狀態差異 - 比較兩個時點的位元棋盤，只列出改變的部分
+
+StateSnapshot 只複製幾個整數遮罩，建立成本極低；diff 以遮罩 XOR 找出位置改變的卡牌，
+工作量與改變的卡牌數成正比，不需要逐張序列化整個局面。
+"""
+
+from typing import Iterator, List, Tuple
+
+from .state import GameState, NO_WINNER, _favored_seat
+from ..enums.card_enums import CardStatus
+
+# (卡牌狀態, 座位) - 座位為 NO_WINNER 表示沒有持有者
+Location = Tuple[CardStatus, int]
+
+DECK_LOCATION: Location = (CardStatus.IN_DECK, NO_WINNER)
+
+
+class StateSnapshot:
+    """差異比較所需的狀態切片"""
+
+    __slots__ = ("zones", "favor", "used")
+
+    def __init__(self, zones: Tuple[Tuple[Location, int], ...], favor: Tuple[int, int], used: Tuple[int, int]):
+        self.zones = zones
+        self.favor = favor
+        self.used = used
+
+    @classmethod
+    def capture(cls, state: GameState) -> 'StateSnapshot':
+        """擷取目前狀態 (卡牌位置判定順序與 GiftCard._locate 相同)"""
+        hands = list(state.hands)
+        # 展示給對手、等待選擇中的卡牌仍算在出牌者手中
+        hands[state.current] |= state.pending_offer
+        zones = (
+            ((CardStatus.REMOVED, NO_WINNER), state.removed),
+            ((CardStatus.IN_HAND, 0), hands[0]),
+            ((CardStatus.SECRET, 0), state.secrets[0]),
+            ((CardStatus.ALLOCATED, 0), state.allocated[0]),
+            ((CardStatus.DISCARDED, 0), state.discards[0]),
+            ((CardStatus.IN_HAND, 1), hands[1]),
+            ((CardStatus.SECRET, 1), state.secrets[1]),
+            ((CardStatus.ALLOCATED, 1), state.allocated[1]),
+            ((CardStatus.DISCARDED, 1), state.discards[1]),
+        )
+        return cls(zones, (state.favor[0], state.favor[1]), (state.used[0], state.used[1]))
+
+    def locate(self, index: int) -> Location:
+        bit = 1 << index
+        for location, mask in self.zones:
+            if mask & bit:
+                return location
+        return DECK_LOCATION
+
+
+def card_moves(old: StateSnapshot, new: StateSnapshot) -> Iterator[Tuple[int, Location, Location]]:
+    """位置改變的卡牌: (索引, 原位置, 新位置)"""
+    changed = 0
+    for (_, old_mask), (_, new_mask) in zip(old.zones, new.zones):
+        changed |= old_mask ^ new_mask
+    while changed:
+        low = changed & -changed
+        index = low.bit_length() - 1
+        changed ^= low
+        before, after = old.locate(index), new.locate(index)
+        if before != after:
+            yield index, before, after
+
+
+def favor_changes(old: StateSnapshot, new: StateSnapshot, geisha_count: int) -> List[Tuple[int, int]]:
+    """青睞改變的藝妓: (藝妓索引, 新的青睞座位)"""
+    changed = (old.favor[0] ^ new.favor[0]) | (old.favor[1] ^ new.favor[1])
+    return [
+        (geisha, _favored_seat(new.favor, geisha))
+        for geisha in range(geisha_count)
+        if changed >> geisha & 1
+    ]
+
+
+def used_changed_seats(old: StateSnapshot, new: StateSnapshot) -> List[int]:
+    """行動標記有改變的座位"""
+    return [seat for seat in (0, 1) if old.used[seat] != new.used[seat]]
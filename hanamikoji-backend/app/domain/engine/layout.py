@@ -0,0 +1,57 @@
+"""牌組佈局 - 將藝妓與禮物卡固定為索引"""
+
+import zlib
+from typing import Dict, List, Tuple
+
+
+class DeckLayout:
+    """牌組佈局
+
+    藝妓依 geishas.json 的順序編為索引 0..6，禮物卡依 card.json 的順序
+    編為索引 0..20。遊戲狀態只需以整數位元遮罩記錄卡牌位置。
+    """
+
+    def __init__(self, geisha_templates: List[Dict], card_templates: List[Dict]):
+        self.geisha_ids: Tuple[str, ...] = tuple(t["id"] for t in geisha_templates)
+        self.geisha_names: Tuple[str, ...] = tuple(t["name"] for t in geisha_templates)
+        self.geisha_gift_items: Tuple[str, ...] = tuple(t["gift_item"] for t in geisha_templates)
+        self.charms: Tuple[int, ...] = tuple(t["charm_value"] for t in geisha_templates)
+        self.geisha_index: Dict[str, int] = {gid: i for i, gid in enumerate(self.geisha_ids)}
+
+        card_geisha = []
+        card_names = []
+        for template in card_templates:
+            geisha = self.geisha_index[template["geisha_id"]]
+            for _ in range(template["count"]):
+                card_geisha.append(geisha)
+                card_names.append(template["name"])
+
+        self.card_geisha: Tuple[int, ...] = tuple(card_geisha)
+        self.card_names: Tuple[str, ...] = tuple(card_names)
+        self.card_count = len(card_geisha)
+        self.geisha_count = len(self.geisha_ids)
+        self.full_mask = (1 << self.card_count) - 1
+
+        masks = [0] * self.geisha_count
+        for card, geisha in enumerate(card_geisha):
+            masks[geisha] |= 1 << card
+        self.geisha_masks: Tuple[int, ...] = tuple(masks)
+
+        # 卡牌ID與索引互查 (ID 固定對應牌組位置，與遊戲無關)
+        self.card_ids: Tuple[str, ...] = tuple(f"card_{i}" for i in range(self.card_count))
+        self.card_index: Dict[str, int] = {cid: i for i, cid in enumerate(self.card_ids)}
+
+        # 以青睞遮罩查魅力總和 (2^7 = 128 筆)
+        self.charm_by_favor: Tuple[int, ...] = tuple(
+            sum(self.charms[g] for g in range(self.geisha_count) if mask >> g & 1)
+            for mask in range(1 << self.geisha_count)
+        )
+
+    def card_charm(self, card: int) -> int:
+        """卡牌的魅力值"""
+        return self.charms[self.card_geisha[card]]
+
+    def fingerprint(self) -> int:
+        """佈局指紋 (藝妓、魅力值或卡牌對應改變時，離線產生的表格即失效)"""
+        text = "|".join(self.geisha_ids) + "|" + ",".join(map(str, self.charms)) + "|" + ",".join(map(str, self.card_geisha))
+        return zlib.crc32(text.encode("utf-8"))
@@ -0,0 +1,110 @@
+"""合法動作產生 - 以預先計算的表格取代每回合的組合枚舉
+
+手牌最多7張，因此先以「手牌中的位置」預先算好所有子集與競爭分組；
+實際手牌 (21位元遮罩) 第一次出現時再展開成卡牌遮罩並依藝妓去除等價動作，
+結果以 (佈局, 手牌遮罩, 行動) 為鍵快取。
+"""
+
+from functools import lru_cache
+from itertools import combinations
+from typing import List, Tuple
+
+from .layout import DeckLayout
+from .state import (
+    ACTION_CARD_COUNTS, HAND_SIZE, PHASE_ACTION, PHASE_RESPOND, GameState, iter_bits,
+)
+from ..enums.game_enums import ActionType
+
+# (行動類型, 卡牌遮罩, 競爭分組遮罩)
+Move = Tuple[ActionType, int, int]
+
+MAX_HAND_SIZE = HAND_SIZE + 1
+MOVE_CACHE_SIZE = 1 << 16
+
+
+def _build_subset_table() -> Tuple[Tuple[Tuple[Tuple[int, ...], ...], ...], ...]:
+    """SUBSETS[k][n]：k張手牌中選n張的所有位置組合"""
+    return tuple(
+        tuple(tuple(combinations(range(k), n)) for n in range(5))
+        for k in range(MAX_HAND_SIZE + 1)
+    )
+
+
+def _build_split_table() -> Tuple[Tuple[Tuple[int, int], ...], ...]:
+    """SPLITS[i]：4張卡中第 i 種兩兩分組 (第一組固定含第一張)"""
+    return tuple(((0, partner), tuple(p for p in (1, 2, 3) if p != partner)) for partner in (1, 2, 3))
+
+
+SUBSETS = _build_subset_table()
+SPLITS = _build_split_table()
+
+
+@lru_cache(maxsize=MOVE_CACHE_SIZE)
+def moves_for_hand(layout: DeckLayout, hand: int, action: ActionType) -> Tuple[Move, ...]:
+    """某手牌在指定行動下所有不等價的合法動作
+
+    同一位藝妓的禮物卡可互換，因此只保留每種藝妓組合的第一個代表。
+    """
+    cards = list(iter_bits(hand))
+    bits = [1 << card for card in cards]
+    geishas = [layout.card_geisha[card] for card in cards]
+    seen = set()
+    moves: List[Move] = []
+
+    for positions in SUBSETS[len(cards)][ACTION_CARD_COUNTS[action]]:
+        mask = 0
+        for p in positions:
+            mask |= bits[p]
+
+        if action != ActionType.COMPETE:
+            key = tuple(sorted(geishas[p] for p in positions))
+            if key not in seen:
+                seen.add(key)
+                moves.append((action, mask, 0))
+            continue
+
+        for first, second in SPLITS:
+            pair_a = tuple(sorted((geishas[positions[first[0]]], geishas[positions[first[1]]])))
+            pair_b = tuple(sorted((geishas[positions[second[0]]], geishas[positions[second[1]]])))
+            key = (pair_a, pair_b) if pair_a <= pair_b else (pair_b, pair_a)
+            if key not in seen:
+                seen.add(key)
+                moves.append((action, mask, bits[positions[first[0]]] | bits[positions[first[1]]]))
+
+    return tuple(moves)
+
+
+def legal_actions(state: GameState) -> List[Move]:
+    """當前玩家所有不等價的合法行動 (只包含尚未使用的行動標記)"""
+    if state.phase != PHASE_ACTION:
+        return []
+
+    seat = state.current
+    hand = state.hands[seat]
+    moves: List[Move] = []
+    for action in ActionType:
+        if not state.has_used(seat, action):
+            moves.extend(moves_for_hand(state.layout, hand, action))
+    return moves
+
+
+def legal_responses(state: GameState) -> List[int]:
+    """對手回應獻禮/競爭的所有選擇 (獻禮時同藝妓的卡只保留一張)"""
+    if state.phase != PHASE_RESPOND:
+        return []
+    if state.pending_action == ActionType.GIFT:
+        responses = []
+        seen = set()
+        for card in iter_bits(state.pending_offer):
+            geisha = state.layout.card_geisha[card]
+            if geisha not in seen:
+                seen.add(geisha)
+                responses.append(1 << card)
+        return responses
+    return [state.pending_split, state.pending_offer ^ state.pending_split]
+
+
+def apply_move(state: GameState, move: Move) -> None:
+    """套用行動"""
+    action, cards, split = move
+    state.apply_action(action, cards, split)
@@ -0,0 +1,461 @@
+"""位元棋盤遊戲狀態引擎
+
+21張禮物卡是固定索引，手牌、秘密卡、棄牌與分配給藝妓的卡牌都是整數位元遮罩，
+套用動作與計分時不需建立任何物件。
+"""
+
+import random
+from typing import TYPE_CHECKING, Iterator, Optional, Sequence
+
+from .layout import DeckLayout
+from ..enums.game_enums import ActionType
+
+if TYPE_CHECKING:
+    from .zobrist import ZobristKeys
+
+HAND_SIZE = 6
+WIN_GEISHA_COUNT = 4
+WIN_CHARM = 11
+
+# 每種行動的位元與需要的卡牌數
+ACTION_BITS = {action: 1 << action.value for action in ActionType}
+ACTION_CARD_COUNTS = {
+    ActionType.SECRET: 1,
+    ActionType.DISCARD: 2,
+    ActionType.GIFT: 3,
+    ActionType.COMPETE: 4,
+}
+ALL_ACTIONS_MASK = (1 << len(ActionType)) - 1
+
+# 遊戲階段
+PHASE_ACTION = 0    # 等待當前玩家選擇行動
+PHASE_RESPOND = 1   # 等待對手回應獻禮/競爭
+PHASE_FINISHED = 2  # 遊戲結束
+
+NO_WINNER = -1
+
+
+def iter_bits(mask: int) -> Iterator[int]:
+    """依序產生遮罩中的位元索引"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def mask_of(indices: Sequence[int]) -> int:
+    """將索引序列轉為遮罩"""
+    mask = 0
+    for index in indices:
+        mask |= 1 << index
+    return mask
+
+
+def _favored_seat(favor, geisha: int) -> int:
+    bit = 1 << geisha
+    if favor[0] & bit:
+        return 0
+    if favor[1] & bit:
+        return 1
+    return NO_WINNER
+
+
+class GameState:
+    """遊戲狀態 (兩位玩家以座位 0、1 表示)"""
+
+    __slots__ = (
+        "layout", "rng", "order", "draw_pos", "removed",
+        "hands", "secrets", "discards", "allocated", "used",
+        "favor", "counts", "projected", "current", "round_starter", "round_number",
+        "phase", "pending_action", "pending_offer", "pending_split",
+        "winner", "stop_at_round_end", "zobrist", "zobrist_material",
+    )
+
+    def __init__(self, layout: DeckLayout, rng: Optional[random.Random] = None):
+        self.layout = layout
+        self.rng = rng
+        self.order: Sequence[int] = ()
+        self.draw_pos = 0
+        self.removed = 0
+        self.hands = [0, 0]
+        self.secrets = [0, 0]
+        self.discards = [0, 0]
+        self.allocated = [0, 0]
+        self.used = [0, 0]
+        self.favor = [0, 0]
+        # 每位 (藝妓, 玩家) 的禮物卡數量，索引為 geisha * 2 + seat
+        self.counts = [0] * (layout.geisha_count * 2)
+        # 若回合此刻結束的青睞遮罩，隨分配增量更新
+        self.projected = [0, 0]
+        self.current = 0
+        self.round_starter = 0
+        self.round_number = 1
+        self.phase = PHASE_ACTION
+        self.pending_action: Optional[ActionType] = None
+        self.pending_offer = 0
+        self.pending_split = 0
+        self.winner = NO_WINNER
+        # 搜尋只需要本回合的結果：為 True 時回合結束後不洗牌、不發下一回合的牌
+        self.stop_at_round_end = False
+        # 置換表用的 Zobrist 鍵值表 (只有求解器的局面啟用) 與增量維護的鍵
+        self.zobrist: Optional['ZobristKeys'] = None
+        self.zobrist_material = 0
+
+    # ---- 發牌 ----
+
+    def deal(self, order: Sequence[int]) -> None:
+        """依洗好的索引順序開始一個回合
+
+        order[-1] 被移出遊戲，前12張各發6張給兩位玩家，其餘為抽牌堆。
+        """
+        self.order = order
+        self.removed = 1 << order[-1]
+        self.hands[0] = mask_of(order[:HAND_SIZE])
+        self.hands[1] = mask_of(order[HAND_SIZE:HAND_SIZE * 2])
+        self.draw_pos = HAND_SIZE * 2
+        self.secrets[0] = self.secrets[1] = 0
+        self.discards[0] = self.discards[1] = 0
+        self.allocated[0] = self.allocated[1] = 0
+        self.counts[:] = [0] * len(self.counts)
+        # 尚未分配任何卡牌，若此刻結束所有藝妓都是平手
+        self.projected[0] = self.projected[1] = 0
+        self.used[0] = self.used[1] = 0
+        self.current = self.round_starter
+        self.phase = PHASE_ACTION
+        self._clear_pending()
+        self._draw()
+        if self.zobrist is not None:
+            self.zobrist_material = self.zobrist.material(self)
+
+    def _draw(self) -> None:
+        """當前玩家抽一張牌"""
+        if self.draw_pos < len(self.order) - 1:
+            card = self.order[self.draw_pos]
+            self.hands[self.current] |= 1 << card
+            if self.zobrist is not None:
+                self.zobrist_material ^= self.zobrist.deck[self.draw_pos][card] ^ self.zobrist.cards[self.current][card]
+            self.draw_pos += 1
+
+    def deck_mask(self) -> int:
+        """抽牌堆中剩餘卡牌的遮罩"""
+        return mask_of(self.order[self.draw_pos:len(self.order) - 1])
+
+    # ---- Zobrist 雜湊 ----
+
+    def enable_zobrist(self, keys: 'ZobristKeys') -> None:
+        """啟用增量 Zobrist 雜湊 (直接修改遮罩或牌序後需再呼叫一次重新計算)"""
+        self.zobrist = keys
+        self.zobrist_material = keys.material(self)
+
+    @property
+    def zobrist_key(self) -> int:
+        """目前局面的 Zobrist 鍵 (需先啟用)"""
+        return self.zobrist_material ^ self.zobrist.turn_key(self)
+
+    def _hash_cards(self, zone: int, cards: int) -> None:
+        """卡牌移入或移出某區域 (見 zobrist.CARD_ZONES) 時更新鍵"""
+        table = self.zobrist.cards[zone]
+        key = self.zobrist_material
+        while cards:
+            low = cards & -cards
+            cards ^= low
+            key ^= table[low.bit_length() - 1]
+        self.zobrist_material = key
+
+    def _hash_favor(self, seat: int, geishas: int) -> None:
+        """青睞遮罩改變時更新鍵 (geishas 為改變的位元)"""
+        table = self.zobrist.favor[seat]
+        key = self.zobrist_material
+        for geisha in iter_bits(geishas):
+            key ^= table[geisha]
+        self.zobrist_material = key
+
+    # ---- 查詢 ----
+
+    @property
+    def to_move(self) -> int:
+        """下一個需要做決定的座位"""
+        if self.phase == PHASE_RESPOND:
+            return 1 - self.current
+        return self.current
+
+    @property
+    def is_finished(self) -> bool:
+        return self.phase == PHASE_FINISHED
+
+    def has_used(self, seat: int, action: ActionType) -> bool:
+        """行動標記是否已使用"""
+        return bool(self.used[seat] & ACTION_BITS[action])
+
+    def influence(self, geisha: int, seat: int) -> int:
+        """玩家在某位藝妓前的禮物卡數量"""
+        return self.counts[geisha * 2 + seat]
+
+    def geisha_count(self, seat: int) -> int:
+        """玩家獲得青睞的藝妓數"""
+        return self.favor[seat].bit_count()
+
+    def charm_total(self, seat: int) -> int:
+        """玩家獲得青睞藝妓的魅力總和"""
+        return self.layout.charm_by_favor[self.favor[seat]]
+
+    def favored_seat(self, geisha: int) -> int:
+        """藝妓青睞的座位，中立時為 NO_WINNER"""
+        return _favored_seat(self.favor, geisha)
+
+    def projected_favored_seat(self, geisha: int) -> int:
+        """若回合此刻結束，藝妓青睞的座位"""
+        return _favored_seat(self.projected, geisha)
+
+    def projected_geisha_count(self, seat: int) -> int:
+        """若回合此刻結束，玩家獲得青睞的藝妓數"""
+        return self.projected[seat].bit_count()
+
+    def projected_charm_total(self, seat: int) -> int:
+        """若回合此刻結束，玩家的魅力總和"""
+        return self.layout.charm_by_favor[self.projected[seat]]
+
+    def projected_winner(self) -> int:
+        """若回合此刻結束的勝者 (不含尚未翻開的秘密卡)"""
+        return self._winner_of(self.projected)
+
+    def card_seat(self, card: int) -> int:
+        """持有 (手牌/秘密/已分配/棄置) 某張卡的座位，沒有時為 NO_WINNER"""
+        bit = 1 << card
+        for seat in (0, 1):
+            if (self.hands[seat] | self.secrets[seat] | self.allocated[seat] | self.discards[seat]) & bit:
+                return seat
+        return NO_WINNER
+
+    # ---- 低階卡牌操作 ----
+
+    def allocate(self, cards: int, seat: int) -> None:
+        """將卡牌分配到玩家在藝妓前的區域，並增量更新影響力計數"""
+        if self.zobrist is not None:
+            self._hash_cards(0, self.hands[0] & cards)
+            self._hash_cards(1, self.hands[1] & cards)
+            self._hash_cards(2 + seat, self.secrets[seat] & cards)
+            self._hash_cards(6 + seat, cards & ~self.allocated[seat])
+        self.hands[0] &= ~cards
+        self.hands[1] &= ~cards
+        self.secrets[seat] &= ~cards
+        cards &= ~self.allocated[seat]
+        self.allocated[seat] |= cards
+
+        card_geisha = self.layout.card_geisha
+        while cards:
+            low = cards & -cards
+            cards ^= low
+            geisha = card_geisha[low.bit_length() - 1]
+            self.counts[geisha * 2 + seat] += 1
+            self._project(geisha)
+
+    def _project(self, geisha: int) -> None:
+        """依計數更新單一藝妓的預估青睞，平手時為中立"""
+        mine = self.counts[geisha * 2]
+        theirs = self.counts[geisha * 2 + 1]
+        bit = 1 << geisha
+        projected = self.projected
+        if mine > theirs:
+            projected[0] |= bit
+            projected[1] &= ~bit
+        elif theirs > mine:
+            projected[1] |= bit
+            projected[0] &= ~bit
+        else:
+            projected[0] &= ~bit
+            projected[1] &= ~bit
+
+    def keep_secret(self, cards: int, seat: int) -> None:
+        """將卡牌面朝下保留"""
+        if self.zobrist is not None:
+            self._hash_cards(seat, self.hands[seat] & cards)
+            self._hash_cards(2 + seat, cards & ~self.secrets[seat])
+        self.hands[seat] &= ~cards
+        self.secrets[seat] |= cards
+
+    def discard(self, cards: int, seat: int) -> None:
+        """棄置卡牌 (不影響任何藝妓的計數)"""
+        if self.zobrist is not None:
+            self._hash_cards(seat, self.hands[seat] & cards)
+            self._hash_cards(4 + seat, cards & ~self.discards[seat])
+        self.hands[seat] &= ~cards
+        self.discards[seat] |= cards
+
+    # ---- 動作 ----
+
+    def apply_action(self, action: ActionType, cards: int, split: int = 0) -> None:
+        """當前玩家執行行動
+
+        競爭時 split 是其中一組兩張卡的遮罩。
+        """
+        self._check_play(action, cards)
+        if action == ActionType.COMPETE and (split & ~cards or split.bit_count() != 2):
+            raise ValueError("競爭必須分成兩組各2張卡牌")
+        seat = self.current
+        used = self.used[seat] | ACTION_BITS[action]
+        if self.zobrist is not None:
+            table = self.zobrist.used[seat]
+            self.zobrist_material ^= table[self.used[seat]] ^ table[used]
+        self.used[seat] = used
+
+        if action == ActionType.SECRET:
+            self.keep_secret(cards, seat)
+            self._end_turn()
+        elif action == ActionType.DISCARD:
+            self.discard(cards, seat)
+            self._end_turn()
+        else:
+            if self.zobrist is not None:
+                self._hash_cards(seat, cards)
+                self._hash_cards(8, cards)
+                if action == ActionType.COMPETE:
+                    self._hash_cards(9, split)
+            if action == ActionType.COMPETE:
+                self.pending_split = split
+            self.hands[seat] &= ~cards
+            self.pending_action = action
+            self.pending_offer = cards
+            self.phase = PHASE_RESPOND
+
+    def respond(self, chosen: int) -> None:
+        """對手從獻禮/競爭中選擇卡牌"""
+        if self.phase != PHASE_RESPOND:
+            raise ValueError("目前沒有等待回應的行動")
+
+        offer = self.pending_offer
+        if self.pending_action == ActionType.GIFT:
+            if chosen & ~offer or chosen.bit_count() != 1:
+                raise ValueError("獻禮必須從展示的3張卡牌中選擇1張")
+        elif chosen != self.pending_split and chosen != offer ^ self.pending_split:
+            raise ValueError("競爭必須選擇其中一組卡牌")
+
+        seat = self.current
+        self.allocate(chosen, 1 - seat)
+        self.allocate(offer & ~chosen, seat)
+        self._clear_pending()
+        self.phase = PHASE_ACTION
+        self._end_turn()
+
+    def _check_play(self, action: ActionType, cards: int) -> None:
+        if self.phase != PHASE_ACTION:
+            raise ValueError("遊戲不在等待行動的階段")
+        seat = self.current
+        if self.used[seat] & ACTION_BITS[action]:
+            raise ValueError("此行動標記已使用")
+        if cards.bit_count() != ACTION_CARD_COUNTS[action]:
+            raise ValueError(f"{action.name} 必須選擇 {ACTION_CARD_COUNTS[action]} 張卡牌")
+        if cards & ~self.hands[seat]:
+            raise ValueError("選擇的卡牌不在手牌中")
+
+    def _clear_pending(self) -> None:
+        if self.zobrist is not None:
+            self._hash_cards(8, self.pending_offer)
+            self._hash_cards(9, self.pending_split)
+        self.pending_action = None
+        self.pending_offer = 0
+        self.pending_split = 0
+
+    def _end_turn(self) -> None:
+        """結束回合：雙方都用完四個行動時結算，否則換人抽牌"""
+        if self.used[0] == ALL_ACTIONS_MASK and self.used[1] == ALL_ACTIONS_MASK:
+            self._end_round()
+            return
+        self.current = 1 - self.current
+        self._draw()
+
+    def _end_round(self) -> None:
+        """翻開秘密卡、判定青睞並檢查勝負"""
+        for seat in (0, 1):
+            self.allocate(self.secrets[seat], seat)
+
+        # 計數已含翻開的秘密卡，預估青睞即為本回合結果
+        if self.zobrist is not None:
+            for seat in (0, 1):
+                self._hash_favor(seat, self.favor[seat] ^ self.projected[seat])
+        self.favor[:] = self.projected
+
+        winner = self._winner_of(self.favor)
+        if winner != NO_WINNER:
+            self.winner = winner
+            self.phase = PHASE_FINISHED
+            return
+
+        self.round_number += 1
+        self.round_starter = 1 - self.round_starter
+        if self.stop_at_round_end:
+            return
+        order = list(range(self.layout.card_count))
+        (self.rng or random).shuffle(order)
+        self.deal(order)
+
+    def settle_favor(self, geisha: int) -> None:
+        """依雙方禮物卡數量判定藝妓青睞，平手時為中立"""
+        self._project(geisha)
+        bit = 1 << geisha
+        for seat in (0, 1):
+            favor = (self.favor[seat] & ~bit) | (self.projected[seat] & bit)
+            if self.zobrist is not None:
+                self._hash_favor(seat, self.favor[seat] ^ favor)
+            self.favor[seat] = favor
+
+    def set_favor(self, geisha: int, seat: int) -> None:
+        """直接設定藝妓青睞 (NO_WINNER 表示中立)"""
+        bit = 1 << geisha
+        if self.zobrist is not None:
+            for other in (0, 1):
+                if (self.favor[other] & bit) != (bit if other == seat else 0):
+                    self._hash_favor(other, bit)
+        self.favor[0] &= ~bit
+        self.favor[1] &= ~bit
+        if seat != NO_WINNER:
+            self.favor[seat] |= bit
+        self._project(geisha)
+
+    def _winner_of(self, favor) -> int:
+        """依規則判定勝者：同時達成時比較藝妓數，再比較魅力值"""
+        charm_by_favor = self.layout.charm_by_favor
+        geishas0, geishas1 = favor[0].bit_count(), favor[1].bit_count()
+        charm0, charm1 = charm_by_favor[favor[0]], charm_by_favor[favor[1]]
+        reached0 = charm0 >= WIN_CHARM or geishas0 >= WIN_GEISHA_COUNT
+        reached1 = charm1 >= WIN_CHARM or geishas1 >= WIN_GEISHA_COUNT
+        if reached0 and reached1:
+            if (geishas0, charm0) == (geishas1, charm1):
+                return NO_WINNER
+            return 0 if (geishas0, charm0) > (geishas1, charm1) else 1
+        if reached0:
+            return 0
+        if reached1:
+            return 1
+        return NO_WINNER
+
+    # ---- 複製 ----
+
+    def copy(self, rng: Optional[random.Random] = None) -> 'GameState':
+        """複製狀態 (供搜尋/模擬使用)"""
+        other = GameState.__new__(GameState)
+        other.layout = self.layout
+        other.rng = rng
+        other.order = self.order
+        other.draw_pos = self.draw_pos
+        other.removed = self.removed
+        other.hands = self.hands[:]
+        other.secrets = self.secrets[:]
+        other.discards = self.discards[:]
+        other.allocated = self.allocated[:]
+        other.used = self.used[:]
+        other.favor = self.favor[:]
+        other.counts = self.counts[:]
+        other.projected = self.projected[:]
+        other.current = self.current
+        other.round_starter = self.round_starter
+        other.round_number = self.round_number
+        other.phase = self.phase
+        other.pending_action = self.pending_action
+        other.pending_offer = self.pending_offer
+        other.pending_split = self.pending_split
+        other.winner = self.winner
+        other.stop_at_round_end = self.stop_at_round_end
+        other.zobrist = self.zobrist
+        other.zobrist_material = self.zobrist_material
+        return other
@@ -0,0 +1,96 @@
+"""動作驗證 - 以位元遮罩在常數時間內完成完整的規則檢查"""
+
+from typing import List, Optional, Sequence
+
+from .layout import DeckLayout
+from .state import ACTION_BITS, ACTION_CARD_COUNTS, PHASE_FINISHED, PHASE_RESPOND, GameState
+from ..enums.game_enums import ActionErrorCode, ActionType
+
+# 回應獻禮/競爭時需要選擇的卡牌數
+RESPONSE_CARD_COUNTS = {
+    ActionType.GIFT: 1,
+    ActionType.COMPETE: 2,
+}
+
+
+class ActionValidationError(ValueError):
+    """動作驗證失敗 (附帶錯誤代碼)"""
+
+    def __init__(self, code: ActionErrorCode, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+    def to_dict(self) -> dict:
+        return {"error": self.code.value, "message": self.message}
+
+
+def resolve_cards(layout: DeckLayout, card_ids: Sequence[str]) -> int:
+    """將卡牌ID轉換為位元遮罩 (卡牌ID固定對應牌組索引，與遊戲無關)"""
+    card_index = layout.card_index
+    mask = 0
+    for card_id in card_ids:
+        index = card_index.get(card_id)
+        if index is None:
+            raise ActionValidationError(ActionErrorCode.UNKNOWN_CARD, f"無效的卡牌ID: {card_id}")
+        bit = 1 << index
+        if mask & bit:
+            raise ActionValidationError(ActionErrorCode.DUPLICATE_CARD, f"卡牌ID重複: {card_id}")
+        mask |= bit
+    return mask
+
+
+def validate_turn(state: GameState, seat: int) -> None:
+    """檢查遊戲是否進行中，以及是否輪到該座位"""
+    if state.phase == PHASE_FINISHED:
+        raise ActionValidationError(ActionErrorCode.GAME_FINISHED, "遊戲已結束")
+    if seat != state.to_move:
+        raise ActionValidationError(ActionErrorCode.NOT_YOUR_TURN, "不是當前玩家的回合")
+
+
+def validate_action(state: GameState, seat: int, action: ActionType, cards: int,
+                    split: int = 0, target_geisha: Optional[int] = None) -> None:
+    """驗證行動 (秘密保留/棄牌/獻禮/競爭)"""
+    validate_turn(state, seat)
+    if state.phase == PHASE_RESPOND:
+        raise ActionValidationError(ActionErrorCode.RESPONSE_REQUIRED, "必須先回應對手的獻禮或競爭")
+    if state.used[seat] & ACTION_BITS[action]:
+        raise ActionValidationError(ActionErrorCode.ACTION_ALREADY_USED, f"{action.name} 行動標記已使用")
+
+    expected = ACTION_CARD_COUNTS[action]
+    if cards.bit_count() != expected:
+        raise ActionValidationError(ActionErrorCode.WRONG_CARD_COUNT, f"{action.name} 必須選擇 {expected} 張卡牌")
+    if cards & ~state.hands[seat]:
+        raise ActionValidationError(ActionErrorCode.CARD_NOT_IN_HAND, "選擇的卡牌不在手牌中")
+
+    if action == ActionType.COMPETE and (split & ~cards or split.bit_count() != 2):
+        raise ActionValidationError(ActionErrorCode.INVALID_GROUPING, "競爭必須分成兩組各2張卡牌")
+    if target_geisha is not None and not 0 <= target_geisha < state.layout.geisha_count:
+        raise ActionValidationError(ActionErrorCode.UNKNOWN_GEISHA, "無效的藝妓ID")
+
+
+def validate_response(state: GameState, seat: int, action: ActionType, chosen: int) -> None:
+    """驗證對獻禮/競爭的回應"""
+    validate_turn(state, seat)
+    if state.phase != PHASE_RESPOND or action != state.pending_action:
+        raise ActionValidationError(ActionErrorCode.RESPONSE_REQUIRED, "必須回應對手的獻禮或競爭")
+
+    expected = RESPONSE_CARD_COUNTS[action]
+    if chosen.bit_count() != expected:
+        raise ActionValidationError(ActionErrorCode.WRONG_CARD_COUNT, f"回應 {action.name} 必須選擇 {expected} 張卡牌")
+    if action == ActionType.GIFT:
+        if chosen & ~state.pending_offer:
+            raise ActionValidationError(ActionErrorCode.INVALID_RESPONSE, "必須從展示的3張卡牌中選擇")
+    elif chosen != state.pending_split and chosen != state.pending_offer ^ state.pending_split:
+        raise ActionValidationError(ActionErrorCode.INVALID_RESPONSE, "必須選擇其中一組卡牌")
+
+
+def resolve_split(layout: DeckLayout, cards: int, groupings: Optional[List[List[str]]]) -> int:
+    """將競爭分組轉換為第一組的遮罩，並確認兩組恰好涵蓋所選卡牌"""
+    if not groupings or len(groupings) != 2:
+        raise ActionValidationError(ActionErrorCode.INVALID_GROUPING, "競爭必須提供兩組卡牌分組")
+    first = resolve_cards(layout, groupings[0])
+    second = resolve_cards(layout, groupings[1])
+    if first & second or first | second != cards or first.bit_count() != 2:
+        raise ActionValidationError(ActionErrorCode.INVALID_GROUPING, "競爭分組必須是所選4張卡牌的兩組各2張")
+    return first
@@ -0,0 +1,77 @@
+"""Zobrist 雜湊 - 以64位元鍵識別局面 (供置換表使用)
+
+鍵值以固定種子產生，同一佈局在任何行程中都得到相同的雜湊。
+GameState 啟用鍵值表後自行保存卡牌、行動標記、青睞與牌庫部分的鍵，
+每次移動卡牌、抽牌或結算時只 XOR 變動的位元；回合資訊 (階段、當前玩家、待回應的行動)
+只有一項，取鍵時再合併。被移除的卡不影響本回合剩餘的結果，因此不納入雜湊；
+尚未抽出的牌依 (牌組位置, 卡牌) 納入 (牌庫抽完時與只看卡牌位置的雜湊相同)。
+"""
+
+import random
+from functools import lru_cache
+from typing import List, Tuple
+
+from .layout import DeckLayout
+from .state import ALL_ACTIONS_MASK, GameState, iter_bits
+
+ZOBRIST_SEED = 0x5A0B
+# 卡牌所在區域：手牌、秘密卡、棄牌、已分配 (各兩座位) 與展示中的獻禮/競爭
+CARD_ZONES = 10
+
+
+class ZobristKeys:
+    """某佈局的 Zobrist 鍵值表"""
+
+    def __init__(self, layout: DeckLayout):
+        rng = random.Random(ZOBRIST_SEED)
+        self.cards: Tuple[Tuple[int, ...], ...] = tuple(
+            tuple(rng.getrandbits(64) for _ in range(layout.card_count)) for _ in range(CARD_ZONES)
+        )
+        self.used: Tuple[Tuple[int, ...], ...] = tuple(
+            tuple(rng.getrandbits(64) for _ in range(ALL_ACTIONS_MASK + 1)) for _ in range(2)
+        )
+        self.favor: Tuple[Tuple[int, ...], ...] = tuple(
+            tuple(rng.getrandbits(64) for _ in range(layout.geisha_count)) for _ in range(2)
+        )
+        # (階段, 當前玩家, 待回應的行動) 的組合
+        self.turn: Tuple[int, ...] = tuple(rng.getrandbits(64) for _ in range(3 * 2 * 5))
+        # 牌庫中 (牌組位置, 卡牌) 的組合
+        self.deck: Tuple[Tuple[int, ...], ...] = tuple(
+            tuple(rng.getrandbits(64) for _ in range(layout.card_count)) for _ in range(layout.card_count)
+        )
+
+    def material(self, state: GameState) -> int:
+        """卡牌位置、行動標記、青睞與牌庫的鍵 (GameState 增量維護的部分)"""
+        zones: List[int] = [
+            state.hands[0], state.hands[1], state.secrets[0], state.secrets[1],
+            state.discards[0], state.discards[1], state.allocated[0], state.allocated[1],
+            state.pending_offer, state.pending_split,
+        ]
+        key = 0
+        for zone, mask in enumerate(zones):
+            table = self.cards[zone]
+            for card in iter_bits(mask):
+                key ^= table[card]
+        for seat in (0, 1):
+            key ^= self.used[seat][state.used[seat]]
+            table = self.favor[seat]
+            for geisha in iter_bits(state.favor[seat]):
+                key ^= table[geisha]
+        for pos in range(state.draw_pos, len(state.order) - 1):
+            key ^= self.deck[pos][state.order[pos]]
+        return key
+
+    def turn_key(self, state: GameState) -> int:
+        """(階段, 當前玩家, 待回應的行動) 的鍵"""
+        pending = 0 if state.pending_action is None else state.pending_action.value + 1
+        return self.turn[(state.phase * 2 + state.current) * 5 + pending]
+
+    def hash(self, state: GameState) -> int:
+        """從頭計算完整雜湊 (與 GameState.zobrist_key 增量維護的結果相同)"""
+        return self.material(state) ^ self.turn_key(state)
+
+
+@lru_cache(maxsize=None)
+def zobrist_keys(layout: DeckLayout) -> ZobristKeys:
+    """取得佈局對應的鍵值表 (每個佈局只建立一次)"""
+    return ZobristKeys(layout)
@@ -1,61 +1,66 @@
 """卡牌相關領域實體"""
-import uuid
-from datetime import datetime
-from typing import Optional, List, TYPE_CHECKING
+from typing import Optional, List, Tuple, TYPE_CHECKING
 
 # 只在類型檢查時導入，避免運行時循環導入
 if TYPE_CHECKING:
+    from .game import Game
     from .user import Player
 
+from ..engine.state import NO_WINNER
 from ..enums.card_enums import CardStatus
 from ..enums.game_enums import ActionType
 
 
 class Geisha:
-    """藝妓領域實體"""
+    """藝妓領域實體 (青睞與影響力由遊戲狀態提供)"""
+
+    __slots__ = ("id", "name", "charm", "description", "gift_item", "index", "_game")
 
     def __init__(self, geisha_id: str, name: str, charm: int,
-                 description: str, gift_item: str, gift_count: int):
+                 description: str, gift_item: str, gift_count: int, index: int = 0):
         self.id = geisha_id
         self.name = name
         self.charm = charm
         self.description = description
         self.gift_item = gift_item
-        self.favored_player: Optional['Player'] = None
+        self.index = index
+        self._game: Optional['Game'] = None
+
+    def bound_to(self, game: 'Game') -> 'Geisha':
+        """建立綁定到指定遊戲狀態的藝妓視圖"""
+        geisha = Geisha.__new__(Geisha)
+        geisha.id = self.id
+        geisha.name = self.name
+        geisha.charm = self.charm
+        geisha.description = self.description
+        geisha.gift_item = self.gift_item
+        geisha.index = self.index
+        geisha._game = game
+        return geisha
+
+    @property
+    def game(self) -> Optional['Game']:
+        """此藝妓視圖綁定的遊戲 (未綁定的原型為 None)"""
+        return self._game
+
+    @property
+    def favored_player(self) -> Optional['Player']:
+        """青睞的玩家"""
+        seat = self._game.state.favored_seat(self.index)
+        return None if seat == NO_WINNER else self._game.players[seat]
 
     def set_favor(self, player: Optional['Player']) -> None:
         """設定青睞的玩家"""
-        self.favored_player = player
+        self._game.state.set_favor(self.index, NO_WINNER if player is None else player.seat)
 
-    def calculate_influence(self, player: 'Player', all_cards: List['GiftCard']) -> int:
+    def calculate_influence(self, player: 'Player', all_cards: Optional[List['GiftCard']] = None) -> int:
         """計算玩家對此藝妓的影響力"""
-        return len([
-            card for card in all_cards
-            if (card.geisha_id == self.id and
-                card.owner_name == player.name and
-                card.status == CardStatus.ALLOCATED)
-        ])
-
-    def determine_favor(self, players: List['Player'], all_cards: List['GiftCard']) -> None:
-        """決定青睞歸屬"""
-        influence_counts = {}
-
-        # 計算每個玩家的影響力
-        for player in players:
-            count = self.calculate_influence(player, all_cards)
-            if count > 0:
-                influence_counts[player] = count
-
-        if not influence_counts:
-            self.favored_player = None
-            return
-
-        # 找出最高影響力
-        max_count = max(influence_counts.values())
-        players_with_max = [p for p, count in influence_counts.items() if count == max_count]
+        return self._game.state.influence(self.index, player.seat)
 
-        # 如果有平手，則無人獲得青睞
-        self.favored_player = players_with_max[0] if len(players_with_max) == 1 else None
+    def determine_favor(self, players: Optional[List['Player']] = None,
+                        all_cards: Optional[List['GiftCard']] = None) -> None:
+        """決定青睞歸屬"""
+        self._game.state.settle_favor(self.index)
 
     def is_neutral(self) -> bool:
         """是否中立"""
@@ -70,30 +75,71 @@ class Geisha:
 
 
 class GiftCard:
-    """禮物卡領域實體"""
-
-    def __init__(self, geisha_id: str, item_name: str, charm_value: int):
-        self.card_id = str(uuid.uuid4())  # 添加唯一ID
-        self.geisha_id = geisha_id
-        self.item_name = item_name
-        self.charm_value = charm_value
-        self.status = CardStatus.IN_DECK
-        self.owner_name: Optional[str] = None
-        self.original_owner_name: Optional[str] = None
-        self.allocated_by_action: Optional[ActionType] = None
-        self.allocation_time: Optional[datetime] = None
-        self.created_time = datetime.now()
+    """禮物卡領域實體 (遊戲狀態中固定卡牌索引的視圖)"""
+
+    __slots__ = ("_game", "index")
+
+    def __init__(self, game: 'Game', index: int):
+        self._game = game
+        self.index = index
+
+    @property
+    def card_id(self) -> str:
+        return self._game.state.layout.card_ids[self.index]
+
+    @property
+    def geisha_id(self) -> str:
+        layout = self._game.state.layout
+        return layout.geisha_ids[layout.card_geisha[self.index]]
+
+    @property
+    def item_name(self) -> str:
+        return self._game.state.layout.card_names[self.index]
+
+    @property
+    def charm_value(self) -> int:
+        return self._game.state.layout.card_charm(self.index)
+
+    @property
+    def status(self) -> CardStatus:
+        return self._locate()[0]
+
+    @property
+    def owner(self) -> Optional['Player']:
+        seat = self._locate()[1]
+        return None if seat == NO_WINNER else self._game.players[seat]
+
+    @property
+    def owner_name(self) -> Optional[str]:
+        owner = self.owner
+        return owner.name if owner else None
+
+    def _locate(self) -> Tuple[CardStatus, int]:
+        """從位元遮罩找出卡牌狀態與持有座位"""
+        state = self._game.state
+        bit = 1 << self.index
+        if state.removed & bit:
+            return CardStatus.REMOVED, NO_WINNER
+        for seat in (0, 1):
+            if state.hands[seat] & bit:
+                return CardStatus.IN_HAND, seat
+            if state.secrets[seat] & bit:
+                return CardStatus.SECRET, seat
+            if state.allocated[seat] & bit:
+                return CardStatus.ALLOCATED, seat
+            if state.discards[seat] & bit:
+                return CardStatus.DISCARDED, seat
+        if state.pending_offer & bit:
+            # 展示給對手、等待選擇中的卡牌
+            return CardStatus.IN_HAND, state.current
+        return CardStatus.IN_DECK, NO_WINNER
 
     def allocate_to_player(self, player: 'Player', action_type: ActionType) -> None:
         """將卡片分配給玩家"""
-        self.owner_name = player.name
-        self.allocated_by_action = action_type
-        self.allocation_time = datetime.now()
-
         if action_type == ActionType.SECRET:
-            self.status = CardStatus.SECRET
+            self._game.state.keep_secret(1 << self.index, player.seat)
         else:
-            self.status = CardStatus.ALLOCATED
+            self._game.state.allocate(1 << self.index, player.seat)
 
     def mark_as_secret(self, player: 'Player') -> None:
         """標記為秘密保留"""
@@ -101,12 +147,13 @@ class GiftCard:
 
     def discard(self) -> None:
         """棄置卡片"""
-        self.status = CardStatus.DISCARDED
-        self.allocation_time = datetime.now()
+        seat = self._locate()[1]
+        state = self._game.state
+        state.discard(1 << self.index, state.current if seat == NO_WINNER else seat)
 
     def is_owned_by(self, player: 'Player') -> bool:
         """檢查是否被特定玩家持有"""
-        return self.owner_name == player.name
+        return self._locate()[1] == player.seat
 
     def is_in_hand(self) -> bool:
         """檢查是否在手牌中"""
@@ -137,10 +184,14 @@ class GiftCard:
         return status_descriptions.get(self.status, "未知狀態")
 
     def clone(self) -> 'GiftCard':
-        """克隆卡片"""
-        new_card = GiftCard(self.geisha_id, self.item_name, self.charm_value)
-        new_card.id = str(uuid.uuid4())  # 新的ID
-        return new_card
+        """克隆卡片 (同一卡牌索引的新視圖)"""
+        return GiftCard(self._game, self.index)
+
+    def __eq__(self, other):
+        return isinstance(other, GiftCard) and other._game is self._game and other.index == self.index
+
+    def __hash__(self):
+        return hash((id(self._game), self.index))
 
     def __repr__(self):
-        return f"GiftCard(item='{self.item_name}', charm={self.charm_value}, status={self.status.value})"
\ No newline at end of file
+        return f"GiftCard(item='{self.item_name}', charm={self.charm_value}, status={self.status.value})"
@@ -1,27 +1,126 @@
 """遊戲相關領域實體"""
 
-from datetime import datetime
-from typing import List
+from typing import List, Optional, Sequence, Tuple
 
 from .card import Geisha, GiftCard
+from .timestamps import LazyTimestamp, now
 from .user import Player
+from ..engine.moves import Move
+from ..engine.replay import replay
+from ..engine.state import GameState, NO_WINNER, PHASE_RESPOND
 from ..enums.game_enums import GameStatus, ActionType
 
 
 class Game:
-    """遊戲領域實體"""
+    """遊戲領域實體 (位元棋盤狀態的視圖)"""
 
-    def __init__(self, game_id: str, player1: 'Player', player2: 'Player'):
+    __slots__ = (
+        "game_id", "player1", "player2", "state", "players", "_created_at", "seed",
+        "_geisha_prototypes", "_geishas", "actions", "version_base",
+    )
+    created_at = LazyTimestamp()
+
+    def __init__(self, game_id: str, player1: 'Player', player2: 'Player', state: GameState):
         self.game_id = game_id
         self.player1 = player1
         self.player2 = player2
-        self.status = GameStatus.INITIALIZING
-        self.current_player = player1
-        self.round_number = 1
-        self.created_at = datetime.now()
+        self.state = state
+        self.players: Tuple['Player', 'Player'] = (player1, player2)
+        self._created_at = now()
+        # 洗牌種子 (與 actions 一起即可重建狀態)
+        self.seed: Optional[int] = None
+        self._geisha_prototypes: Sequence['Geisha'] = ()
+        self._geishas: Optional[List['Geisha']] = None
+        # 依序套用過的動作 (回應記錄為 (None, 選擇遮罩, 0))
+        self.actions: List[Move] = []
+        # 目前這副牌第一個動作之前的版本 (重置遊戲後從重置前的版本繼續累加)
+        self.version_base = 0
+
+        player1.bind(self, 0)
+        player2.bind(self, 1)
+
+    @property
+    def status(self) -> GameStatus:
+        if not self.state.order:
+            return GameStatus.INITIALIZING
+        if self.state.is_finished:
+            return GameStatus.FINISHED
+        return GameStatus.IN_PROGRESS
+
+    @property
+    def current_player(self) -> 'Player':
+        return self.players[self.state.current]
+
+    @property
+    def round_number(self) -> int:
+        return self.state.round_number
+
+    @property
+    def version(self) -> int:
+        """狀態版本 (每套用一個動作加一，只增不減)"""
+        return self.version_base + len(self.actions)
+
+    @property
+    def winner(self) -> Optional['Player']:
+        seat = self.state.winner
+        return None if seat == NO_WINNER else self.players[seat]
+
+    @property
+    def geishas(self) -> List['Geisha']:
+        """綁定到此遊戲的藝妓 (首次存取時才建立視圖)"""
+        if self._geishas is None:
+            self._geishas = [geisha.bound_to(self) for geisha in self._geisha_prototypes]
+        return self._geishas
+
+    @geishas.setter
+    def geishas(self, geishas: Sequence['Geisha']) -> None:
+        self._geisha_prototypes = geishas
+        self._geishas = None
+
+    @property
+    def all_cards(self) -> List['GiftCard']:
+        """依牌組順序列出所有卡牌"""
+        return [GiftCard(self, index) for index in self.state.order]
+
+    def card(self, index: int) -> 'GiftCard':
+        """取得指定索引的卡牌"""
+        return GiftCard(self, index)
 
-        self.geishas: List['Geisha'] = []
-        self.all_cards: List['GiftCard'] = []
+    def play(self, move: Move) -> None:
+        """套用動作 (行動或回應) 並記錄到動作序列"""
+        action, cards, split = move
+        if self.state.phase == PHASE_RESPOND:
+            self.state.respond(cards)
+            self.actions.append((None, cards, 0))
+        else:
+            self.state.apply_action(action, cards, split)
+            self.actions.append(move)
 
+    def restart(self, state: GameState, seed: int) -> None:
+        """以重新發好的牌從頭開始 (玩家不變，版本接續目前的版本加一)"""
+        self.version_base = self.version + 1
+        self.state = state
+        self.seed = seed
+        self.actions = []
+        self.geishas = self._geisha_prototypes
 
+    def replay(self, upto: Optional[int] = None) -> 'Game':
+        """從種子與動作記錄重建遊戲副本 (upto 指定只重播前幾個動作)"""
+        if self.seed is None:
+            raise ValueError("遊戲沒有記錄種子，無法重播")
+        actions = self.actions[:upto]
+        state = replay(self.state.layout, self.seed, actions)
+        game = Game(self.game_id, Player(self.player1.id, self.player1.name),
+                    Player(self.player2.id, self.player2.name), state)
+        game._created_at = self._created_at
+        game.seed = self.seed
+        game.geishas = self._geisha_prototypes
+        game.actions = actions
+        game.version_base = self.version_base
+        return game
 
+    def player_by_id(self, player_id: str) -> Optional['Player']:
+        for player in self.players:
+            if player.id == player_id:
+                return player
+        return None
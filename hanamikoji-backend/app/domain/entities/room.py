@@ -3,17 +3,31 @@
 from datetime import datetime
 from typing import List, Optional, Dict
 import uuid
-from dataclasses import dataclass, field
+
+from .timestamps import LazyTimestamp, now, to_seconds
 
 
-@dataclass
 class RoomPlayer:
     """房間中的玩家"""
-    player_id: str
-    player_name: str
-    status: str = "waiting"  # waiting, ready, playing, disconnected
-    joined_at: datetime = field(default_factory=datetime.now)
-    last_seen: datetime = field(default_factory=datetime.now)
+
+    __slots__ = ("player_id", "player_name", "status", "is_bot", "_joined_at", "_last_seen")
+    joined_at = LazyTimestamp()
+    last_seen = LazyTimestamp()
+
+    def __init__(self, player_id: str, player_name: str, status: str = "waiting",
+                 joined_at: Optional[datetime] = None, last_seen: Optional[datetime] = None,
+                 is_bot: bool = False):
+        self.player_id = player_id
+        self.player_name = player_name
+        self.status = status  # waiting, ready, playing, disconnected
+        self.is_bot = is_bot
+        created = now()
+        self._joined_at = to_seconds(joined_at, created)
+        self._last_seen = to_seconds(last_seen, created)
+
+    def touch(self) -> None:
+        """更新最後活動時間"""
+        self._last_seen = now()
 
     def to_dict(self) -> Dict:
         """轉換為字典格式"""
@@ -21,24 +35,48 @@ class RoomPlayer:
             "player_id": self.player_id,
             "player_name": self.player_name,
             "status": self.status,
+            "is_bot": self.is_bot,
             "joined_at": self.joined_at.isoformat(),
             "last_seen": self.last_seen.isoformat()
         }
 
+    def __repr__(self):
+        return f"RoomPlayer(player_id='{self.player_id}', status='{self.status}')"
+
 
-@dataclass
 class Room:
     """房間實體"""
-    room_id: str = field(default_factory=lambda: f"room_{uuid.uuid4().hex[:8]}")
-    status: str = "waiting"  # waiting, starting, playing, finished, abandoned
-    players: List[RoomPlayer] = field(default_factory=list)
-    max_players: int = 2
-    game_id: Optional[str] = None
-    created_at: datetime = field(default_factory=datetime.now)
-    started_at: Optional[datetime] = None
-    finished_at: Optional[datetime] = None
+
+    __slots__ = ("room_id", "status", "players", "max_players", "game_id", "version",
+                 "_created_at", "_started_at", "_finished_at")
+    created_at = LazyTimestamp()
+    started_at = LazyTimestamp()
+    finished_at = LazyTimestamp()
+
+    def __init__(self, room_id: Optional[str] = None, status: str = "waiting",
+                 players: Optional[List[RoomPlayer]] = None, max_players: int = 2,
+                 game_id: Optional[str] = None, created_at: Optional[datetime] = None,
+                 started_at: Optional[datetime] = None, finished_at: Optional[datetime] = None,
+                 version: int = 0):
+        self.room_id = room_id or f"room_{uuid.uuid4().hex[:8]}"
+        self.status = status  # waiting, starting, playing, finished, abandoned
+        self.players: List[RoomPlayer] = players if players is not None else []
+        self.max_players = max_players
+        self.game_id = game_id
+        # 狀態版本 (每次變更加一，作為 ETag)
+        self.version = version
+        self._created_at = to_seconds(created_at) if created_at is not None else now()
+        self._started_at = to_seconds(started_at)
+        self._finished_at = to_seconds(finished_at)
+
+    def __repr__(self):
+        return f"Room(room_id='{self.room_id}', status='{self.status}', players={len(self.players)})"
+
+    def bump_version(self) -> None:
+        """標記房間狀態已變更"""
+        self.version += 1
     
-    def add_player(self, player_id: str, player_name: str) -> bool:
+    def add_player(self, player_id: str, player_name: str, is_bot: bool = False) -> bool:
         """添加玩家到房間"""
         if len(self.players) >= self.max_players:
             return False
@@ -47,8 +85,9 @@ class Room:
         if any(p.player_id == player_id for p in self.players):
             return False
             
-        player = RoomPlayer(player_id=player_id, player_name=player_name)
+        player = RoomPlayer(player_id=player_id, player_name=player_name, is_bot=is_bot)
         self.players.append(player)
+        self.bump_version()
         
         # 如果房間滿了，準備開始遊戲
         if len(self.players) == self.max_players:
@@ -61,6 +100,7 @@ class Room:
         for i, player in enumerate(self.players):
             if player.player_id == player_id:
                 self.players.pop(i)
+                self.bump_version()
                 
                 # 如果房間空了，標記為放棄
                 if len(self.players) == 0:
@@ -83,7 +123,8 @@ class Room:
         player = self.get_player(player_id)
         if player:
             player.status = status
-            player.last_seen = datetime.now()
+            player.touch()
+            self.bump_version()
             return True
         return False
     
@@ -104,16 +145,18 @@ class Room:
         if self.can_start_game():
             self.game_id = game_id
             self.status = "playing"
-            self.started_at = datetime.now()
+            self._started_at = now()
             
             # 更新所有玩家狀態為遊戲中
             for player in self.players:
                 player.status = "playing"
+            self.bump_version()
     
     def finish_game(self) -> None:
         """結束遊戲"""
         self.status = "finished"
-        self.finished_at = datetime.now()
+        self._finished_at = now()
+        self.bump_version()
     
     def to_dict(self) -> Dict:
         """轉換為字典格式"""
@@ -125,7 +168,8 @@ class Room:
             "game_id": self.game_id,
             "created_at": self.created_at.isoformat(),
             "started_at": self.started_at.isoformat() if self.started_at else None,
-            "finished_at": self.finished_at.isoformat() if self.finished_at else None
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "version": self.version
         }
     
     @classmethod
@@ -138,7 +182,8 @@ class Room:
             game_id=data.get("game_id"),
             created_at=datetime.fromisoformat(data["created_at"]) if data["created_at"] else datetime.now(),
             started_at=datetime.fromisoformat(data["started_at"]) if data.get("started_at") else None,
-            finished_at=datetime.fromisoformat(data["finished_at"]) if data.get("finished_at") else None
+            finished_at=datetime.fromisoformat(data["finished_at"]) if data.get("finished_at") else None,
+            version=data.get("version", 0)
         )
         
         # 添加玩家
@@ -148,7 +193,8 @@ class Room:
                 player_name=player_data["player_name"],
                 status=player_data.get("status", "waiting"),
                 joined_at=datetime.fromisoformat(player_data["joined_at"]) if player_data.get("joined_at") else datetime.now(),
-                last_seen=datetime.fromisoformat(player_data["last_seen"]) if player_data.get("last_seen") else datetime.now()
+                last_seen=datetime.fromisoformat(player_data["last_seen"]) if player_data.get("last_seen") else datetime.now(),
+                is_bot=player_data.get("is_bot", False)
             )
             room.players.append(player)
         
@@ -0,0 +1,34 @@
+"""延遲轉換的時間戳記
+
+實體建立時只記錄 time.time() 的浮點數，不建立 datetime 物件；讀取屬性時才轉換。
+搭配 __slots__ 使用：屬性 xxx 的值存放在欄位 _xxx (None 表示沒有時間)。
+"""
+
+import time
+from datetime import datetime
+from typing import Optional
+
+now = time.time
+
+
+class LazyTimestamp:
+    """以浮點秒數保存、讀取時轉成 datetime 的描述器"""
+
+    __slots__ = ("slot",)
+
+    def __set_name__(self, owner, name: str) -> None:
+        self.slot = "_" + name
+
+    def __get__(self, obj, owner=None) -> Optional[datetime]:
+        if obj is None:
+            return self
+        value = getattr(obj, self.slot)
+        return None if value is None else datetime.fromtimestamp(value)
+
+    def __set__(self, obj, value: Optional[datetime]) -> None:
+        setattr(obj, self.slot, None if value is None else value.timestamp())
+
+
+def to_seconds(value: Optional[datetime], default: Optional[float] = None) -> Optional[float]:
+    """datetime 轉為浮點秒數 (None 時回傳 default)"""
+    return default if value is None else value.timestamp()
@@ -1,16 +1,23 @@
-from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, TYPE_CHECKING
 
 from app.domain.entities.card import GiftCard
+from app.domain.entities.timestamps import LazyTimestamp, now
+from app.domain.engine.state import iter_bits
 from app.domain.enums.game_enums import ActionType
 
+if TYPE_CHECKING:
+    from app.domain.entities.game import Game
+
 class ActionMarker:
     """行動標記"""
 
+    __slots__ = ("action_type", "is_used", "_used_time", "player_id")
+    used_time = LazyTimestamp()
+
     def __init__(self, action_type: ActionType):
         self.action_type = action_type
         self.is_used = False
-        self.used_time: Optional[datetime] = None
+        self._used_time: Optional[float] = None
         self.player_id: Optional[str] = None
 
 def _initialize_action_markers() -> List['ActionMarker']:
@@ -19,20 +26,51 @@ def _initialize_action_markers() -> List['ActionMarker']:
 
 
 class Player:
-    """玩家領域實體"""
+    """玩家領域實體 (手牌與行動標記由遊戲狀態提供)"""
+
+    __slots__ = ("id", "name", "seat", "_game", "is_active", "_join_time")
+    join_time = LazyTimestamp()
 
     def __init__(self, player_id: str, name: str):
         self.id = player_id
         self.name = name
-        self.hand_cards: List['GiftCard'] = []
-        self.used_actions: List[ActionMarker] = _initialize_action_markers()
-        self.allocated_cards: List['GiftCard'] = []
-        self.secret_cards: List['GiftCard'] = []
-        self.score = 0
+        self.seat = 0
+        self._game: Optional['Game'] = None
         self.is_active = True
-        self.join_time = datetime.now()
+        self._join_time = now()
 
-    def add_card(self, card):
-        self.hand_cards.append(card)
+    def bind(self, game: 'Game', seat: int) -> None:
+        """綁定到遊戲狀態中的座位"""
+        self._game = game
+        self.seat = seat
+
+    def _cards(self, mask: int) -> List['GiftCard']:
+        return [GiftCard(self._game, index) for index in iter_bits(mask)]
 
+    @property
+    def hand_cards(self) -> List['GiftCard']:
+        return self._cards(self._game.state.hands[self.seat])
 
+    @property
+    def allocated_cards(self) -> List['GiftCard']:
+        return self._cards(self._game.state.allocated[self.seat])
+
+    @property
+    def secret_cards(self) -> List['GiftCard']:
+        return self._cards(self._game.state.secrets[self.seat])
+
+    @property
+    def used_actions(self) -> List[ActionMarker]:
+        markers = _initialize_action_markers()
+        for marker in markers:
+            if self._game.state.has_used(self.seat, marker.action_type):
+                marker.is_used = True
+                marker.player_id = self.id
+        return markers
+
+    @property
+    def score(self) -> int:
+        return self._game.state.charm_total(self.seat)
+
+    def add_card(self, card):
+        self._game.state.hands[self.seat] |= 1 << card.index
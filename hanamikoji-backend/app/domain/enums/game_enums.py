@@ -14,3 +14,18 @@ class ActionType(Enum):
     DISCARD = 1     # 棄牌
     GIFT = 2        # 獻禮
     COMPETE = 3     # 競爭
+
+class ActionErrorCode(Enum):
+    """動作驗證錯誤代碼"""
+    GAME_FINISHED = "GAME_FINISHED"              # 遊戲已結束
+    UNKNOWN_PLAYER = "UNKNOWN_PLAYER"            # 玩家不在此遊戲中
+    NOT_YOUR_TURN = "NOT_YOUR_TURN"              # 不是該玩家的回合
+    RESPONSE_REQUIRED = "RESPONSE_REQUIRED"      # 必須先回應獻禮/競爭
+    ACTION_ALREADY_USED = "ACTION_ALREADY_USED"  # 行動標記已使用
+    WRONG_CARD_COUNT = "WRONG_CARD_COUNT"        # 卡牌數量不符
+    UNKNOWN_CARD = "UNKNOWN_CARD"                # 無效的卡牌ID
+    DUPLICATE_CARD = "DUPLICATE_CARD"            # 卡牌ID重複
+    CARD_NOT_IN_HAND = "CARD_NOT_IN_HAND"        # 卡牌不在手牌中
+    INVALID_GROUPING = "INVALID_GROUPING"        # 競爭分組無效
+    INVALID_RESPONSE = "INVALID_RESPONSE"        # 回應的卡牌不在展示的卡牌中
+    UNKNOWN_GEISHA = "UNKNOWN_GEISHA"            # 無效的藝妓ID
@@ -3,14 +3,19 @@
 
 import json
 import random
+import threading
 import uuid
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional
 
+from ..engine.delta import StateSnapshot, card_moves, favor_changes, used_changed_seats
+from ..engine.layout import DeckLayout
+from ..engine.replay import SeededShuffler, new_seed
+from ..engine.state import GameState, NO_WINNER, iter_bits
 from ..entities.card import Geisha, GiftCard
 from ..entities.game import Game
 from ..entities.user import Player
-from ..enums.card_enums import CardStatus
+from .template_registry import TemplateRegistry
 
 
 class GameDataLoader:
@@ -21,9 +26,6 @@ class GameDataLoader:
         self._geisha_templates = None
         self._card_templates = None
 
-        # 確保目錄存在
-        self.data_dir.mkdir(parents=True, exist_ok=True)
-
     def load_geisha_templates(self) -> List[Dict]:
         """載入藝妓模板"""
         if self._geisha_templates is None:
@@ -47,114 +49,104 @@ class GameDataLoader:
         return self._card_templates
 
 
+_registries: Dict[Path, TemplateRegistry] = {}
+_registry_lock = threading.Lock()
+
+
+def get_template_registry(data_dir: str = "app/domain/data") -> TemplateRegistry:
+    """取得模板註冊表 (每個資料目錄在整個行程中只讀檔、解析一次)"""
+    key = Path(data_dir).resolve()
+    registry = _registries.get(key)
+    if registry is None:
+        with _registry_lock:
+            registry = _registries.get(key)
+            if registry is None:
+                loader = GameDataLoader(data_dir)
+                registry = TemplateRegistry(loader.load_geisha_templates(), loader.load_card_templates())
+                _registries[key] = registry
+    return registry
+
+
 class GeishaFactory:
     """藝妓工廠"""
 
-    def __init__(self, data_loader: GameDataLoader):
-        self.data_loader = data_loader
+    def __init__(self, registry: TemplateRegistry):
+        self.registry = registry
 
     def create_all_geishas(self) -> List[Geisha]:
-        """創建所有藝妓實例"""
-        templates = self.data_loader.load_geisha_templates()
-        return [self._create_geisha_from_template(template) for template in templates]
-
-    def _create_geisha_from_template(self, template: Dict) -> Geisha:
-        """從模板創建藝妓"""
-        return Geisha(
-            geisha_id=template["id"],
-            name=template["name"],
-            charm=template["charm_value"],
-            description=f"專精於{template['gift_item']}的優雅藝妓",
-            gift_item=template["gift_item"],
-            gift_count=template["gift_count"],
-        )
+        """取得所有藝妓 (共用的未綁定原型)"""
+        return list(self.registry.geisha_prototypes)
 
 
 class CardFactory:
     """卡牌工廠"""
 
-    def __init__(self, data_loader: GameDataLoader):
-        self.data_loader = data_loader
-
-    def create_shuffled_deck(self) -> List[GiftCard]:
-        """創建洗好的牌組"""
-        cards = self._create_all_gift_cards()
-        random.shuffle(cards)
-        return cards
-
-    def _create_all_gift_cards(self) -> List[GiftCard]:
-        """創建所有禮物卡實例"""
-        card_templates = self.data_loader.load_card_templates()
-        all_cards = []
-
-        for template in card_templates:
-            cards = self._create_cards_from_template(template)
-            all_cards.extend(cards)
-        return all_cards
-
-    def _create_cards_from_template(self, card_template: Dict) -> List[GiftCard]:
-        """從模板創建卡牌"""
-        return [
-            GiftCard(
-                geisha_id=card_template["geisha_id"],
-                item_name=card_template["name"],
-                charm_value=card_template["charm_value"],
-            )
-            for _ in range(card_template["count"])
-        ]
+    def __init__(self, registry: TemplateRegistry):
+        self.registry = registry
+
+    @property
+    def layout(self) -> DeckLayout:
+        """牌組佈局 (卡牌索引表)"""
+        return self.registry.layout
+
+    def create_shuffled_deck(self, rng: Optional[random.Random] = None) -> List[int]:
+        """創建洗好的牌組 (卡牌索引的排列)"""
+        deck = list(self.registry.prototype_deck)
+        (rng or random).shuffle(deck)
+        return deck
 
 
 class GameFactory:
     """遊戲工廠"""
 
     def __init__(self, data_dir: str = "app/domain/data"):
-        data_loader = GameDataLoader(data_dir)
-        self.geisha_factory = GeishaFactory(data_loader)
-        self.card_factory = CardFactory(data_loader)
+        registry = get_template_registry(data_dir)
+        self.geisha_factory = GeishaFactory(registry)
+        self.card_factory = CardFactory(registry)
+
+    def create_new_game(self, player1_name: str, player2_name: str, seed: Optional[int] = None) -> Game:
+        """創建新遊戲
+
+        所有洗牌都使用以 seed 建立的 rng (未指定時隨機產生)，
+        因此 (seed, 動作序列) 即可重建整局 (見 engine.replay)。
+        """
+        if seed is None:
+            seed = new_seed()
+        rng = SeededShuffler(seed)
 
-    def create_new_game(self, player1_name: str, player2_name: str) -> Game:
-        """創建新遊戲"""
         # 1. 創建基本遊戲實例
-        game = self._create_game_instance(player1_name, player2_name)
+        game = self._create_game_instance(player1_name, player2_name, rng)
+        game.seed = seed
 
-        # 2. 設置遊戲內容
-        game.geishas = self.geisha_factory.create_all_geishas()
-        game.all_cards = self.card_factory.create_shuffled_deck()
+        # 2. 設置遊戲內容 (藝妓為共用原型，只需洗牌索引)
+        game.geishas = self.geisha_factory.registry.geisha_prototypes
+        deck = self.card_factory.create_shuffled_deck(rng)
 
         # 3. 分發初始手牌
-        self._deal_initial_cards(game)
+        self._deal_initial_cards(game, deck)
 
         return game
 
-    def _create_game_instance(self, player1_name: str, player2_name: str) -> Game:
+    def create_game_state(self, rng: Optional[random.Random] = None) -> GameState:
+        """創建只有位元棋盤狀態、已發好牌的遊戲 (模擬/搜尋使用)"""
+        state = GameState(self.card_factory.layout, rng)
+        state.deal(self.card_factory.create_shuffled_deck(rng))
+        return state
+
+    def _create_game_instance(self, player1_name: str, player2_name: str,
+                              rng: Optional[SeededShuffler] = None) -> Game:
         """創建遊戲實例"""
         game_id = str(uuid.uuid4())
         player1 = Player(str(uuid.uuid4()), player1_name)
         player2 = Player(str(uuid.uuid4()), player2_name)
-        return Game(game_id, player1, player2)
-
-    def _deal_initial_cards(self, game: Game) -> None:
-        """分發初始手牌"""
-        cards = game.all_cards
+        return Game(game_id, player1, player2, GameState(self.card_factory.layout, rng))
 
-        # 移除一張卡（遊戲規則）
-        if cards:
-            removed_card = cards.pop()
-            removed_card.status = CardStatus.REMOVED
+    def _deal_initial_cards(self, game: Game, deck: List[int]) -> None:
+        """分發初始手牌
 
-        # 分發手牌（每人6張）
-        for i, card in enumerate(cards[:12]):
-            card.status = CardStatus.IN_HAND
-            if i < 6:
-                game.player1.hand_cards.append(card)
-                card.owner_name = game.player1.name
-            else:
-                game.player2.hand_cards.append(card)
-                card.owner_name = game.player2.name
-
-        # 剩餘卡牌留在牌庫
-        for card in cards[12:]:
-            card.status = CardStatus.IN_DECK
+        最後一張卡移出遊戲，每人6張手牌，其餘留在牌庫；先手玩家抽第一張牌。
+        """
+        game.state.deal(deck)
 
 
 class GameInitializationService:
@@ -170,66 +162,142 @@ class GameInitializationService:
 
     def _create_game_state_response(self, game: Game) -> Dict:
         """創建遊戲狀態回應"""
+        state = game.state
+        acting_player = game.players[state.to_move]
+        winner = game.winner
         return {
             "game_id": game.game_id,
-            "status": "PLAYING",  # 使用字串而非枚舉值
-            "current_player_id": game.current_player.id,
+            "status": "FINISHED" if state.is_finished else "PLAYING",  # 使用字串而非枚舉值
+            "current_player_id": acting_player.id,
             "round_number": game.round_number,
             "players": {
-                game.player1.id: self._player_to_dict(game.player1, game.current_player),
-                game.player2.id: self._player_to_dict(game.player2, game.current_player)
+                game.player1.id: self._player_to_dict(game.player1, acting_player),
+                game.player2.id: self._player_to_dict(game.player2, acting_player)
             },
             "geishas": [self._geisha_to_dict(geisha) for geisha in game.geishas],
+            "pending_offer": self._pending_offer_to_dict(game),
             "messages": [],
-            "winner": None
+            "winner": winner.id if winner else None,
+            "version": game.version
+        }
+
+    def _create_state_delta(self, game: Game, base: StateSnapshot, base_version: int) -> Dict:
+        """創建相對於 base_version 的狀態差異 (卡牌移動、青睞變化、行動標記與回合資訊)"""
+        state = game.state
+        current = StateSnapshot.capture(state)
+        layout = state.layout
+        players = game.players
+
+        def location(loc) -> Dict:
+            status, seat = loc
+            return {"status": status.value, "owner_id": None if seat == NO_WINNER else players[seat].id}
+
+        winner = game.winner
+        return {
+            "game_id": game.game_id,
+            "base_version": base_version,
+            "version": game.version,
+            "status": "FINISHED" if state.is_finished else "PLAYING",
+            "current_player_id": players[state.to_move].id,
+            "round_number": game.round_number,
+            "card_moves": [
+                {"card_id": layout.card_ids[index], "index": index, "from": location(before), "to": location(after)}
+                for index, before, after in card_moves(base, current)
+            ],
+            "favor_changes": [
+                {"geisha_id": layout.geisha_ids[geisha], "favor": "NEUTRAL" if seat == NO_WINNER else f"PLAYER{seat + 1}"}
+                for geisha, seat in favor_changes(base, current, layout.geisha_count)
+            ],
+            "used_actions": {
+                players[seat].id: [marker.action_type.name for marker in players[seat].used_actions if marker.is_used]
+                for seat in used_changed_seats(base, current)
+            },
+            "scores": {player.id: player.score for player in players},
+            "pending_offer": self._pending_offer_to_dict(game),
+            "winner": winner.id if winner else None
         }
 
     def _player_to_dict(self, player: Player, current_player: Player) -> Dict:
         """將玩家轉換為字典"""
+        allocated_gifts: Dict[str, List[Dict]] = {}
+        for card in player.allocated_cards:
+            allocated_gifts.setdefault(card.geisha_id, []).append(self._card_to_dict(card))
+
         return {
             "id": player.id,
             "name": player.name,
             "hand_cards": [self._card_to_dict(card) for card in player.hand_cards],
-            "used_actions": [],
-            "secret_cards": [],
-            "allocated_gifts": {},
-            "score": 0,
+            "used_actions": [marker.action_type.name for marker in player.used_actions if marker.is_used],
+            "secret_cards": [self._card_to_dict(card) for card in player.secret_cards],
+            "allocated_gifts": allocated_gifts,
+            "score": player.score,
             "is_current_player": player.id == current_player.id
         }
 
     def _card_to_dict(self, card: GiftCard) -> Dict:
         """將卡牌轉換為字典"""
+        owner = card.owner
         return {
-            "id": f"{card.geisha_id}_{card.item_name}_{id(card)}",  # 生成唯一ID
+            "id": card.card_id,
+            "index": card.index,
             "geisha_id": card.geisha_id,
             "item_name": card.item_name,
             "charm_value": card.charm_value,
             "status": card.status.value,
-            "owner_id": None
+            "owner_id": owner.id if owner else None
         }
 
     def _geisha_to_dict(self, geisha: Geisha) -> Dict:
         """將藝妓轉換為字典"""
+        favored = geisha.favored_player
+        allocated_gifts: Dict[str, List[Dict]] = {}
+        for player in geisha.game.players:
+            cards = [card for card in player.allocated_cards if card.geisha_id == geisha.id]
+            if cards:
+                allocated_gifts[player.id] = [self._card_to_dict(card) for card in cards]
+
         return {
             "id": geisha.id,
             "name": geisha.name,
             "charm": geisha.charm,
             "gift_item": geisha.gift_item,
             "description": geisha.description,
-            "favor": "NEUTRAL",
-            "allocated_gifts": {}
+            "favor": f"PLAYER{favored.seat + 1}" if favored else "NEUTRAL",
+            "allocated_gifts": allocated_gifts
+        }
+
+    def _pending_offer_to_dict(self, game: Game) -> Optional[Dict]:
+        """等待對手選擇的獻禮/競爭"""
+        state = game.state
+        if state.pending_action is None:
+            return None
+
+        offer = [self._card_to_dict(game.card(index)) for index in iter_bits(state.pending_offer)]
+        groupings = None
+        if state.pending_split:
+            layout = state.layout
+            first = [layout.card_ids[index] for index in iter_bits(state.pending_split)]
+            second = [layout.card_ids[index] for index in iter_bits(state.pending_offer ^ state.pending_split)]
+            groupings = [first, second]
+
+        return {
+            "action_type": state.pending_action.name,
+            "player_id": game.current_player.id,
+            "responder_id": game.players[state.to_move].id,
+            "cards": offer,
+            "groupings": groupings
         }
 
     def validate_game_data(self) -> Dict:
         """驗證遊戲資料完整性"""
         try:
             geishas = self.game_factory.geisha_factory.create_all_geishas()
-            cards = self.game_factory.card_factory._create_all_gift_cards()
+            layout = self.game_factory.card_factory.layout
 
             # 驗證卡牌分配 (2,2,2,3,3,4,5)
             card_distribution = {}
-            for card in cards:
-                geisha_id = card.geisha_id
+            for geisha_index in layout.card_geisha:
+                geisha_id = layout.geisha_ids[geisha_index]
                 card_distribution[geisha_id] = card_distribution.get(geisha_id, 0) + 1
 
             expected_counts = [2, 2, 2, 3, 3, 4, 5]
@@ -237,7 +305,7 @@ class GameInitializationService:
 
             return {
                 "geisha_valid": len(geishas) == 7,
-                "cards_valid": len(cards) == 21,
+                "cards_valid": layout.card_count == 21,
                 "distribution_valid": actual_counts == expected_counts,
                 "total_charm": sum(g.charm for g in geishas),
                 "card_distribution": card_distribution
@@ -0,0 +1,59 @@
+"""遊戲模板註冊表 - 整個行程只載入一次的不可變藝妓/卡牌模板"""
+
+from typing import Dict, List, NamedTuple, Tuple
+
+from ..engine.layout import DeckLayout
+from ..entities.card import Geisha
+
+
+class GeishaTemplate(NamedTuple):
+    """藝妓模板"""
+    id: str
+    name: str
+    charm_value: int
+    gift_item: str
+    gift_count: int
+
+
+class CardTemplate(NamedTuple):
+    """禮物卡模板"""
+    geisha_id: str
+    name: str
+    charm_value: int
+    count: int
+
+
+class TemplateRegistry:
+    """編譯後的遊戲模板
+
+    所有欄位都是不可變的 tuple，可在所有遊戲與請求間共用。
+    """
+
+    __slots__ = ("geishas", "cards", "layout", "geisha_prototypes", "prototype_deck")
+
+    def __init__(self, geisha_templates: List[Dict], card_templates: List[Dict]):
+        self.geishas: Tuple[GeishaTemplate, ...] = tuple(
+            GeishaTemplate(t["id"], t["name"], t["charm_value"], t["gift_item"], t["gift_count"])
+            for t in geisha_templates
+        )
+        self.cards: Tuple[CardTemplate, ...] = tuple(
+            CardTemplate(t["geisha_id"], t["name"], t["charm_value"], t["count"])
+            for t in card_templates
+        )
+        self.layout = DeckLayout(geisha_templates, card_templates)
+
+        # 未綁定遊戲的藝妓原型，每個遊戲按需建立綁定的視圖
+        self.geisha_prototypes: Tuple[Geisha, ...] = tuple(
+            Geisha(
+                geisha_id=t.id,
+                name=t.name,
+                charm=t.charm_value,
+                description=f"專精於{t.gift_item}的優雅藝妓",
+                gift_item=t.gift_item,
+                gift_count=t.gift_count,
+                index=index,
+            )
+            for index, t in enumerate(self.geishas)
+        )
+        # 未洗牌的卡牌索引序列
+        self.prototype_deck: Tuple[int, ...] = tuple(range(self.layout.card_count))
@@ -38,7 +38,8 @@ class MongoBaseModel(BaseModel):
 
 class GiftCardDocument(MongoBaseModel):
     """禮物卡文檔"""
-    card_id: str
+    card_id: str  # 固定對應牌組位置 ("card_<索引>")，同一局內唯一
+    card_index: int
     geisha_id: str
     item_name: str
     charm_value: int
@@ -100,6 +101,9 @@ class GameDocument(MongoBaseModel):
     geisha_ids: List[str] = Field(default_factory=list)
     all_card_ids: List[str] = Field(default_factory=list)
     winner: Optional[str] = None
+    # 洗牌種子與動作記錄 [行動代碼, 卡牌遮罩, 分組遮罩]，可重建任意時點的狀態
+    seed: Optional[int] = None
+    action_log: List[List[int]] = Field(default_factory=list)
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: datetime = Field(default_factory=datetime.now)
     finished_at: Optional[datetime] = None
@@ -138,6 +142,7 @@ class RoomPlayerDocument(MongoBaseModel):
     status: str = "waiting"  # waiting, ready, playing, disconnected
     joined_at: datetime = Field(default_factory=datetime.now)
     last_seen: datetime = Field(default_factory=datetime.now)
+    is_bot: bool = False
 
 
 class RoomDocument(MongoBaseModel):
@@ -150,6 +155,7 @@ class RoomDocument(MongoBaseModel):
     created_at: datetime = Field(default_factory=datetime.now)
     started_at: Optional[datetime] = None
     finished_at: Optional[datetime] = None
+    version: int = 0  # 狀態版本 (ETag)
     updated_at: datetime = Field(default_factory=datetime.now)
 
 
@@ -167,8 +173,7 @@ MONGODB_INDEXES = {
         {"keys": [("name", 1)]},
     ],
     "cards": [
-        {"keys": [("card_id", 1)], "unique": True},
-        {"keys": [("game_id", 1)]},
+        {"keys": [("game_id", 1), ("card_id", 1)], "unique": True},
         {"keys": [("geisha_id", 1)]},
         {"keys": [("status", 1)]},
         {"keys": [("owner_id", 1)]},
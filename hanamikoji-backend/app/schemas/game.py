@@ -29,7 +29,8 @@ class FavorStatus(str, Enum):
 
 class GiftCard(BaseModel):
     """禮物卡模型"""
-    id: str
+    id: str  # 固定對應牌組位置 ("card_<索引>")，每局相同
+    index: int  # 牌組索引
     geisha_id: str
     item_name: str
     charm_value: int
@@ -64,6 +65,7 @@ class GameCreateRequest(BaseModel):
     """創建遊戲請求"""
     player1_name: str = Field(..., min_length=1, max_length=50)
     player2_name: str = Field(..., min_length=1, max_length=50)
+    seed: Optional[int] = Field(None, ge=0, lt=2 ** 63)  # 固定洗牌 (僅限除錯模式)
 
 
 class ActionRequest(BaseModel):
@@ -87,6 +89,15 @@ class GameMessage(BaseModel):
     details: Optional[Dict[str, Any]] = None
 
 
+class PendingOffer(BaseModel):
+    """等待對手選擇的獻禮/競爭"""
+    action_type: ActionType
+    player_id: str
+    responder_id: str
+    cards: List[GiftCard]
+    groupings: Optional[List[List[str]]] = None
+
+
 class GameStateResponse(BaseModel):
     """遊戲狀態回應"""
     game_id: str
@@ -95,12 +106,59 @@ class GameStateResponse(BaseModel):
     round_number: int
     players: Dict[str, Player]
     geishas: List[Geisha]
+    pending_offer: Optional[PendingOffer] = None
     messages: List[GameMessage] = Field(default_factory=list)
     winner: Optional[str] = None
+    version: int = 0  # 狀態版本 (每個動作加一)
     creator_token: Optional[str] = None
     player_assignment: Optional[Dict[str, Any]] = None
 
 
+class CardLocation(BaseModel):
+    """卡牌位置"""
+    status: str
+    owner_id: Optional[str] = None
+
+
+class CardMove(BaseModel):
+    """卡牌移動"""
+    card_id: str
+    index: int
+    from_: CardLocation = Field(..., alias="from")
+    to: CardLocation
+
+    model_config = {"populate_by_name": True}
+
+
+class FavorChange(BaseModel):
+    """藝妓青睞變化"""
+    geisha_id: str
+    favor: FavorStatus
+
+
+class GameStateDelta(BaseModel):
+    """相對於 base_version 的狀態差異"""
+    game_id: str
+    base_version: int
+    version: int
+    status: GameStatus
+    current_player_id: str
+    round_number: int
+    card_moves: List[CardMove] = Field(default_factory=list)
+    favor_changes: List[FavorChange] = Field(default_factory=list)
+    used_actions: Dict[str, List[ActionType]] = Field(default_factory=dict)  # 只列出有改變的玩家
+    scores: Dict[str, int] = Field(default_factory=dict)
+    pending_offer: Optional[PendingOffer] = None
+    winner: Optional[str] = None
+
+
+class GameUpdateResponse(BaseModel):
+    """增量更新回應：差異過大或版本無效時改為完整狀態 (delta 與 game_state 只有一個有值)"""
+    version: int
+    delta: Optional[GameStateDelta] = None
+    game_state: Optional[GameStateResponse] = None
+
+
 class GameStatusResponse(BaseModel):
     """遊戲狀態簡要回應"""
     game_id: str
@@ -118,4 +176,44 @@ class GameListItem(BaseModel):
     status: GameStatus
     player_names: List[str]
     created_at: str
-    current_round: int
\ No newline at end of file
+    current_round: int
+
+class PlayerWinProbability(BaseModel):
+    """單一玩家的勝率估計"""
+    player_id: str
+    name: str
+    win_probability: float
+
+
+class WinProbabilityResponse(BaseModel):
+    """勝率估計回應"""
+    game_id: str
+    action_count: int
+    rollouts: int
+    players: List[PlayerWinProbability]
+    draw_probability: float
+    cached: bool = False
+    elapsed_ms: float
+
+
+class HintRequest(BaseModel):
+    """提示請求"""
+    player_id: str
+    max_results: int = Field(5, ge=1, le=50)
+
+
+class HintItem(BaseModel):
+    """單一建議動作 (action 可直接送到執行動作 API)"""
+    action: ActionRequest
+    score: float
+    visits: int
+
+
+class HintResponse(BaseModel):
+    """提示回應"""
+    game_id: str
+    player_id: str
+    action_count: int
+    iterations: int
+    tree_reused: bool
+    hints: List[HintItem]
@@ -30,6 +30,7 @@ class RoomPlayer(BaseModel):
     status: PlayerStatus = PlayerStatus.WAITING
     joined_at: str
     last_seen: str
+    is_bot: bool = False
 
 
 class JoinRoomRequest(BaseModel):
@@ -54,6 +55,7 @@ class RoomResponse(BaseModel):
     created_at: str
     started_at: Optional[str] = None
     finished_at: Optional[str] = None
+    version: int = 0  # 狀態版本 (每次變更加一)
     current_turn: Optional[str] = None
     message: Optional[str] = None
 
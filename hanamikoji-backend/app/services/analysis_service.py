@@ -0,0 +1,213 @@
+"""對局分析服務 - 勝率估計與動作提示
+
+勝率估計交給共用的行程池執行，事件迴圈只等待結果；
+結果依 (遊戲ID, 已套用的動作數) 快取，旁觀者輪詢時不會重新模擬。
+提示的搜尋樹保存在本行程並跨請求延續，搜尋時連同局面送到行程池，搜尋完取回新的樹。
+搜尋樹以行動玩家自己的手牌確定化，因此每局每個座位各有一棵樹與一把鎖，不會交給對手使用。
+"""
+
+import asyncio
+import random
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config.settings import settings
+from app.domain.engine.moves import Move
+from app.domain.engine.state import GameState, iter_bits
+from app.domain.engine.validation import ActionValidationError, validate_turn
+from app.domain.enums.game_enums import ActionErrorCode
+from app.services.game_service import GameService
+from app.simulation.mcts import SearchTree, grow_tree_worker
+from app.simulation.pool import get_process_pool
+from app.simulation.win_probability import estimate_wins
+
+# 工作行程啟動與回傳結果的額外等待時間 (秒)
+RESULT_GRACE = 1.0
+
+
+class AnalysisTimeoutError(Exception):
+    """分析未在時間上限內完成"""
+
+
+class AnalysisService:
+    """對局分析服務"""
+
+    _instance = None
+
+    def __new__(cls, game_service: Optional[GameService] = None):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self, game_service: Optional[GameService] = None):
+        if hasattr(self, '_initialized'):
+            return
+        self.game_service = game_service or GameService()
+        self._cache: 'OrderedDict[Tuple[str, int], Dict[str, Any]]' = OrderedDict()
+        self._pending: Dict[Tuple[str, int], asyncio.Future] = {}
+        # 提示用搜尋樹：(遊戲ID, 座位) -> (樹根對應的狀態版本, 搜尋樹)
+        self._trees: 'OrderedDict[Tuple[str, int], Tuple[int, SearchTree]]' = OrderedDict()
+        self._tree_locks: Dict[Tuple[str, int], asyncio.Lock] = {}
+        self._hint_rng = random.Random()
+        self._initialized = True
+
+    async def win_probability(self, game_id: str) -> Dict[str, Any]:
+        """估計雙方勝率"""
+        game = self.game_service.get_game(game_id)
+        if game is None:
+            raise ValueError("遊戲不存在")
+
+        # 以版本為鍵：重置遊戲後動作數重新從 0 開始，版本則繼續累加
+        key = (game_id, game.version)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return {**cached, "cached": True}
+
+        # 同一局面已有請求在計算時直接等待同一個結果
+        pending = self._pending.get(key)
+        if pending is not None:
+            result = await asyncio.shield(pending)
+            return {**result, "cached": True}
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            result = await self._estimate(game, key, len(game.actions))
+            future.set_result(result)
+        except Exception as e:
+            future.set_exception(e)
+            # 避免沒有其他等待者時出現未取用例外的警告
+            future.exception()
+            raise
+        finally:
+            del self._pending[key]
+
+        self._cache[key] = result
+        while len(self._cache) > settings.analysis_cache_size:
+            self._cache.popitem(last=False)
+        return {**result, "cached": False}
+
+    async def _estimate(self, game, key: Tuple[str, int], action_count: int) -> Dict[str, Any]:
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        executor = get_process_pool()
+        snapshot = game.state.copy()
+        base_seed = zlib.crc32(f"{key[0]}:{key[1]}".encode("utf-8"))
+        time_limit = settings.analysis_time_limit
+
+        tasks = [
+            loop.run_in_executor(executor, estimate_wins, snapshot, base_seed + worker, time_limit)
+            for worker in range(max(1, settings.analysis_workers))
+        ]
+        try:
+            results = await asyncio.wait_for(asyncio.gather(*tasks), timeout=time_limit + RESULT_GRACE)
+        except asyncio.TimeoutError:
+            raise AnalysisTimeoutError("勝率估計逾時")
+
+        rollouts = sum(r[0] for r in results)
+        wins = (sum(r[1] for r in results), sum(r[2] for r in results))
+        total = rollouts or 1
+        return {
+            "game_id": key[0],
+            "action_count": action_count,
+            "rollouts": rollouts,
+            "players": [
+                {
+                    "player_id": player.id,
+                    "name": player.name,
+                    "win_probability": round(wins[seat] / total, 4),
+                }
+                for seat, player in enumerate(game.players)
+            ],
+            "draw_probability": round((rollouts - wins[0] - wins[1]) / total, 4),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+
+    async def hint(self, game_id: str, player_id: str, max_results: int = 5) -> Dict[str, Any]:
+        """為目前行動的玩家排序合法動作 (行動或回應)"""
+        game = self.game_service.get_game(game_id)
+        if game is None:
+            raise ValueError("遊戲不存在")
+        player = game.player_by_id(player_id)
+        if player is None:
+            raise ActionValidationError(ActionErrorCode.UNKNOWN_PLAYER, "玩家不在此遊戲中")
+        validate_turn(game.state, player.seat)
+
+        tree_key = (game_id, player.seat)
+        lock = self._tree_locks.setdefault(tree_key, asyncio.Lock())
+        async with lock:
+            # 在事件迴圈中取快照，搜尋期間遊戲狀態可能繼續變動
+            state = game.state.copy()
+            actions = list(game.actions)
+            version, base = game.version, game.version_base
+            tree, reused = self._reroot(tree_key, state, actions, version, base)
+            loop = asyncio.get_running_loop()
+            time_limit = settings.hint_time_limit
+            task = loop.run_in_executor(
+                get_process_pool(), grow_tree_worker, tree, state, self._hint_rng.getrandbits(64), time_limit
+            )
+            try:
+                tree, iterations = await asyncio.wait_for(task, timeout=time_limit + RESULT_GRACE)
+            except asyncio.TimeoutError:
+                raise AnalysisTimeoutError("提示搜尋逾時")
+            self._trees[tree_key] = (version, tree)
+            self._trees.move_to_end(tree_key)
+            while len(self._trees) > settings.hint_tree_limit:
+                evicted, _ = self._trees.popitem(last=False)
+                self._tree_locks.pop(evicted, None)
+
+        hints = [
+            {
+                "action": self._to_action_request(state, player_id, move),
+                "score": round(score, 4),
+                "visits": visits,
+            }
+            for move, score, visits in tree.ranked(state)[:max_results]
+        ]
+        return {
+            "game_id": game_id,
+            "player_id": player_id,
+            "action_count": len(actions),
+            "iterations": iterations,
+            "tree_reused": reused,
+            "hints": hints,
+        }
+
+    def _reroot(self, tree_key: Tuple[str, int], state: GameState, actions: List[Move],
+                version: int, base: int) -> Tuple[SearchTree, bool]:
+        """取出此局此座位的搜尋樹並移到目前局面，無法延續時 (包括遊戲重置前的樹) 建立新樹"""
+        entry = self._trees.get(tree_key)
+        if entry is not None:
+            tree_version, tree = entry
+            if (
+                base <= tree_version <= version
+                and tree.round_number == state.round_number
+                and tree.advance(state.layout, actions[tree_version - base:])
+            ):
+                return tree, True
+        return SearchTree(state), False
+
+    @staticmethod
+    def _to_action_request(state: GameState, player_id: str, move: Move) -> Dict[str, Any]:
+        """將引擎動作轉成與執行動作 API 相同的請求格式"""
+        action, cards, split = move
+        card_ids = state.layout.card_ids
+        if action is None:
+            # 回應獻禮/競爭時沿用對手的行動類型
+            action = state.pending_action
+        request = {
+            "player_id": player_id,
+            "action_type": action.name,
+            "card_ids": [card_ids[card] for card in iter_bits(cards)],
+            "target_geisha_id": None,
+            "groupings": None,
+        }
+        if split:
+            request["groupings"] = [
+                [card_ids[card] for card in iter_bits(split)],
+                [card_ids[card] for card in iter_bits(cards & ~split)],
+            ]
+        return request
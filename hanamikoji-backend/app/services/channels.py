@@ -0,0 +1,158 @@
+"""WebSocket 訂閱頻道
+
+每個頻道 (遊戲ID/房間ID) 保存一組連線。publish 是同步且不阻塞的：
+訊息只序列化一次，放進各連線的佇列，由每條連線自己的寫入協程依序送出，
+因此可以直接從同步的服務層 (例如 GameService.execute_action) 呼叫。
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, Optional, Set
+
+from fastapi import WebSocket
+
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+def now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def make_message(message_type: str, data: Optional[Dict[str, Any]] = None,
+                 sender: Optional[str] = None) -> Dict[str, Any]:
+    """建立 WebSocket 訊息 (格式見 doc/api/websocket.md)"""
+    message = {"type": message_type, "data": data or {}, "timestamp": now_ms()}
+    if sender is not None:
+        message["from"] = sender
+    return message
+
+
+def encode(message: Dict[str, Any]) -> str:
+    return json.dumps(message, ensure_ascii=False, default=str)
+
+
+class Connection:
+    """單一 WebSocket 連線：訊息先進有上限的佇列，由獨立的寫入協程依序送出
+
+    佇列滿了代表客戶端跟不上推送速度，此時直接以 1013 (Try Again Later) 關閉連線，
+    讓客戶端重新連線取得最新狀態，不讓慢速連線拖住其他訂閱者或無限累積記憶體。
+    """
+
+    __slots__ = ("websocket", "player_id", "queue", "overflowed", "_writer")
+
+    def __init__(self, websocket: WebSocket, player_id: Optional[str] = None,
+                 max_queue: Optional[int] = None):
+        self.websocket = websocket
+        self.player_id = player_id
+        self.queue: asyncio.Queue = asyncio.Queue(settings.ws_send_queue_size if max_queue is None else max_queue)
+        self.overflowed = False
+        self._writer: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._writer = asyncio.create_task(self._write())
+
+    def send(self, text: str) -> bool:
+        """放入送出佇列 (不等待)，佇列已滿時關閉連線並回傳 False"""
+        if self.overflowed:
+            return False
+        try:
+            self.queue.put_nowait(text)
+            return True
+        except asyncio.QueueFull:
+            self.overflowed = True
+            logger.warning("WebSocket 送出佇列已滿，中斷慢速連線: 玩家 %s", self.player_id)
+            self._abort(1013)
+            return False
+
+    def _abort(self, code: int) -> None:
+        """停止寫入協程並關閉連線
+
+        從事件迴圈以外呼叫時 (例如沒有執行中迴圈時同步進行的電腦玩家回合)，
+        交給寫入協程所屬的迴圈處理；連線從未啟動或迴圈已關閉時不需要處理。
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            if self._writer is not None:
+                loop = self._writer.get_loop()
+                if not loop.is_closed():
+                    loop.call_soon_threadsafe(self._abort, code)
+            return
+        if self._writer is not None:
+            self._writer.cancel()
+        asyncio.create_task(self._close_socket(code))
+
+    def send_message(self, message: Dict[str, Any]) -> bool:
+        return self.send(encode(message))
+
+    async def _write(self) -> None:
+        try:
+            while True:
+                text = await self.queue.get()
+                await self.websocket.send_text(text)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # 連線已中斷，剩下的訊息直接丟棄，由接收迴圈負責清理
+            logger.warning("WebSocket 送出失敗: %s", e)
+
+    async def _close_socket(self, code: int) -> None:
+        try:
+            await self.websocket.close(code=code)
+        except Exception:
+            pass
+
+    async def close(self) -> None:
+        """停止寫入協程"""
+        if self._writer is not None:
+            self._writer.cancel()
+            try:
+                await self._writer
+            except asyncio.CancelledError:
+                pass
+            self._writer = None
+
+
+class ChannelHub:
+    """頻道ID -> 訂閱連線集合"""
+
+    def __init__(self):
+        self._channels: Dict[str, Set[Connection]] = {}
+
+    def subscribe(self, channel_id: str, connection: Connection) -> None:
+        self._channels.setdefault(channel_id, set()).add(connection)
+
+    def unsubscribe(self, channel_id: str, connection: Connection) -> None:
+        connections = self._channels.get(channel_id)
+        if connections is None:
+            return
+        connections.discard(connection)
+        if not connections:
+            del self._channels[channel_id]
+
+    def subscriber_count(self, channel_id: str) -> int:
+        return len(self._channels.get(channel_id, ()))
+
+    def publish(self, channel_id: str, message: Dict[str, Any]) -> int:
+        """推送給頻道內所有連線 (只序列化一次、不等待送出)，回傳成功排入佇列的連線數"""
+        connections = self._channels.get(channel_id)
+        if not connections:
+            return 0
+        text = encode(message)
+        delivered = 0
+        for connection in list(connections):
+            if connection.send(text):
+                delivered += 1
+            else:
+                self.unsubscribe(channel_id, connection)
+        return delivered
+
+
+# 遊戲狀態推送頻道 (以遊戲ID為頻道)
+game_channels = ChannelHub()
+# 房間配對事件頻道 (以房間ID為頻道)
+room_channels = ChannelHub()
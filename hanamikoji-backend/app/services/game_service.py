@@ -1,17 +1,35 @@
 """遊戲服務層"""
 
 from sqlalchemy.orm import Session
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Sequence
+import asyncio
+import logging
+import random
 import uuid
 from datetime import datetime
 
 from app.domain.factories.game_factory import GameInitializationService
 from app.domain.entities.game import Game
-from app.domain.enums.game_enums import GameStatus, ActionType
+from app.domain.engine.delta import StateSnapshot
+from app.domain.engine.moves import Move
+from app.domain.engine.replay import initial_state, new_seed
+from app.domain.engine.state import PHASE_RESPOND
+from app.domain.engine.validation import (
+    ActionValidationError, resolve_cards, resolve_split, validate_action, validate_response
+)
+from app.domain.enums.game_enums import GameStatus, ActionType, ActionErrorCode
 from app.schemas.game import ActionRequest, GameStateResponse
+from app.config.settings import settings
+from app.simulation.mcts import MCTSPolicy, best_move_worker
+from app.simulation.policies import GreedyPolicy
+from app.simulation.pool import get_process_pool
 from app.services.mongodb_game_service import MongoDBGameService
+from app.services.channels import game_channels, make_message, now_ms
+from app.services.version_waiters import game_waiters
 from app.database.mongodb import init_mongodb
 
+logger = logging.getLogger(__name__)
+
 
 class GameService:
     """遊戲服務"""
@@ -29,26 +47,35 @@ class GameService:
         self.db = db
         self.game_init_service = GameInitializationService()
         
-        # 暫時使用內存存儲，確保功能正常
-        self._games: Dict[str, Dict] = {}
+        # 暫時使用內存存儲，每個遊戲只保存位元棋盤狀態
+        self._games: Dict[str, Game] = {}
         # 記錄每個遊戲的創建者和玩家會話
         self._game_sessions: Dict[str, Dict] = {}
+        # 電腦玩家：遊戲ID -> {座位: 策略}
+        self._bots: Dict[str, Dict[int, MCTSPolicy]] = {}
+        # 背景執行中的電腦玩家回合 (保留參照，避免任務被回收)
+        self._bot_tasks: Dict[str, asyncio.Task] = {}
+        self._bot_rng = random.Random()
         self._initialized = True
     
-    def create_game(self, player1_name: str, player2_name: str) -> Dict[str, Any]:
-        """創建新遊戲"""
-        game_data = self.game_init_service.initialize_new_game(player1_name, player2_name)
-        game_id = game_data["game_id"]
+    def create_game(self, player1_name: str, player2_name: str, bot_seats: Sequence[int] = (),
+                    seed: Optional[int] = None) -> Dict[str, Any]:
+        """創建新遊戲 (bot_seats 中的座位由電腦玩家操作，seed 固定洗牌結果)"""
+        game = self.game_init_service.game_factory.create_new_game(player1_name, player2_name, seed)
+        game_id = game.game_id
+        if bot_seats:
+            self._bots[game_id] = {seat: self._create_bot() for seat in bot_seats}
+        game_data = self._serialize(game)
         
         # 生成創建者token
         import secrets
         creator_token = secrets.token_urlsafe(16)
         
         # 保存到內存
-        self._games[game_id] = game_data
+        self._games[game_id] = game
         self._game_sessions[game_id] = {
             'creator_token': creator_token,
-            'creator_player_id': list(game_data["players"].keys())[0],
+            'creator_player_id': game.player1.id,
             'created_at': datetime.now().isoformat()
         }
         
@@ -57,21 +84,21 @@ class GameService:
         
         print(f"✅ 遊戲 {game_id} 已創建，創建者token: {creator_token}")
         
+        # 電腦玩家先手時在背景行動，完成後以狀態差異推送
+        self._schedule_bots(game)
         return game_data
     
     def get_game_state(self, game_id: str, creator_token: str = None) -> Dict[str, Any]:
         """獲取遊戲狀態"""
         # 從內存載入
-        game_state = self._games.get(game_id)
-        if not game_state:
+        game = self._games.get(game_id)
+        if not game:
             raise ValueError("遊戲不存在")
             
-        # 獲取會話信息
-        session_info = self._game_sessions.get(game_id, {})
-        player_ids = list(game_state['players'].keys())
+        player_ids = [player.id for player in game.players]
         
         # 根據creator_token決定玩家身份
-        if creator_token and creator_token == session_info.get('creator_token'):
+        if self.is_creator(game_id, creator_token):
             # 是創建者，分配為第一個玩家
             assigned_player_id = player_ids[0]
             player_role = 'creator'
@@ -89,7 +116,7 @@ class GameService:
                 player_role = 'unknown'
         
         # 添加玩家身份信息到響應中
-        response_data = game_state.copy()
+        response_data = self._serialize(game)
         response_data['player_assignment'] = {
             'assigned_player_id': assigned_player_id,
             'player_role': player_role,
@@ -100,57 +127,241 @@ class GameService:
         
         return response_data
     
+    def is_creator(self, game_id: str, creator_token: Optional[str]) -> bool:
+        """creator_token 是否為遊戲創建者的 token"""
+        session_info = self._game_sessions.get(game_id, {})
+        return bool(creator_token) and creator_token == session_info.get('creator_token')
+    
+    def get_version(self, game_id: str) -> Optional[int]:
+        """遊戲的狀態版本 (不存在時為 None)"""
+        game = self._games.get(game_id)
+        return None if game is None else game.version
+    
+    async def wait_for_update(self, game_id: str, since: int, timeout: float) -> bool:
+        """等到遊戲版本超過 since (或逾時)，回傳是否有新版本"""
+        game = self._games.get(game_id)
+        if game is None:
+            raise ValueError("遊戲不存在")
+        if since > game.version:
+            # 客戶端的版本不屬於這局 (例如伺服器重啟)，立即回傳讓它取得完整狀態
+            return True
+        return await game_waiters.wait(game_id, since, lambda: game.version, timeout)
+    
     def execute_action(self, game_id: str, action: ActionRequest) -> Dict[str, Any]:
-        """執行遊戲動作"""
+        """執行遊戲動作，回傳相對於動作前版本的狀態差異
+
+        輪到電腦玩家時只排程背景回合，回傳的差異不包含電腦玩家的行動。
+        """
         # 檢查遊戲是否存在
         if game_id not in self._games:
             raise ValueError("遊戲不存在")
         
-        game_state = self._games[game_id]
+        game = self._games[game_id]
         print(f"執行動作: 遊戲 {game_id}, 動作類型: {action.action_type}, 卡牌: {action.card_ids}")
         
-        # 驗證是否為當前玩家
-        if action.player_id != game_state["current_player_id"]:
-            raise ValueError("不是當前玩家的回合")
-        
-        # 驗證動作有效性
+        # 驗證動作有效性 (回合、行動標記、手牌、分組、藝妓)
         try:
-            self._validate_action(game_id, action)
+            move = self._validate_action(game_id, action)
         except ValueError as e:
             print(f"動作驗證失敗: {str(e)}")
             raise e
         
-        # 執行動作後切換回合
-        self._switch_turn(game_state)
+        base_version = game.version
+        base = StateSnapshot.capture(game.state)
+        
+        # 執行動作 (引擎會自動切換回合與結算)
+        self._execute_game_action(game_id, move)
         
-        # 更新遊戲狀態
-        self._games[game_id] = game_state
+        delta = self.game_init_service._create_state_delta(game, base, base_version)
+        
+        # 推送給訂閱此遊戲的連線並喚醒長輪詢，電腦玩家的回應之後另外推送
+        self._publish_delta(game_id, delta, action.player_id, action.action_type.value)
+        game_waiters.notify(game_id)
+        self._schedule_bots(game)
+        return delta
+    
+    def _publish_delta(self, game_id: str, delta: Dict[str, Any], player_id: str, action_type: str) -> None:
+        """把動作造成的狀態差異推送到遊戲頻道"""
+        if not game_channels.subscriber_count(game_id):
+            return
+        data = dict(delta)
+        data["last_action"] = {
+            "player_id": player_id,
+            "action_type": action_type,
+            "timestamp": now_ms()
+        }
+        game_channels.publish(game_id, make_message("game_state_delta", data, player_id))
+    
+    def get_state_update(self, game_id: str, since: Optional[int] = None) -> Dict[str, Any]:
+        """取得 since 版本之後的狀態差異
+
+        since 省略、無效、早於遊戲重置或落後超過 settings.delta_max_gap 個版本時改回傳完整狀態。
+        舊版本的狀態以種子與動作記錄重播取得，不另外保存歷史。
+        """
+        game = self._games.get(game_id)
+        if game is None:
+            raise ValueError("遊戲不存在")
+        
+        version = game.version
+        if (since is None or game.seed is None or not game.version_base <= since <= version
+                or version - since > settings.delta_max_gap):
+            return {"version": version, "delta": None, "game_state": self._serialize(game)}
+        
+        base_state = game.state if since == version else game.replay(since - game.version_base).state
+        delta = self.game_init_service._create_state_delta(game, StateSnapshot.capture(base_state), since)
+        return {"version": version, "delta": delta, "game_state": None}
+    
+    def get_game(self, game_id: str) -> Optional[Game]:
+        """取得遊戲實體"""
+        return self._games.get(game_id)
+    
+    def replay_game(self, game_id: str, upto: Optional[int] = None) -> Dict[str, Any]:
+        """從種子與動作記錄重建遊戲 (upto 指定只重播前幾個動作)，回傳當時的狀態"""
+        game = self._games.get(game_id)
+        if game is None:
+            raise ValueError("遊戲不存在")
+        if upto is not None and not 0 <= upto <= len(game.actions):
+            raise ValueError(f"動作數必須介於 0 與 {len(game.actions)} 之間")
+        return self._serialize(game.replay(upto))
+    
+    def is_bot_game(self, game_id: str) -> bool:
+        """遊戲中是否有電腦玩家"""
+        return game_id in self._bots
+    
+    def _create_bot(self) -> MCTSPolicy:
+        """依設定建立 MCTS 電腦玩家"""
+        return MCTSPolicy(
+            iterations=settings.bot_iterations,
+            time_limit=settings.bot_time_limit,
+            workers=settings.bot_workers,
+            endgame_draws=settings.bot_endgame_draws,
+        )
+    
+    def _bot_to_move(self, game: Game) -> Optional[MCTSPolicy]:
+        """輪到電腦玩家 (行動或回應) 時回傳其策略"""
+        bots = self._bots.get(game.game_id)
+        if not bots or game.state.is_finished:
+            return None
+        return bots.get(game.state.to_move)
+    
+    def _schedule_bots(self, game: Game) -> None:
+        """輪到電腦玩家時在背景代為行動，不阻塞事件迴圈
+
+        沒有執行中的事件迴圈時 (命令列、測試) 直接同步行動。
+        """
+        if self._bot_to_move(game) is None or game.game_id in self._bot_tasks:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._run_bots(game)
+            return
+        task = loop.create_task(self._play_bots(game))
+        self._bot_tasks[game.game_id] = task
+        task.add_done_callback(lambda done: self._forget_bot_task(game.game_id, done))
+    
+    def _forget_bot_task(self, game_id: str, task: asyncio.Task) -> None:
+        """結束的背景回合移出記錄 (重置遊戲後可能已有新的回合，不能移除)"""
+        if self._bot_tasks.get(game_id) is task:
+            del self._bot_tasks[game_id]
+    
+    async def _play_bots(self, game: Game) -> None:
+        """電腦玩家的背景回合：搜尋在行程池中執行，每個行動各推送一次差異並喚醒長輪詢"""
+        loop = asyncio.get_running_loop()
+        bot = self._bot_to_move(game)
+        while bot is not None:
+            version = game.version
+            # 根平行的策略自己會把搜尋分派到行程池，只需在執行緒中等待結果
+            executor = None if bot.workers > 1 else get_process_pool()
+            try:
+                move = await loop.run_in_executor(
+                    executor, best_move_worker, bot, game.state.copy(), self._bot_rng.getrandbits(64)
+                )
+            except Exception:
+                # 搜尋失敗時改用便宜的貪婪策略，避免遊戲卡在電腦玩家的回合
+                logger.exception("電腦玩家搜尋失敗，改用貪婪策略: 遊戲 %s", game.game_id)
+                move = None
+            if game.version != version or self._games.get(game.game_id) is not game:
+                # 搜尋期間遊戲已改變或被刪除，放棄這個結果
+                return
+            if move is None:
+                move = self._fallback_move(game)
+            self._play_bot_move(game, move)
+            bot = self._bot_to_move(game)
+    
+    def _fallback_move(self, game: Game) -> Move:
+        """搜尋失敗時的備用動作 (一步貪婪策略)"""
+        state = game.state
+        policy = GreedyPolicy()
+        if state.phase == PHASE_RESPOND:
+            return None, policy.choose_response(state, self._bot_rng), 0
+        return policy.choose_action(state, self._bot_rng)
+    
+    def _run_bots(self, game: Game) -> bool:
+        """同步代電腦玩家行動直到輪到人類玩家，回傳是否有行動"""
+        moved = False
+        bot = self._bot_to_move(game)
+        while bot is not None:
+            self._play_bot_move(game, bot.best_move(game.state, self._bot_rng))
+            moved = True
+            bot = self._bot_to_move(game)
+        return moved
+    
+    def _play_bot_move(self, game: Game, move: Move) -> None:
+        """執行電腦玩家的動作，推送狀態差異並喚醒長輪詢"""
+        state = game.state
+        player = game.players[state.to_move]
+        # 回應時沿用對手的行動類型，與人類玩家送出的回應相同
+        action_type = (move[0] or state.pending_action).name
+        base_version = game.version
+        base = StateSnapshot.capture(state)
+        game.play(move)
+        logger.info("電腦玩家行動: 遊戲 %s, 動作: %s", game.game_id, move[0].name if move[0] else "RESPOND")
         
-        return game_state
+        delta = self.game_init_service._create_state_delta(game, base, base_version)
+        self._publish_delta(game.game_id, delta, player.id, action_type)
+        game_waiters.notify(game.game_id)
     
     def get_game_status(self, game_id: str) -> Optional[Dict[str, Any]]:
         """獲取遊戲簡要狀態"""
         if game_id not in self._games:
             return None
             
-        game_state = self._games[game_id]
+        game = self._games[game_id]
+        winner = game.winner
         return {
             "game_id": game_id,
-            "status": game_state.get("status", "PLAYING"),
-            "current_player_id": game_state.get("current_player_id"),
-            "round_number": game_state.get("round_number", 1),
-            "player_names": [player["name"] for player in game_state["players"].values()],
-            "created_at": datetime.now().isoformat(),
-            "winner": game_state.get("winner")
+            "status": "FINISHED" if game.state.is_finished else "PLAYING",
+            "current_player_id": game.players[game.state.to_move].id,
+            "round_number": game.round_number,
+            "player_names": [player.name for player in game.players],
+            "created_at": game.created_at.isoformat(),
+            "winner": winner.id if winner else None
         }
     
     def reset_game(self, game_id: str) -> Dict[str, Any]:
-        """重置遊戲"""
-        if game_id not in self._games:
+        """以新的種子重新發牌，玩家與創建者 token 不變
+
+        版本接續重置前的版本，因此 ETag、長輪詢與訂閱者都會看到新狀態；
+        訂閱者收到完整的 game_state_update (新的一副牌無法以差異表示)。
+        """
+        game = self._games.get(game_id)
+        if game is None:
             raise ValueError("遊戲不存在")
         
-        # TODO: 實現遊戲重置邏輯
-        return self._create_mock_game_state(game_id)
+        # 進行中的電腦玩家搜尋屬於舊的牌局，結果直接丟棄
+        task = self._bot_tasks.pop(game_id, None)
+        if task is not None:
+            task.cancel()
+        seed = new_seed()
+        game.restart(initial_state(game.state.layout, seed), seed)
+        logger.info("遊戲已重置: %s", game_id)
+        
+        game_data = self._serialize(game)
+        game_channels.publish(game_id, make_message("game_state_update", game_data))
+        game_waiters.notify(game_id)
+        self._schedule_bots(game)
+        return game_data
     
     def delete_game(self, game_id: str) -> bool:
         """刪除遊戲"""
@@ -179,114 +390,78 @@ class GameService:
                 for game_id in self._games.keys()
             ]
     
-    def _validate_action(self, game_id: str, action: ActionRequest) -> None:
-        """驗證動作有效性"""
-        # TODO: 實現動作驗證邏輯
-        if not action.card_ids:
-            raise ValueError("必須選擇至少一張卡牌")
+    def _validate_action(self, game_id: str, action: ActionRequest) -> Move:
+        """驗證動作有效性，回傳解析後的 (行動, 卡牌遮罩, 分組遮罩)
+
+        卡牌ID固定對應牌組索引，手牌與行動標記都是位元遮罩，整個檢查為常數時間。
+        """
+        game = self._games[game_id]
+        state = game.state
+        player = game.player_by_id(action.player_id)
+        if player is None:
+            raise ActionValidationError(ActionErrorCode.UNKNOWN_PLAYER, "玩家不在此遊戲中")
         
-        # 根據動作類型驗證
-        if action.action_type == ActionType.SECRET and len(action.card_ids) != 1:
-            raise ValueError("秘密保留必須選擇1張卡牌")
-        elif action.action_type == ActionType.DISCARD and len(action.card_ids) != 2:
-            raise ValueError("棄牌必須選擇2張卡牌")
-        elif action.action_type == ActionType.GIFT and len(action.card_ids) != 3:
-            raise ValueError("獻禮必須選擇3張卡牌")
-        elif action.action_type == ActionType.COMPETE and len(action.card_ids) != 4:
-            raise ValueError("競爭必須選擇4張卡牌")
-    
-    def _execute_game_action(self, game_id: str, action: ActionRequest) -> Dict[str, Any]:
-        """執行具體的遊戲動作"""
-        # TODO: 實現具體的遊戲邏輯
+        action_type = ActionType[action.action_type.value]
+        cards = resolve_cards(state.layout, action.card_ids)
         
-        # 根據動作類型執行不同邏輯
-        if action.action_type == ActionType.SECRET:
-            return self._execute_secret_action(game_id, action)
-        elif action.action_type == ActionType.DISCARD:
-            return self._execute_discard_action(game_id, action)
-        elif action.action_type == ActionType.GIFT:
-            return self._execute_gift_action(game_id, action)
-        elif action.action_type == ActionType.COMPETE:
-            return self._execute_compete_action(game_id, action)
+        # 回應對手的獻禮/競爭
+        if state.phase == PHASE_RESPOND:
+            validate_response(state, player.seat, action_type, cards)
+            return action_type, cards, 0
+        
+        split = 0
+        if action_type == ActionType.COMPETE:
+            split = resolve_split(state.layout, cards, action.groupings)
         
-        raise ValueError(f"未知的動作類型: {action.action_type}")
+        target_geisha = None
+        if action.target_geisha_id is not None:
+            target_geisha = state.layout.geisha_index.get(action.target_geisha_id, -1)
+        
+        validate_action(state, player.seat, action_type, cards, split, target_geisha)
+        return action_type, cards, split
     
-    def _switch_turn(self, game_state: Dict[str, Any]) -> None:
-        """切換回合"""
-        current_player_id = game_state["current_player_id"]
-        players = game_state["players"]
+    def _execute_game_action(self, game_id: str, move: Move) -> None:
+        """執行具體的遊戲動作"""
+        game = self._games[game_id]
+        action_type, cards, split = move
         
-        # 找到另一個玩家
-        other_player_id = None
-        for player_id in players.keys():
-            if player_id != current_player_id:
-                other_player_id = player_id
-                break
+        # 回應對手的獻禮/競爭
+        if game.state.phase == PHASE_RESPOND:
+            game.play(move)
+            return
         
-        if other_player_id:
-            # 切換當前玩家
-            game_state["current_player_id"] = other_player_id
-            
-            # 更新玩家的is_current_player狀態
-            players[current_player_id]["is_current_player"] = False
-            players[other_player_id]["is_current_player"] = True
-            
-            print(f"回合已切換: {current_player_id} -> {other_player_id}")
+        # 根據動作類型執行不同邏輯
+        if action_type == ActionType.SECRET:
+            self._execute_secret_action(game_id, move)
+        elif action_type == ActionType.DISCARD:
+            self._execute_discard_action(game_id, move)
+        elif action_type == ActionType.GIFT:
+            self._execute_gift_action(game_id, move)
+        elif action_type == ActionType.COMPETE:
+            self._execute_compete_action(game_id, move)
+        else:
+            raise ValueError(f"未知的動作類型: {action_type}")
     
-    def _execute_secret_action(self, game_id: str, action: ActionRequest) -> Dict[str, Any]:
+    def _serialize(self, game: Game) -> Dict[str, Any]:
+        """將遊戲狀態轉換為回應字典"""
+        return self.game_init_service._create_game_state_response(game)
+    
+    def _execute_secret_action(self, game_id: str, move: Move) -> None:
         """執行秘密保留動作"""
-        # TODO: 實現秘密保留邏輯
-        return self._create_mock_game_state(game_id)
+        game = self._games[game_id]
+        game.play(move)
     
-    def _execute_discard_action(self, game_id: str, action: ActionRequest) -> Dict[str, Any]:
+    def _execute_discard_action(self, game_id: str, move: Move) -> None:
         """執行棄牌動作"""
-        # TODO: 實現棄牌邏輯
-        return self._create_mock_game_state(game_id)
-    
-    def _execute_gift_action(self, game_id: str, action: ActionRequest) -> Dict[str, Any]:
-        """執行獻禮動作"""
-        # TODO: 實現獻禮邏輯
-        return self._create_mock_game_state(game_id)
-    
-    def _execute_compete_action(self, game_id: str, action: ActionRequest) -> Dict[str, Any]:
-        """執行競爭動作"""
-        # TODO: 實現競爭邏輯
-        return self._create_mock_game_state(game_id)
-    
-    def _create_mock_game_state(self, game_id: str) -> Dict[str, Any]:
-        """創建模擬的遊戲狀態"""
-        # 檢查是否已有遊戲狀態
-        if game_id in self._games:
-            return self._games[game_id]
-            
-        return {
-            "game_id": game_id,
-            "status": "PLAYING",
-            "current_player_id": "player1",
-            "round_number": 1,
-            "players": {
-                "player1": {
-                    "id": "player1",
-                    "name": "玩家1",
-                    "hand_cards": [],
-                    "used_actions": [],
-                    "secret_cards": [],
-                    "allocated_gifts": {},
-                    "score": 0,
-                    "is_current_player": True
-                },
-                "player2": {
-                    "id": "player2", 
-                    "name": "玩家2",
-                    "hand_cards": [],
-                    "used_actions": [],
-                    "secret_cards": [],
-                    "allocated_gifts": {},
-                    "score": 0,
-                    "is_current_player": False
-                }
-            },
-            "geishas": [],
-            "messages": [],
-            "winner": None
-        }
\ No newline at end of file
+        game = self._games[game_id]
+        game.play(move)
+    
+    def _execute_gift_action(self, game_id: str, move: Move) -> None:
+        """執行獻禮動作 (等待對手選擇1張)"""
+        game = self._games[game_id]
+        game.play(move)
+    
+    def _execute_compete_action(self, game_id: str, move: Move) -> None:
+        """執行競爭動作 (等待對手選擇1組)"""
+        game = self._games[game_id]
+        game.play(move)
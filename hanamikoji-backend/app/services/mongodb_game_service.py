@@ -10,6 +10,10 @@ from app.models.mongodb import (
     GameDocument, PlayerDocument, GiftCardDocument, GeishaDocument,
     GameActionDocument, GameMessageDocument, GameStateSnapshot
 )
+from app.domain.engine.layout import DeckLayout
+from app.domain.engine.moves import Move
+from app.domain.engine.replay import decode_actions, encode_actions, replay
+from app.domain.engine.state import GameState
 from app.domain.entities.game import Game
 from app.domain.entities.user import Player
 from app.domain.entities.card import GiftCard, Geisha
@@ -39,7 +43,9 @@ class MongoDBGameService:
                 round_number=game.round_number,
                 player_ids=[game.player1.id, game.player2.id],
                 geisha_ids=[g.id for g in game.geishas],
-                all_card_ids=[c.card_id for c in game.all_cards]
+                all_card_ids=[c.card_id for c in game.all_cards],
+                seed=game.seed,
+                action_log=encode_actions(game.actions)
             )
             
             # 使用upsert來避免重複
@@ -88,6 +94,7 @@ class MongoDBGameService:
         for card in game.all_cards:
             card_doc = GiftCardDocument(
                 card_id=card.card_id,
+                card_index=card.index,
                 geisha_id=card.geisha_id,
                 item_name=card.item_name,
                 charm_value=card.charm_value,
@@ -96,8 +103,9 @@ class MongoDBGameService:
                 game_id=game.game_id
             )
             
+            # 卡牌ID固定對應牌組位置，每局都相同，需以 (遊戲, 卡牌) 為鍵
             self.cards_collection.replace_one(
-                {"card_id": card.card_id},
+                {"game_id": game.game_id, "card_id": card.card_id},
                 card_doc.dict(by_alias=True, exclude={"id"}),
                 upsert=True
             )
@@ -138,8 +146,9 @@ class MongoDBGameService:
                 if player_doc:
                     # 載入玩家手牌
                     hand_cards = list(self.cards_collection.find({
+                        "game_id": game_id,
                         "card_id": {"$in": player_doc["hand_card_ids"]}
-                    }))
+                    }).sort("card_index", 1))
                     
                     players[player_id] = {
                         "id": player_doc["player_id"],
@@ -215,6 +224,35 @@ class MongoDBGameService:
             print(f"❌ 保存動作失敗: {e}")
             return False
     
+    def append_action(self, game_id: str, move: Move) -> bool:
+        """只追加一筆動作記錄 (狀態可由種子與動作記錄重建，不需每步保存完整狀態)"""
+        try:
+            result = self.games_collection.update_one(
+                {"game_id": game_id},
+                {
+                    "$push": {"action_log": encode_actions([move])[0]},
+                    "$set": {"updated_at": datetime.now()},
+                }
+            )
+            return result.matched_count == 1
+        except Exception as e:
+            print(f"❌ 追加動作記錄失敗: {e}")
+            return False
+    
+    def load_game_state(self, game_id: str, layout: DeckLayout, upto: Optional[int] = None) -> Optional[GameState]:
+        """從種子與動作記錄重建遊戲狀態"""
+        try:
+            game_doc = self.games_collection.find_one(
+                {"game_id": game_id}, {"seed": 1, "action_log": 1}
+            )
+            if not game_doc or game_doc.get("seed") is None:
+                return None
+            actions = decode_actions(game_doc.get("action_log", []))
+            return replay(layout, game_doc["seed"], actions, upto)
+        except Exception as e:
+            print(f"❌ 重建遊戲狀態失敗: {e}")
+            return None
+    
     def save_message(self, game_id: str, message: Dict[str, Any]) -> bool:
         """保存遊戲訊息"""
         try:
@@ -317,6 +355,7 @@ class MongoDBGameService:
         """將卡牌文檔轉為字典"""
         return {
             "id": card_doc["card_id"],
+            "index": card_doc["card_index"],
             "geisha_id": card_doc["geisha_id"],
             "item_name": card_doc["item_name"],
             "charm_value": card_doc["charm_value"],
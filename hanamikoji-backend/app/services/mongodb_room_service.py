@@ -35,7 +35,8 @@ class MongoDBRoomService:
                     "player_name": player.player_name,
                     "status": player.status,
                     "joined_at": player.joined_at,
-                    "last_seen": player.last_seen
+                    "last_seen": player.last_seen,
+                    "is_bot": player.is_bot
                 })
             
             # 建立房間文檔
@@ -48,6 +49,7 @@ class MongoDBRoomService:
                 created_at=room.created_at,
                 started_at=room.started_at,
                 finished_at=room.finished_at,
+                version=room.version,
                 updated_at=datetime.now()
             )
             
@@ -7,6 +7,7 @@ from datetime import datetime
 from app.domain.entities.room import Room, RoomPlayer
 from app.services.mongodb_room_service import MongoDBRoomService
 from app.services.game_service import GameService
+from app.services.channels import room_channels, make_message
 
 
 class RoomService:
@@ -88,32 +89,94 @@ class RoomService:
         # 更新房間狀態
         self.mongo_service.save_room(room)
         self._active_rooms[room.room_id] = room
+        self._publish_player_event(room, "player_joined", player_id, player_name)
         
         # 準備回應
         response = room.to_dict()
         
         # 如果房間滿了，準備開始遊戲
         if room.status == "starting":
-            # 自動創建遊戲
-            game_result = self._create_game_for_room(room)
-            if game_result.get("success"):
-                game_id = game_result["game_id"]
-                room.game_id = game_id
-                room.status = "playing"
-                room.started_at = datetime.now()
-                
-                # 更新房間狀態
-                self.mongo_service.save_room(room)
-                self._active_rooms[room.room_id] = room
-                
-                response = room.to_dict()
-                response["message"] = "遊戲已開始"
-                response["game_id"] = game_id
-            else:
-                response["message"] = "遊戲創建失敗，請稍後重試"
+            response = self._start_room_game(room)
             
         return response
     
+    def fill_with_bot(self, room_id: str) -> Dict:
+        """配對人數不足時，以電腦玩家補滿房間並開始遊戲"""
+        room = self.get_room(room_id)
+        
+        if not room:
+            return {
+                "error": "RoomNotFound",
+                "message": "房間不存在"
+            }
+        
+        if room.status != "waiting" or room.is_full():
+            return {
+                "error": "InvalidOperation",
+                "message": "只有等待中且未滿的房間可以加入電腦玩家"
+            }
+        
+        bot_id = f"bot_{uuid.uuid4().hex[:8]}"
+        room.add_player(bot_id, "電腦玩家", is_bot=True)
+        self.mongo_service.save_room(room)
+        self._active_rooms[room.room_id] = room
+        self._publish_player_event(room, "player_joined", bot_id, "電腦玩家")
+        print(f"🤖 電腦玩家已加入房間: {room.room_id}")
+        
+        return self._start_room_game(room)
+    
+    def _start_room_game(self, room: Room) -> Dict:
+        """房間滿員後自動創建遊戲並回傳房間資訊"""
+        response = room.to_dict()
+        
+        game_result = self._create_game_for_room(room)
+        if game_result.get("success"):
+            game_id = game_result["game_id"]
+            room.game_id = game_id
+            room.status = "playing"
+            room.started_at = datetime.now()
+            room.bump_version()
+            
+            # 更新房間狀態
+            self.mongo_service.save_room(room)
+            self._active_rooms[room.room_id] = room
+            
+            response = room.to_dict()
+            response["message"] = "遊戲已開始"
+            response["game_id"] = game_id
+            self._publish_game_started(room, game_result["game_data"])
+        else:
+            response["message"] = "遊戲創建失敗，請稍後重試"
+        
+        return response
+    
+    def _publish_player_event(self, room: Room, event_type: str, player_id: str, player_name: str) -> None:
+        """推送玩家加入/離開事件到房間頻道"""
+        room_channels.publish(room.room_id, make_message(event_type, {
+            "player_id": player_id,
+            "player_name": player_name,
+            "room_status": room.status,
+            "player_count": len(room.players)
+        }, player_id))
+    
+    def _publish_game_started(self, room: Room, game_data: Dict) -> None:
+        """推送遊戲開始事件 (遊戲中的玩家ID依座位對應房間玩家)"""
+        game_player_ids = list(game_data["players"])
+        current_seat = game_player_ids.index(game_data["current_player_id"])
+        room_channels.publish(room.room_id, make_message("game_started", {
+            "game_id": room.game_id,
+            "players": [
+                {
+                    "player_id": player.player_id,
+                    "player_name": player.player_name,
+                    "game_player_id": game_player_id,
+                    "is_bot": player.is_bot
+                }
+                for player, game_player_id in zip(room.players, game_player_ids)
+            ],
+            "current_player": room.players[current_seat].player_id
+        }))
+    
     def get_room(self, room_id: str) -> Optional[Room]:
         """獲取房間"""
         # 先從內存緩存查找
@@ -147,6 +210,7 @@ class RoomService:
             }
         
         # 移除玩家
+        player = room.get_player(player_id)
         success = room.remove_player(player_id)
         
         if not success:
@@ -157,6 +221,7 @@ class RoomService:
         
         # 更新房間狀態
         self.mongo_service.save_room(room)
+        self._publish_player_event(room, "player_left", player_id, player.player_name)
         
         # 如果房間空了，從緩存中移除
         if room.status == "abandoned":
@@ -270,7 +335,8 @@ class RoomService:
             game_service = GameService(self.db)
             game_data = game_service.create_game(
                 player1.player_name, 
-                player2.player_name
+                player2.player_name,
+                bot_seats=[seat for seat, player in enumerate(room.players) if player.is_bot]
             )
             
             # 提取 game_id
@@ -0,0 +1,56 @@
+"""長輪詢 - 讓請求停在 asyncio.Condition 上，直到狀態版本超過客戶端手上的版本或逾時
+
+等待中的請求只是一個暫停的協程，不佔 CPU；沒有人等待的遊戲不保留 Condition。
+notify 是同步的 (只排程喚醒)，可以直接從 GameService.execute_action 呼叫。
+"""
+
+import asyncio
+from typing import Callable, Dict
+
+
+class VersionWaiters:
+    """頻道ID -> (Condition, 等待數)"""
+
+    def __init__(self):
+        self._conditions: Dict[str, asyncio.Condition] = {}
+        self._counts: Dict[str, int] = {}
+
+    async def wait(self, channel_id: str, since: int, current_version: Callable[[], int], timeout: float) -> bool:
+        """等到 current_version() > since，回傳是否在逾時前等到"""
+        if current_version() > since:
+            return True
+
+        condition = self._conditions.get(channel_id)
+        if condition is None:
+            condition = self._conditions[channel_id] = asyncio.Condition()
+        self._counts[channel_id] = self._counts.get(channel_id, 0) + 1
+        try:
+            async with condition:
+                await asyncio.wait_for(condition.wait_for(lambda: current_version() > since), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._counts[channel_id] -= 1
+            if not self._counts[channel_id]:
+                del self._counts[channel_id]
+                del self._conditions[channel_id]
+
+    def waiting(self, channel_id: str) -> int:
+        return self._counts.get(channel_id, 0)
+
+    def notify(self, channel_id: str) -> None:
+        """版本已改變：喚醒此頻道所有等待中的請求 (沒有等待者時不做事)"""
+        condition = self._conditions.get(channel_id)
+        if condition is None:
+            return
+        asyncio.get_running_loop().create_task(self._notify_all(condition))
+
+    @staticmethod
+    async def _notify_all(condition: asyncio.Condition) -> None:
+        async with condition:
+            condition.notify_all()
+
+
+# 遊戲狀態版本的等待者 (以遊戲ID為頻道)
+game_waiters = VersionWaiters()
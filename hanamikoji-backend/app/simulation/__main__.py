@@ -0,0 +1,43 @@
+"""自我對弈模擬 CLI
+
+用法: python -m app.simulation --games 100000 --policies greedy random --workers 8 --seed 42
+"""
+
+import argparse
+import json
+
+from app.domain.factories.game_factory import get_template_registry
+from app.simulation.policies import POLICIES
+from app.simulation.simulator import DEFAULT_BATCH_SIZE, DEFAULT_MAX_ROUNDS, run_simulation
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="花見小路自我對弈模擬")
+    parser.add_argument("--games", type=int, default=10000, help="對局數")
+    parser.add_argument("--policies", nargs=2, default=["random", "random"],
+                        choices=sorted(POLICIES), metavar="POLICY",
+                        help=f"座位0與座位1的策略 ({', '.join(sorted(POLICIES))})")
+    parser.add_argument("--workers", type=int, default=None, help="工作行程數 (預設為CPU數)")
+    parser.add_argument("--seed", type=int, default=0, help="隨機種子")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="每批對局數")
+    parser.add_argument("--max-rounds", type=int, default=DEFAULT_MAX_ROUNDS, help="每局最多回合數")
+    parser.add_argument("--data-dir", default="app/domain/data", help="遊戲資料目錄")
+    args = parser.parse_args()
+
+    stats = run_simulation(
+        args.games,
+        tuple(args.policies),
+        seed=args.seed,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        max_rounds=args.max_rounds,
+        data_dir=args.data_dir,
+    )
+    report = stats.to_dict(get_template_registry(args.data_dir).layout.geisha_ids)
+    report["policies"] = list(args.policies)
+    report["seed"] = args.seed
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""向量化批次評估 (NumPy)
+
+將 N 個局面堆疊成 (N × 藝妓數 × 2) 的張數陣列，一次算出所有局面的藝妓青睞、
+魅力總和、藝妓數與勝者，取代逐局逐藝妓的 Python 迴圈。
+魅力值取自模板註冊表 (由 GameDataLoader 載入)。
+"""
+
+import threading
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from app.domain.engine.layout import DeckLayout
+from app.domain.engine.state import NO_WINNER, WIN_CHARM, WIN_GEISHA_COUNT, GameState, iter_bits
+from app.domain.factories.game_factory import get_template_registry
+
+NEUTRAL = -1
+
+
+@dataclass
+class BatchResult:
+    """批次評估結果 (皆為 NumPy 陣列)"""
+    favor: "np.ndarray"    # (N, 藝妓數)：0/1 為獲得青睞的座位，-1 為中立
+    charm: "np.ndarray"    # (N, 2)：各座位魅力總和
+    geishas: "np.ndarray"  # (N, 2)：各座位獲得青睞的藝妓數
+    winner: "np.ndarray"   # (N,)：勝者座位，-1 表示尚無勝者
+
+
+class BatchEvaluator:
+    """以固定的魅力值向量批次評估局面"""
+
+    def __init__(self, charms: Sequence[int]):
+        self.charms = np.asarray(charms, dtype=np.int16)
+        self.geisha_count = len(charms)
+
+    def evaluate(self, counts: "np.ndarray") -> BatchResult:
+        """counts 為 (N, 藝妓數, 2) 的張數 (平手的藝妓為中立)"""
+        diff = counts[:, :, 0].astype(np.int16) - counts[:, :, 1]
+        favor = np.where(diff > 0, 0, np.where(diff < 0, 1, NEUTRAL)).astype(np.int8)
+
+        seats = np.stack((favor == 0, favor == 1), axis=1)  # (N, 2, 藝妓數)
+        geishas = seats.sum(axis=2, dtype=np.int16)
+        charm = (seats * self.charms).sum(axis=2, dtype=np.int16)
+
+        reached = (geishas >= WIN_GEISHA_COUNT) | (charm >= WIN_CHARM)
+        both = reached[:, 0] & reached[:, 1]
+        # 雙方都達成時比藝妓數，再比魅力
+        ahead = np.where(geishas[:, 0] != geishas[:, 1], geishas[:, 0] > geishas[:, 1], charm[:, 0] > charm[:, 1])
+        behind = np.where(geishas[:, 0] != geishas[:, 1], geishas[:, 0] < geishas[:, 1], charm[:, 0] < charm[:, 1])
+        winner = np.full(len(favor), NO_WINNER, dtype=np.int8)
+        winner[reached[:, 0] & ~reached[:, 1]] = 0
+        winner[reached[:, 1] & ~reached[:, 0]] = 1
+        winner[both & ahead] = 0
+        winner[both & behind] = 1
+        return BatchResult(favor, charm, geishas, winner)
+
+    def stack(self, states: Sequence[GameState], reveal_secrets: bool = True) -> "np.ndarray":
+        """將局面堆疊為 (N, 藝妓數, 2) 的張數陣列
+
+        reveal_secrets 為 True 時把秘密卡計入，得到本回合結束時的結果。
+        """
+        n = len(states)
+        counts = np.array([state.counts for state in states], dtype=np.int8).reshape(n, self.geisha_count, 2)
+        if reveal_secrets:
+            for i, state in enumerate(states):
+                card_geisha = state.layout.card_geisha
+                for seat in (0, 1):
+                    for card in iter_bits(state.secrets[seat]):
+                        counts[i, card_geisha[card], seat] += 1
+        return counts
+
+    def evaluate_states(self, states: Sequence[GameState], reveal_secrets: bool = True) -> BatchResult:
+        return self.evaluate(self.stack(states, reveal_secrets))
+
+
+_evaluator: Optional[BatchEvaluator] = None
+_evaluator_lock = threading.Lock()
+
+
+def get_batch_evaluator(layout: Optional[DeckLayout] = None) -> BatchEvaluator:
+    """取得行程共用的批次評估器"""
+    global _evaluator
+    if _evaluator is None:
+        with _evaluator_lock:
+            if _evaluator is None:
+                layout = layout or get_template_registry().layout
+                _evaluator = BatchEvaluator(layout.charms)
+    return _evaluator
+
+
+def favor_totals(favor_masks: Sequence[int], geisha_count: int) -> List[int]:
+    """統計一批青睞遮罩中各藝妓被取得的次數"""
+    masks = np.asarray(favor_masks, dtype=np.int64)
+    return (((masks[:, None] >> np.arange(geisha_count)) & 1).sum(axis=0)).tolist()
+
+
+def round_values(states: Sequence[GameState], seat: int, scale: float) -> List[float]:
+    """回合結束後各局面對 seat 的估值 (0~1)，與 mcts.round_value 相同
+
+    已分出勝負的局面為 1/0，否則以 (魅力差 + 2 × 藝妓數差) / scale 線性估值。
+    """
+    if not states:
+        return []
+    evaluator = get_batch_evaluator(states[0].layout)
+    result = evaluator.evaluate_states(states, reveal_secrets=False)
+    other = 1 - seat
+    diff = (result.charm[:, seat] - result.charm[:, other]) + 2 * (result.geishas[:, seat] - result.geishas[:, other])
+    values = np.clip(0.5 + diff / scale, 0.0, 1.0)
+    values = np.where(result.winner == seat, 1.0, np.where(result.winner == other, 0.0, values))
+    return values.tolist()
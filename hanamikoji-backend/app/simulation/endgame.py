@@ -0,0 +1,193 @@
+"""殘局精確求解
+
+牌庫只剩最後幾張時，剩下的隱藏資訊只有對手的手牌/秘密卡/棄牌、牌庫的抽牌順序
+與被移除的卡。對這些卡的所有可能分配取平均 (期望值節點)，每種分配再以 alpha-beta
+解到回合結束 (回合結束即停止，不洗牌發下一回合)。置換表以 Zobrist 雜湊為鍵、依記憶體上限做 LRU 淘汰，
+並由同一行程中的所有對局共用。每種分配只完整計算一次雜湊，之後由 GameState 隨動作增量更新。
+"""
+
+import threading
+from collections import OrderedDict
+from itertools import combinations, permutations
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from app.domain.engine.layout import DeckLayout
+from app.domain.engine.moves import Move
+from app.domain.engine.state import GameState, mask_of
+from app.domain.engine.zobrist import zobrist_keys
+from app.simulation.mcts import play_move, round_value, state_moves
+
+DEFAULT_TABLE_BYTES = 64 * 1024 * 1024
+# 牌庫剩下幾張以內改由求解器計算 (每多一張，分配數約多一個數量級)
+DEFAULT_ENDGAME_DRAWS = 1
+# 置換表每個項目 (OrderedDict 節點、64位元鍵與 (值, 旗標) tuple) 的估計大小
+ENTRY_BYTES = 200
+
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+
+def deck_remaining(state: GameState) -> int:
+    """牌庫中尚未抽出的張數"""
+    return len(state.order) - 1 - state.draw_pos
+
+
+def is_endgame(state: GameState, draws: int = DEFAULT_ENDGAME_DRAWS) -> bool:
+    """牌庫是否只剩 draws 張以內"""
+    return not state.is_finished and deck_remaining(state) <= draws
+
+
+class TranspositionTable:
+    """依記憶體上限淘汰最久未使用項目的置換表"""
+
+    def __init__(self, max_bytes: int = DEFAULT_TABLE_BYTES):
+        self.max_entries = max(1, max_bytes // ENTRY_BYTES)
+        self._entries: 'OrderedDict[int, Tuple[float, int]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: int) -> Optional[Tuple[float, int]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: int, value: float, flag: int) -> None:
+        with self._lock:
+            self._entries[key] = (value, flag)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "max_entries": self.max_entries, "hits": self.hits, "misses": self.misses}
+
+
+class EndgameSolver:
+    """殘局求解器 (值一律以座位0的觀點表示，0~1)"""
+
+    def __init__(self, layout: DeckLayout, max_bytes: int = DEFAULT_TABLE_BYTES):
+        self.layout = layout
+        self.keys = zobrist_keys(layout)
+        self.table = TranspositionTable(max_bytes)
+
+    def best_move(self, state: GameState) -> Move:
+        """依行動玩家可見的資訊，選擇期望值最高的動作"""
+        seat = state.to_move
+        samples = list(self.assignments(state, seat))
+        best_move, best_value = None, -1.0
+        for move in state_moves(state):
+            total = 0.0
+            for sample in samples:
+                child = sample.copy()
+                play_move(child, move)
+                total += self._value(child, state.round_number)
+            value = total / len(samples)
+            if seat == 1:
+                value = 1.0 - value
+            if value > best_value:
+                best_move, best_value = move, value
+        return best_move
+
+    def assignments(self, state: GameState, seat: int) -> Iterator[GameState]:
+        """列舉 seat 看不到的卡牌的所有分配方式 (含牌庫的抽牌順序)"""
+        other = 1 - seat
+        known = (
+            state.hands[seat] | state.secrets[seat] | state.discards[seat]
+            | state.allocated[0] | state.allocated[1] | state.pending_offer
+        )
+        unknown = [card for card in range(self.layout.card_count) if not known >> card & 1]
+        sizes = (state.hands[other].bit_count(), state.secrets[other].bit_count(), state.discards[other].bit_count())
+        drawn = list(state.order[:state.draw_pos])
+
+        def split(cards: List[int], depth: int) -> Iterator[Tuple[List[int], Tuple[int, ...]]]:
+            if depth == len(sizes):
+                # 剩下的卡牌依序為牌庫與被移除的卡
+                for rest in permutations(cards):
+                    yield [], rest
+                return
+            for group in combinations(cards, sizes[depth]):
+                rest = [card for card in cards if card not in group]
+                for masks, tail in split(rest, depth + 1):
+                    yield [mask_of(group)] + masks, tail
+
+        for (hand, secret, discard), rest in split(unknown, 0):
+            sample = state.copy()
+            sample.stop_at_round_end = True
+            sample.hands[other] = hand
+            sample.secrets[other] = secret
+            sample.discards[other] = discard
+            sample.order = drawn + list(rest)
+            sample.removed = 1 << rest[-1]
+            sample.enable_zobrist(self.keys)
+            yield sample
+
+    def solve(self, state: GameState, alpha: float = 0.0, beta: float = 1.0) -> float:
+        """完全資訊下以 alpha-beta 解到回合結束"""
+        original_alpha, original_beta = alpha, beta
+        key = state.zobrist_key
+        entry = self.table.get(key)
+        if entry is not None:
+            value, flag = entry
+            if flag == EXACT:
+                return value
+            if flag == LOWER:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if alpha >= beta:
+                return value
+
+        maximizing = state.to_move == 0
+        best = 0.0 if maximizing else 1.0
+        for move in state_moves(state):
+            child = state.copy()
+            play_move(child, move)
+            value = self._value(child, state.round_number, alpha, beta)
+            if maximizing:
+                best = max(best, value)
+                alpha = max(alpha, best)
+            else:
+                best = min(best, value)
+                beta = min(beta, best)
+            if alpha >= beta:
+                break
+
+        if best <= original_alpha:
+            flag = UPPER
+        elif best >= original_beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.table.put(key, best, flag)
+        return best
+
+    def _value(self, state: GameState, round_number: int, alpha: float = 0.0, beta: float = 1.0) -> float:
+        if state.is_finished or state.round_number != round_number:
+            return round_value(state, 0)
+        return self.solve(state, alpha, beta)
+
+
+_solvers: Dict[DeckLayout, EndgameSolver] = {}
+_solvers_lock = threading.Lock()
+
+
+def get_endgame_solver(layout: DeckLayout, max_bytes: int = DEFAULT_TABLE_BYTES) -> EndgameSolver:
+    """取得行程共用的殘局求解器 (置換表跨對局保留)"""
+    solver = _solvers.get(layout)
+    if solver is None:
+        with _solvers_lock:
+            solver = _solvers.get(layout)
+            if solver is None:
+                solver = EndgameSolver(layout, max_bytes)
+                _solvers[layout] = solver
+    return solver
@@ -0,0 +1,67 @@
+"""行程共用的評估快取
+
+以對稱正規鍵為索引，保存搜尋後根節點各正規動作的造訪次數。
+電腦玩家 (MCTSPolicy.best_move) 先查快取、沒有時搜尋後寫入；提示請求的搜尋樹
+(grow_tree_worker) 每次搜尋完也把根節點的造訪次數寫入。提示仍以自己的樹排序 (需要勝率與
+造訪次數)，不讀取快取。快取在各工作行程內共用，等價局面只需搜尋一次。
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+
+from app.domain.engine.canonical import CanonicalMove
+
+DEFAULT_CACHE_SIZE = 1 << 16
+
+
+class EvaluationCache:
+    """最多保留 max_entries 個局面的 LRU 快取"""
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Hashable, Dict[CanonicalMove, int]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Dict[CanonicalMove, int]]:
+        with self._lock:
+            visits = self._entries.get(key)
+            if visits is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return visits
+
+    def put(self, key: Hashable, visits: Dict[CanonicalMove, int]) -> None:
+        with self._lock:
+            self._entries[key] = visits
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "max_entries": self.max_entries, "hits": self.hits, "misses": self.misses}
+
+
+_cache: Optional[EvaluationCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_evaluation_cache() -> EvaluationCache:
+    """取得 (必要時建立) 行程共用的評估快取"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = EvaluationCache()
+    return _cache
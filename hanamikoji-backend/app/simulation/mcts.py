@@ -0,0 +1,344 @@
+"""蒙地卡羅樹搜尋 (資訊集 MCTS + 隱藏資訊確定化)
+
+每次迭代先把自己看不到的卡牌 (對手手牌、對手秘密卡與棄牌、牌庫順序、被移除的卡)
+重新隨機分配，再在共用的搜尋樹上以 UCB 選擇只在此確定化中合法的子節點。
+搜尋只展開到本回合結束，回合結束時以青睞差距估值。
+"""
+
+import math
+import random
+import time
+from concurrent.futures import Executor
+from typing import Dict, List, Optional, Tuple
+
+from app.domain.engine.canonical import CanonicalMove, canonical_move, canonicalize, resolve_move
+from app.domain.engine.layout import DeckLayout
+from app.domain.engine.moves import Move, legal_actions, legal_responses
+from app.domain.engine.state import (
+    ACTION_CARD_COUNTS, PHASE_RESPOND, GameState, NO_WINNER, iter_bits, mask_of,
+)
+from app.domain.enums.game_enums import ActionType
+from app.simulation.batch_eval import round_values
+from app.simulation.evaluation_cache import EvaluationCache, get_evaluation_cache
+from app.simulation.policies import Policy
+
+EXPLORATION = 0.7
+# 回合結束時估值的正規化常數 (魅力差最多21、藝妓數差最多7)
+VALUE_SCALE = 70.0
+
+
+class Node:
+    """搜尋樹節點"""
+
+    __slots__ = ("move", "parent", "seat", "children", "visits", "wins", "avails")
+
+    def __init__(self, move: Optional[Move], parent: Optional['Node'], seat: int):
+        self.move = move
+        self.parent = parent
+        self.seat = seat  # 做出此動作的座位
+        self.children: Dict[Move, 'Node'] = {}
+        self.visits = 0
+        self.wins = 0.0
+        self.avails = 1
+
+
+def determinize(state: GameState, seat: int, rng: random.Random) -> GameState:
+    """依 seat 的視角隨機分配看不到的卡牌 (搜尋只到回合結束)"""
+    sample = state.copy()
+    sample.stop_at_round_end = True
+    other = 1 - seat
+    known = (
+        state.hands[seat] | state.secrets[seat] | state.discards[seat]
+        | state.allocated[0] | state.allocated[1] | state.pending_offer
+    )
+    unknown = list(iter_bits(state.layout.full_mask & ~known))
+    rng.shuffle(unknown)
+
+    pos = 0
+    for masks in (sample.hands, sample.secrets, sample.discards):
+        count = masks[other].bit_count()
+        masks[other] = mask_of(unknown[pos:pos + count])
+        pos += count
+
+    deck = unknown[pos:-1]
+    removed = unknown[-1]
+    sample.order = tuple(state.order[:state.draw_pos]) + tuple(deck) + (removed,)
+    sample.removed = 1 << removed
+    return sample
+
+
+def state_moves(state: GameState) -> List[Move]:
+    """目前需要做決定的玩家所有動作；回應以 (None, 選擇遮罩, 0) 表示"""
+    if state.phase == PHASE_RESPOND:
+        return [(None, chosen, 0) for chosen in legal_responses(state)]
+    return legal_actions(state)
+
+
+def play_move(state: GameState, move: Move) -> None:
+    action, cards, split = move
+    if action is None:
+        state.respond(cards)
+    else:
+        state.apply_action(action, cards, split)
+
+
+def round_value(state: GameState, seat: int) -> float:
+    """回合結束後 seat 的估值 (0~1)"""
+    if state.is_finished:
+        return 1.0 if state.winner == seat else 0.0
+    other = 1 - seat
+    diff = (state.charm_total(seat) - state.charm_total(other)) + 2 * (state.geisha_count(seat) - state.geisha_count(other))
+    return min(1.0, max(0.0, 0.5 + diff / VALUE_SCALE))
+
+
+def rollout(state: GameState, rng: random.Random, round_number: int) -> None:
+    """隨機下完本回合"""
+    while not state.is_finished and state.round_number == round_number:
+        if state.phase == PHASE_RESPOND:
+            offer = list(iter_bits(state.pending_offer))
+            if state.pending_action == ActionType.GIFT:
+                state.respond(1 << rng.choice(offer))
+            else:
+                state.respond(rng.choice((state.pending_split, state.pending_offer ^ state.pending_split)))
+            continue
+        seat = state.current
+        action = rng.choice([a for a in ActionType if not state.has_used(seat, a)])
+        cards = rng.sample(list(iter_bits(state.hands[seat])), ACTION_CARD_COUNTS[action])
+        split = mask_of(cards[:2]) if action == ActionType.COMPETE else 0
+        state.apply_action(action, mask_of(cards), split)
+
+
+def search(root_state: GameState, rng: random.Random, iterations: Optional[int] = None,
+           time_limit: Optional[float] = None, rollouts: int = 1) -> Dict[Move, int]:
+    """從 root_state 的行動玩家視角搜尋，回傳根節點各動作的造訪次數
+
+    rollouts > 1 時每個葉節點模擬多次，結果交給批次評估器一次計算後取平均。
+    """
+    root = Node(None, None, NO_WINNER)
+    grow(root, root_state, rng, iterations, time_limit, rollouts)
+    return {move: child.visits for move, child in root.children.items()}
+
+
+def grow(root: Node, root_state: GameState, rng: random.Random, iterations: Optional[int] = None,
+         time_limit: Optional[float] = None, rollouts: int = 1) -> int:
+    """在既有的樹上繼續搜尋，回傳本次的迭代次數"""
+    if iterations is None and time_limit is None:
+        iterations = 1000
+    seat = root_state.to_move
+    round_number = root_state.round_number
+    deadline = time.perf_counter() + time_limit if time_limit is not None else None
+
+    done = 0
+    while (iterations is None or done < iterations) and (deadline is None or time.perf_counter() < deadline):
+        done += 1
+        state = determinize(root_state, seat, rng)
+        node = root
+
+        # 選擇與擴展
+        while not state.is_finished and state.round_number == round_number:
+            moves = state_moves(state)
+            mover = state.to_move
+            untried = [m for m in moves if m not in node.children]
+            legal_children = [node.children[m] for m in moves if m in node.children]
+            for child in legal_children:
+                child.avails += 1
+            if untried:
+                move = rng.choice(untried)
+                play_move(state, move)
+                child = Node(move, node, mover)
+                node.children[move] = child
+                node = child
+                break
+            node = max(legal_children, key=lambda c: c.wins / c.visits + EXPLORATION * math.sqrt(math.log(c.avails) / c.visits))
+            play_move(state, node.move)
+
+        # 模擬與回傳
+        if rollouts > 1:
+            leaves = [state.copy() for _ in range(rollouts)]
+            for leaf in leaves:
+                rollout(leaf, rng, round_number)
+            values = round_values(leaves, 0, VALUE_SCALE)
+            value = sum(values) / rollouts
+        else:
+            rollout(state, rng, round_number)
+            value = round_value(state, 0)
+        while node is not None:
+            node.visits += 1
+            if node.seat != NO_WINNER:
+                node.wins += value if node.seat == 0 else 1.0 - value
+            node = node.parent
+
+    return done
+
+
+def move_signature(layout: DeckLayout, move: Move) -> Tuple:
+    """動作的等價類別 (同藝妓的卡牌可互換)，用於把實際動作對應到樹上的子節點"""
+    action, cards, split = move
+    geishas = tuple(sorted(layout.card_geisha[card] for card in iter_bits(cards)))
+    if not split:
+        return action, geishas
+    first = tuple(sorted(layout.card_geisha[card] for card in iter_bits(split)))
+    second = tuple(sorted(layout.card_geisha[card] for card in iter_bits(cards & ~split)))
+    return action, geishas, min(first, second), max(first, second)
+
+
+class SearchTree:
+    """可延續的搜尋樹 (提示用)
+
+    保留之前搜尋累積的統計；實際動作發生後把根移到對應的子節點 (搜尋沒有展開到的動作
+    就建立新節點)，因此同一局重複要求提示時只需補上新的迭代。搜尋只到回合結束，換回合時重新建樹。
+    樹可以 pickle，連同局面送到工作行程搜尋後再取回。
+    """
+
+    def __init__(self, state: GameState):
+        self.root = Node(None, None, NO_WINNER)
+        self.round_number = state.round_number
+
+    def advance(self, layout: DeckLayout, moves: List[Move]) -> bool:
+        """依序套用實際動作並移動根節點，回傳新的根是否保有之前的搜尋統計
+
+        對手的動作或隨機分配的手牌常常沒有在搜尋中展開，此時建立新節點繼續往下走，
+        之後的實際動作若在之前的搜尋中出現過仍可接上。
+        """
+        for move in moves:
+            signature = move_signature(layout, move)
+            matches = [
+                child for child in self.root.children.values()
+                if move_signature(layout, child.move) == signature
+            ]
+            if matches:
+                root = max(matches, key=lambda child: child.visits)
+            else:
+                root = Node(None, None, NO_WINNER)
+            root.parent = None
+            root.move = None
+            self.root = root
+        return self.root.visits > 0
+
+    def search(self, state: GameState, rng: random.Random, iterations: Optional[int] = None,
+               time_limit: Optional[float] = None) -> int:
+        return grow(self.root, state, rng, iterations, time_limit)
+
+    def share_visits(self, state: GameState, cache: EvaluationCache) -> None:
+        """把根節點各動作的造訪次數依對稱正規鍵寫入評估快取，供遇到等價局面的電腦玩家直接使用"""
+        key, perm = canonicalize(state)
+        visits: Dict[CanonicalMove, int] = {}
+        for move, child in self.root.children.items():
+            if child.visits:
+                canonical = canonical_move(state, move, perm)
+                visits[canonical] = visits.get(canonical, 0) + child.visits
+        if visits:
+            cache.put(key, visits)
+
+    def ranked(self, state: GameState) -> List[Tuple[Move, float, int]]:
+        """目前局面的合法動作依造訪次數排序，回傳 (動作, 行動玩家的估值, 造訪次數)"""
+        children = self.root.children
+        ranked = [
+            (move, children[move].wins / children[move].visits, children[move].visits)
+            for move in state_moves(state)
+            if move in children and children[move].visits
+        ]
+        ranked.sort(key=lambda item: (item[2], item[1]), reverse=True)
+        return ranked
+
+
+def grow_tree_worker(tree: SearchTree, state: GameState, seed: int,
+                     time_limit: Optional[float]) -> Tuple[SearchTree, int]:
+    """行程池工作函式：繼續搜尋送來的樹並寫入本行程的評估快取，回傳 (搜尋後的樹, 迭代次數)"""
+    iterations = tree.search(state, random.Random(seed), None, time_limit)
+    tree.share_visits(state, get_evaluation_cache())
+    return tree, iterations
+
+
+def _search_worker(state: GameState, seed: int, iterations: Optional[int],
+                   time_limit: Optional[float], rollouts: int = 1) -> Dict[Move, int]:
+    return search(state, random.Random(seed), iterations, time_limit, rollouts)
+
+
+def parallel_search(state: GameState, rng: random.Random, executor: Executor, workers: int,
+                    iterations: Optional[int] = None, time_limit: Optional[float] = None,
+                    rollouts: int = 1) -> Dict[Move, int]:
+    """根平行化：各行程獨立搜尋後合併根節點造訪次數"""
+    snapshot = state.copy()
+    futures = [
+        executor.submit(_search_worker, snapshot, rng.getrandbits(64), iterations, time_limit, rollouts)
+        for _ in range(workers)
+    ]
+    merged: Dict[Move, int] = {}
+    for future in futures:
+        for move, visits in future.result().items():
+            merged[move] = merged.get(move, 0) + visits
+    return merged
+
+
+class MCTSPolicy(Policy):
+    """MCTS 策略 (可設定迭代次數或每步時間上限，以及根平行的行程數)
+
+    回合第一手查開局庫；回應獻禮/競爭與其他行動一樣搜尋 (回應表只是逐藝妓的估計，
+    與搜尋的選擇只有約六成相同，只給查表策略使用)；搜尋結果依對稱正規鍵存入行程共用的評估快取；
+    牌庫只剩 endgame_draws 張以內時交給殘局求解器。
+    """
+
+    name = "mcts"
+
+    def __init__(self, iterations: Optional[int] = 400, time_limit: Optional[float] = None,
+                 workers: int = 1, executor: Optional[Executor] = None, use_cache: bool = True,
+                 rollouts: int = 1, endgame_draws: Optional[int] = None):
+        self.iterations = iterations
+        self.time_limit = time_limit
+        self.rollouts = rollouts
+        self.workers = workers
+        self.executor = executor
+        self.use_cache = use_cache
+        self.endgame_draws = endgame_draws
+
+    def best_move(self, state: GameState, rng: random.Random) -> Move:
+        moves = state_moves(state)
+        if len(moves) == 1:
+            return moves[0]
+        # 牌庫快抽完時改由殘局求解器精確計算
+        from app.simulation.endgame import DEFAULT_ENDGAME_DRAWS, get_endgame_solver, is_endgame
+        draws = DEFAULT_ENDGAME_DRAWS if self.endgame_draws is None else self.endgame_draws
+        if is_endgame(state, draws):
+            return get_endgame_solver(state.layout).best_move(state)
+
+        # 回合第一手查開局庫
+        from app.simulation.opening_book import get_opening_book
+        book = get_opening_book()
+        entry = book.lookup(state) if book is not None else None
+        if entry is not None:
+            return resolve_move(state, *entry)
+
+        key, perm = canonicalize(state)
+        cache = get_evaluation_cache() if self.use_cache else None
+        visits = cache.get(key) if cache is not None else None
+        if visits is None:
+            visits = {}
+            for move, count in self.search_visits(state, rng).items():
+                canonical = canonical_move(state, move, perm)
+                visits[canonical] = visits.get(canonical, 0) + count
+            if cache is not None:
+                cache.put(key, visits)
+        best = max(visits.items(), key=lambda item: item[1])[0]
+        return resolve_move(state, best, perm)
+
+    def search_visits(self, state: GameState, rng: random.Random) -> Dict[Move, int]:
+        """依設定的預算 (單行程或根平行) 搜尋，回傳根節點各動作的造訪次數"""
+        if self.workers > 1:
+            executor = self.executor
+            if executor is None:
+                from app.simulation.pool import get_process_pool
+                executor = get_process_pool()
+            return parallel_search(state, rng, executor, self.workers, self.iterations, self.time_limit, self.rollouts)
+        return search(state, rng, self.iterations, self.time_limit, self.rollouts)
+
+    def choose_action(self, state: GameState, rng: random.Random) -> Move:
+        return self.best_move(state, rng)
+
+    def choose_response(self, state: GameState, rng: random.Random) -> int:
+        return self.best_move(state, rng)[1]
+
+
+def best_move_worker(policy: MCTSPolicy, state: GameState, seed: int) -> Move:
+    """行程池工作函式：在工作行程中以 policy 選擇動作"""
+    return policy.best_move(state, random.Random(seed))
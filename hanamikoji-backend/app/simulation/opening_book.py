@@ -0,0 +1,259 @@
+"""開局庫 - 離線預先計算每回合第一個行動
+
+第一手沒有任何歷史，手牌 (抽牌後7張) 在藝妓對稱下的種類很少。
+此模組列舉所有正規開局手牌 (212 種)，以 MCTS 搜尋最佳第一手，寫成緊密的二進位表，
+電腦玩家啟動時以 mmap 載入，查表即可跳過每局最昂貴的一次搜尋。
+
+平手時藝妓為中立，回合結果與之前的青睞無關，因此每回合的第一手都可以查表。
+
+檔案格式 (little-endian)：
+    標頭   magic "HKOB"、版本 (uint16)、正規位置數 (uint16)、佈局指紋 (uint32)、手牌種類數 N (uint32)、
+           每個位置的進位基數 (uint8 × 正規位置數)
+    索引   N 個手牌的混合進位索引 (uint16，遞增排列)，查詢時以二分搜尋找到排名
+    項目   依排名排列的 N 個項目，每項 7 bytes：
+           行動類型 (uint8)、卡牌正規位置 ×4、第一組正規位置 ×2 (不足的位置為 0xFF)
+用法: python -m app.simulation.opening_book --iterations 2000 --output app/domain/data/opening_book.bin
+"""
+
+import argparse
+import mmap
+import os
+import random
+import struct
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from app.domain.engine.canonical import CanonicalMove, canonicalize, canonical_move, symmetry_classes
+from app.domain.engine.layout import DeckLayout
+from app.domain.engine.state import HAND_SIZE, PHASE_ACTION, GameState
+from app.domain.enums.game_enums import ActionType
+from app.domain.factories.game_factory import get_template_registry
+
+MAGIC = b"HKOB"
+VERSION = 2
+HEADER = struct.Struct("<4sHHII")
+INDEX = struct.Struct("<H")
+ENTRY = struct.Struct("<B4B2B")
+EMPTY = 0xFF
+OPENING_HAND_SIZE = HAND_SIZE + 1
+DEFAULT_BOOK_PATH = "app/domain/data/opening_book.bin"
+
+
+def slot_radices(layout: DeckLayout) -> Tuple[int, ...]:
+    """每個正規位置的手牌張數上限 + 1"""
+    sizes = [0] * layout.geisha_count
+    for geisha in layout.card_geisha:
+        sizes[geisha] += 1
+    return tuple(sizes[geisha] + 1 for group in symmetry_classes(layout) for geisha in group)
+
+
+def hand_index(counts: Tuple[int, ...], radices: Tuple[int, ...]) -> int:
+    index = 0
+    for count, radix in zip(counts, radices):
+        index = index * radix + count
+    return index
+
+
+def is_opening(state: GameState) -> bool:
+    """是否為回合第一手 (先手抽牌後、雙方都還沒行動)"""
+    return (
+        state.phase == PHASE_ACTION
+        and not (state.used[0] | state.used[1])
+        and state.hands[state.current].bit_count() == OPENING_HAND_SIZE
+    )
+
+
+def opening_counts(state: GameState) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+    """回傳 (各正規位置的手牌張數, 正規位置 -> 實際藝妓索引)"""
+    key, perm = canonicalize(state)
+    counts = tuple(row[0] for group in key[0] for row in group)
+    return counts, perm
+
+
+def _encode(move: CanonicalMove) -> bytes:
+    action, card_slots, split_slots = move
+    cards = tuple(card_slots) + (EMPTY,) * (4 - len(card_slots))
+    split = tuple(split_slots) + (EMPTY,) * (2 - len(split_slots))
+    return ENTRY.pack(action.value, *cards, *split)
+
+
+def _decode(data: Tuple[int, ...]) -> CanonicalMove:
+    cards = tuple(slot for slot in data[1:5] if slot != EMPTY)
+    split = tuple(slot for slot in data[5:7] if slot != EMPTY)
+    return ActionType(data[0]), cards, split
+
+
+class OpeningBook:
+    """以 mmap 載入的開局庫"""
+
+    def __init__(self, path: str, layout: DeckLayout):
+        self.path = path
+        self.layout = layout
+        self.radices = slot_radices(layout)
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, slots, fingerprint, count = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"開局庫格式不符: {path}")
+        if slots != len(self.radices) or fingerprint != layout.fingerprint():
+            raise ValueError(f"開局庫與目前的遊戲資料不符: {path}")
+        index_offset = HEADER.size + slots
+        self._entries_offset = index_offset + count * INDEX.size
+        if self._entries_offset + count * ENTRY.size != len(self._mmap):
+            raise ValueError(f"開局庫長度不符: {path}")
+        # 索引只有幾百個 uint16，複製一份以便二分搜尋
+        self._index = array("H", self._mmap[index_offset:self._entries_offset])
+        if sys.byteorder != "little":
+            self._index.byteswap()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def lookup(self, state: GameState) -> Optional[Tuple[CanonicalMove, Tuple[int, ...]]]:
+        """查詢第一手，回傳 (正規動作, 正規位置 -> 實際藝妓索引)；不適用或無資料時回傳 None"""
+        if not is_opening(state):
+            return None
+        counts, perm = opening_counts(state)
+        index = hand_index(counts, self.radices)
+        rank = bisect_left(self._index, index)
+        if rank == len(self._index) or self._index[rank] != index:
+            return None
+        move = _decode(ENTRY.unpack_from(self._mmap, self._entries_offset + rank * ENTRY.size))
+        return move, perm
+
+    def close(self) -> None:
+        self._mmap.close()
+
+
+_book: Optional[OpeningBook] = None
+_book_lock = threading.Lock()
+
+
+def load_opening_book(path: str = DEFAULT_BOOK_PATH, layout: Optional[DeckLayout] = None) -> Optional[OpeningBook]:
+    """載入開局庫 (檔案不存在時回傳 None，電腦玩家改為即時搜尋)"""
+    global _book
+    if not os.path.exists(path):
+        print(f"⚠️ 找不到開局庫 {path}，電腦玩家將即時搜尋第一手")
+        return None
+    layout = layout or get_template_registry().layout
+    with _book_lock:
+        if _book is not None:
+            _book.close()
+        _book = OpeningBook(path, layout)
+    print(f"✅ 已載入開局庫: {path}")
+    return _book
+
+
+def get_opening_book() -> Optional[OpeningBook]:
+    """取得已載入的開局庫"""
+    return _book
+
+
+# ---- 離線產生 ----
+
+def iter_opening_hands(radices: Tuple[int, ...], classes: Tuple[Tuple[int, ...], ...]) -> Iterator[Tuple[int, ...]]:
+    """列舉所有正規開局手牌 (同一對稱類別內張數遞增)"""
+    slot_class = [c for c, group in enumerate(classes) for _ in group]
+
+    def extend(prefix: List[int], remaining: int) -> Iterator[Tuple[int, ...]]:
+        slot = len(prefix)
+        if slot == len(radices):
+            if remaining == 0:
+                yield tuple(prefix)
+            return
+        low = prefix[-1] if slot and slot_class[slot - 1] == slot_class[slot] else 0
+        for count in range(low, min(radices[slot] - 1, remaining) + 1):
+            yield from extend(prefix + [count], remaining - count)
+
+    yield from extend([], OPENING_HAND_SIZE)
+
+
+def opening_state(layout: DeckLayout, counts: Tuple[int, ...], rng: random.Random) -> GameState:
+    """建立先手持有指定正規手牌的開局 (其餘卡牌隨機)"""
+    slot_geishas = [geisha for group in symmetry_classes(layout) for geisha in group]
+    hand: List[int] = []
+    for slot, count in enumerate(counts):
+        cards = [card for card in range(layout.card_count) if layout.card_geisha[card] == slot_geishas[slot]]
+        hand.extend(cards[:count])
+    rest = [card for card in range(layout.card_count) if card not in hand]
+    rng.shuffle(rest)
+    # 先手發到 order[0:6]，第一次抽牌為 order[12]
+    order = hand[:HAND_SIZE] + rest[:HAND_SIZE] + [hand[HAND_SIZE]] + rest[HAND_SIZE:]
+    state = GameState(layout, rng)
+    state.deal(order)
+    return state
+
+
+def solve_opening(counts: Tuple[int, ...], seed: int, iterations: int, data_dir: str) -> Tuple[Tuple[int, ...], bytes]:
+    """以 MCTS 搜尋一種開局手牌的最佳第一手 (在工作行程中執行)"""
+    from app.simulation.mcts import search
+
+    layout = get_template_registry(data_dir).layout
+    rng = random.Random(seed)
+    state = opening_state(layout, counts, rng)
+    _, perm = canonicalize(state)
+    visits = {}
+    for move, count in search(state, rng, iterations).items():
+        canonical = canonical_move(state, move, perm)
+        visits[canonical] = visits.get(canonical, 0) + count
+    best = max(visits.items(), key=lambda item: item[1])[0]
+    return counts, _encode(best)
+
+
+def write_opening_book(output: str, layout: DeckLayout, entries: Dict[Tuple[int, ...], bytes]) -> None:
+    """寫出開局庫 (entries: 正規手牌張數 -> 編碼後的第一手)"""
+    radices = slot_radices(layout)
+    ranked = sorted((hand_index(counts, radices), entry) for counts, entry in entries.items())
+    tmp_path = output + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(radices), layout.fingerprint(), len(ranked)))
+        f.write(bytes(radices))
+        f.write(b"".join(INDEX.pack(index) for index, _ in ranked))
+        f.write(b"".join(entry for _, entry in ranked))
+    os.replace(tmp_path, output)
+
+
+def build_opening_book(output: str, iterations: int, seed: int = 0, workers: Optional[int] = None,
+                       data_dir: str = "app/domain/data") -> int:
+    """計算所有正規開局手牌並寫出開局庫，回傳手牌種類數"""
+    layout = get_template_registry(data_dir).layout
+    hands = list(iter_opening_hands(slot_radices(layout), symmetry_classes(layout)))
+    entries: Dict[Tuple[int, ...], bytes] = {}
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(solve_opening, counts, seed + i, iterations, data_dir)
+            for i, counts in enumerate(hands)
+        ]
+        for done, future in enumerate(futures, 1):
+            counts, entry = future.result()
+            entries[counts] = entry
+            if done % 100 == 0:
+                print(f"📖 {done}/{len(hands)}")
+
+    write_opening_book(output, layout, entries)
+    return len(hands)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="產生花見小路開局庫")
+    parser.add_argument("--output", default=DEFAULT_BOOK_PATH, help="輸出檔案")
+    parser.add_argument("--iterations", type=int, default=2000, help="每種手牌的 MCTS 迭代次數")
+    parser.add_argument("--workers", type=int, default=None, help="工作行程數 (預設為CPU數)")
+    parser.add_argument("--seed", type=int, default=0, help="隨機種子")
+    parser.add_argument("--data-dir", default="app/domain/data", help="遊戲資料目錄")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    count = build_opening_book(args.output, args.iterations, args.seed, args.workers, args.data_dir)
+    print(f"✅ 已寫入 {count} 種開局手牌到 {args.output} ({time.perf_counter() - start:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""自我對弈使用的策略"""
+
+import random
+from typing import Callable, Dict
+
+from app.domain.engine.moves import Move, legal_actions, legal_responses, apply_move
+from app.domain.engine.state import GameState, ACTION_CARD_COUNTS, iter_bits, mask_of
+from app.domain.engine.canonical import resolve_move
+from app.domain.enums.game_enums import ActionType
+from app.simulation.opening_book import get_opening_book
+from app.simulation.response_tables import get_response_tables
+
+
+class Policy:
+    """策略介面：選擇行動，以及回應對手的獻禮/競爭"""
+
+    name = "base"
+
+    def choose_action(self, state: GameState, rng: random.Random) -> Move:
+        raise NotImplementedError
+
+    def choose_response(self, state: GameState, rng: random.Random) -> int:
+        raise NotImplementedError
+
+
+class RandomPolicy(Policy):
+    """隨機策略"""
+
+    name = "random"
+
+    def choose_action(self, state: GameState, rng: random.Random) -> Move:
+        seat = state.current
+        action = rng.choice([a for a in ActionType if not state.has_used(seat, a)])
+        cards = rng.sample(list(iter_bits(state.hands[seat])), ACTION_CARD_COUNTS[action])
+        split = mask_of(cards[:2]) if action == ActionType.COMPETE else 0
+        return action, mask_of(cards), split
+
+    def choose_response(self, state: GameState, rng: random.Random) -> int:
+        return rng.choice(legal_responses(state))
+
+
+def evaluate(state: GameState, seat: int) -> int:
+    """以目前分配 (含自己的秘密卡) 估計的魅力差"""
+    layout = state.layout
+    counts = state.counts
+    secret = state.secrets[seat]
+    other = 1 - seat
+    score = 0
+    for geisha in range(layout.geisha_count):
+        mine = counts[geisha * 2 + seat] + (secret & layout.geisha_masks[geisha]).bit_count()
+        theirs = counts[geisha * 2 + other]
+        if mine > theirs:
+            score += layout.charms[geisha]
+        elif theirs > mine:
+            score -= layout.charms[geisha]
+    return score
+
+
+class GreedyPolicy(Policy):
+    """一步貪婪策略：假設對手會做出對自己最有利的回應"""
+
+    name = "greedy"
+
+    def choose_action(self, state: GameState, rng: random.Random) -> Move:
+        seat = state.current
+        best_moves = []
+        best_score = None
+        for move in legal_actions(state):
+            child = state.copy()
+            apply_move(child, move)
+            if child.pending_action is not None:
+                score = min(self._after_response(child, chosen, seat) for chosen in legal_responses(child))
+            else:
+                score = evaluate(child, seat)
+            if best_score is None or score > best_score:
+                best_score = score
+                best_moves = [move]
+            elif score == best_score:
+                best_moves.append(move)
+        return rng.choice(best_moves)
+
+    def choose_response(self, state: GameState, rng: random.Random) -> int:
+        seat = state.to_move
+        responses = legal_responses(state)
+        scores = [self._after_response(state, chosen, seat) for chosen in responses]
+        best = max(scores)
+        return rng.choice([r for r, score in zip(responses, scores) if score == best])
+
+    def _after_response(self, state: GameState, chosen: int, seat: int) -> int:
+        child = state.copy()
+        child.respond(chosen)
+        return evaluate(child, seat)
+
+
+class TablePolicy(GreedyPolicy):
+    """查表策略：第一手查開局庫、回應查回應表，其餘行動用一步貪婪"""
+
+    name = "table"
+
+    def choose_action(self, state: GameState, rng: random.Random) -> Move:
+        book = get_opening_book()
+        entry = book.lookup(state) if book is not None else None
+        if entry is not None:
+            return resolve_move(state, *entry)
+        return super().choose_action(state, rng)
+
+    def choose_response(self, state: GameState, rng: random.Random) -> int:
+        return get_response_tables().best_response(state)
+
+
+def _create_mcts_policy() -> Policy:
+    from app.simulation.mcts import MCTSPolicy
+    return MCTSPolicy()
+
+
+POLICIES: Dict[str, Callable[[], Policy]] = {
+    RandomPolicy.name: RandomPolicy,
+    GreedyPolicy.name: GreedyPolicy,
+    TablePolicy.name: TablePolicy,
+    "mcts": _create_mcts_policy,
+}
+
+
+def create_policy(name: str) -> Policy:
+    """依名稱建立策略"""
+    if name not in POLICIES:
+        raise ValueError(f"未知的策略: {name} (可用: {', '.join(sorted(POLICIES))})")
+    return POLICIES[name]()
@@ -0,0 +1,27 @@
+"""行程共用的行程池 (搜尋、模擬等 CPU 密集工作)"""
+
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+_executor: Optional[ProcessPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def get_process_pool(max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """取得 (必要時建立) 共用的行程池"""
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ProcessPoolExecutor(max_workers=max_workers)
+    return _executor
+
+
+def shutdown_process_pool() -> None:
+    """關閉共用的行程池"""
+    global _executor
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
@@ -0,0 +1,191 @@
+"""獻禮/競爭回應表 - 離線求解、延遲載入
+
+回應者的選擇只影響展示卡牌所屬的藝妓，而每位藝妓的最終青睞只取決於
+(自己的張數, 對手的張數) 與尚未出現的卡牌 (平手為中立，與之前的青睞無關)。因此離線對每位藝妓的
+每種狀態求出回合結束時的期望魅力差 (剩餘卡牌各以 8/21 的機率分給雙方，
+其餘被棄掉或移除)，寫成小型二進位表；回應時只需對每個選項加總最多3筆查表結果。
+
+這是逐藝妓的估計：不考慮回應者已知的手牌，也不考慮勝利門檻，因此只給查表策略
+(TablePolicy) 使用，MCTS 電腦玩家的回應仍以搜尋決定。
+
+檔案格式 (little-endian)：
+    標頭   magic "HKRT"、版本 (uint16)、藝妓數 (uint16)、佈局指紋 (uint32)、
+           每位藝妓的卡牌數 n (uint8 × 藝妓數)
+    項目   依藝妓排列，每位 (n+1) × (n+1) 個 int16 (千分之一魅力)，
+           索引為 [自己張數][對手張數]
+用法: python -m app.simulation.response_tables --output app/domain/data/response_tables.bin
+"""
+
+import argparse
+import os
+import struct
+import sys
+import threading
+from array import array
+from math import comb
+from typing import Optional, Tuple
+
+from app.domain.engine.layout import DeckLayout
+from app.domain.engine.state import PHASE_RESPOND, GameState, iter_bits
+from app.domain.enums.game_enums import ActionType
+from app.domain.factories.game_factory import get_template_registry
+
+MAGIC = b"HKRT"
+VERSION = 2
+HEADER = struct.Struct("<4sHHI")
+SCALE = 1000
+# 每回合分配給雙方的卡牌共16張 (21張扣掉移除1張與棄牌4張)
+ALLOCATE_PROBABILITY = 8 / 21
+DEFAULT_TABLE_PATH = "app/domain/data/response_tables.bin"
+
+def geisha_sizes(layout: DeckLayout) -> Tuple[int, ...]:
+    sizes = [0] * layout.geisha_count
+    for geisha in layout.card_geisha:
+        sizes[geisha] += 1
+    return tuple(sizes)
+
+
+def geisha_value(charm: int, size: int, mine: int, theirs: int) -> float:
+    """回合結束時此藝妓的期望魅力差 (自己觀點)"""
+    remaining = size - mine - theirs
+    p = ALLOCATE_PROBABILITY
+    q = 1.0 - 2 * p
+    value = 0.0
+    for to_me in range(remaining + 1):
+        for to_them in range(remaining - to_me + 1):
+            none = remaining - to_me - to_them
+            prob = comb(remaining, to_me) * comb(remaining - to_me, to_them) * p ** to_me * p ** to_them * q ** none
+            final_me, final_them = mine + to_me, theirs + to_them
+            if final_me > final_them:
+                value += prob * charm
+            elif final_them > final_me:
+                value -= prob * charm
+    return value
+
+
+def solve_tables(layout: DeckLayout) -> array:
+    """求出所有藝妓、所有狀態的期望魅力差"""
+    values = array("h")
+    for geisha, size in enumerate(geisha_sizes(layout)):
+        charm = layout.charms[geisha]
+        for mine in range(size + 1):
+            for theirs in range(size + 1):
+                value = geisha_value(charm, size, mine, theirs) if mine + theirs <= size else 0.0
+                values.append(round(value * SCALE))
+    return values
+
+
+class ResponseTables:
+    """回應查表"""
+
+    def __init__(self, layout: DeckLayout, values: array):
+        self.layout = layout
+        self.sizes = geisha_sizes(layout)
+        self.values = values
+        offsets = []
+        offset = 0
+        for size in self.sizes:
+            offsets.append(offset)
+            offset += (size + 1) * (size + 1)
+        self.offsets: Tuple[int, ...] = tuple(offsets)
+        if offset != len(values):
+            raise ValueError("回應表大小與目前的遊戲資料不符")
+
+    def value(self, geisha: int, mine: int, theirs: int) -> int:
+        width = self.sizes[geisha] + 1
+        return self.values[self.offsets[geisha] + mine * width + theirs]
+
+    def best_response(self, state: GameState) -> int:
+        """回應者的最佳選擇 (回傳選擇的卡牌遮罩)"""
+        if state.phase != PHASE_RESPOND:
+            raise ValueError("目前沒有需要回應的獻禮或競爭")
+        if state.pending_action == ActionType.GIFT:
+            options = [1 << card for card in iter_bits(state.pending_offer)]
+        else:
+            options = [state.pending_split, state.pending_offer ^ state.pending_split]
+
+        layout = state.layout
+        me = state.to_move
+        other = 1 - me
+        secret = state.secrets[me]
+        geishas = {layout.card_geisha[card] for card in iter_bits(state.pending_offer)}
+        base = {}
+        for geisha in geishas:
+            mine = state.counts[geisha * 2 + me] + (secret & layout.geisha_masks[geisha]).bit_count()
+            theirs = state.counts[geisha * 2 + other]
+            base[geisha] = (mine, theirs)
+
+        best, best_score = options[0], None
+        for chosen in options:
+            score = 0
+            for geisha, (mine, theirs) in base.items():
+                geisha_mask = layout.geisha_masks[geisha]
+                to_me = (chosen & geisha_mask).bit_count()
+                to_them = (state.pending_offer & ~chosen & geisha_mask).bit_count()
+                score += self.value(geisha, mine + to_me, theirs + to_them)
+            if best_score is None or score > best_score:
+                best, best_score = chosen, score
+        return best
+
+
+def write_tables(path: str, layout: DeckLayout, values: array) -> None:
+    sizes = geisha_sizes(layout)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, layout.geisha_count, layout.fingerprint()))
+        f.write(bytes(sizes))
+        data = array("h", values)
+        if sys.byteorder == "big":
+            data.byteswap()
+        f.write(data.tobytes())
+    os.replace(tmp_path, path)
+
+
+def read_tables(path: str, layout: DeckLayout) -> ResponseTables:
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, geisha_count, fingerprint = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"回應表格式不符: {path}")
+    if geisha_count != layout.geisha_count or fingerprint != layout.fingerprint():
+        raise ValueError(f"回應表與目前的遊戲資料不符: {path}")
+    values = array("h")
+    values.frombytes(data[HEADER.size + geisha_count:])
+    if sys.byteorder == "big":
+        values.byteswap()
+    return ResponseTables(layout, values)
+
+
+_tables: Optional[ResponseTables] = None
+_tables_lock = threading.Lock()
+
+
+def get_response_tables(path: str = DEFAULT_TABLE_PATH) -> ResponseTables:
+    """第一次使用時載入回應表 (檔案不存在時在行程中直接求解)"""
+    global _tables
+    if _tables is None:
+        with _tables_lock:
+            if _tables is None:
+                layout = get_template_registry().layout
+                if os.path.exists(path):
+                    _tables = read_tables(path, layout)
+                else:
+                    print(f"⚠️ 找不到回應表 {path}，改為即時求解")
+                    _tables = ResponseTables(layout, solve_tables(layout))
+    return _tables
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="產生花見小路獻禮/競爭回應表")
+    parser.add_argument("--output", default=DEFAULT_TABLE_PATH, help="輸出檔案")
+    parser.add_argument("--data-dir", default="app/domain/data", help="遊戲資料目錄")
+    args = parser.parse_args()
+
+    layout = get_template_registry(args.data_dir).layout
+    values = solve_tables(layout)
+    write_tables(args.output, layout, values)
+    print(f"✅ 已寫入 {len(values)} 筆回應表項目到 {args.output}")
+
+
+if __name__ == "__main__":
+    main()
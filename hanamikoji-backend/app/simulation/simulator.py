@@ -0,0 +1,156 @@
+"""批次自我對弈模擬器"""
+
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.domain.engine.state import GameState, NO_WINNER, PHASE_RESPOND
+from app.domain.factories.game_factory import GameFactory
+from app.simulation.batch_eval import favor_totals
+from app.simulation.policies import Policy, create_policy
+
+DEFAULT_MAX_ROUNDS = 10
+DEFAULT_BATCH_SIZE = 1000
+
+
+@dataclass
+class GameResult:
+    """單局結果"""
+    winner: int
+    rounds: int
+    favor: Tuple[int, int]
+
+
+@dataclass
+class SimulationStats:
+    """模擬統計 (可跨批次合併)"""
+    games: int = 0
+    wins: List[int] = field(default_factory=lambda: [0, 0])
+    draws: int = 0
+    rounds: int = 0
+    # favor_counts[seat][geisha]：遊戲結束時該座位獲得藝妓青睞的局數
+    favor_counts: List[List[int]] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    def record_batch(self, results: Sequence[GameResult], geisha_count: int) -> None:
+        """批次記錄 (青睞統計交給向量化的 favor_totals)"""
+        if not results:
+            return
+        if not self.favor_counts:
+            self.favor_counts = [[0] * geisha_count, [0] * geisha_count]
+        for result in results:
+            self.games += 1
+            self.rounds += result.rounds
+            if result.winner == NO_WINNER:
+                self.draws += 1
+            else:
+                self.wins[result.winner] += 1
+        for seat in (0, 1):
+            totals = favor_totals([result.favor[seat] for result in results], geisha_count)
+            for geisha, count in enumerate(totals):
+                self.favor_counts[seat][geisha] += count
+
+    def merge(self, other: 'SimulationStats') -> None:
+        if not self.favor_counts:
+            self.favor_counts = [row[:] for row in other.favor_counts]
+        else:
+            for seat in (0, 1):
+                for geisha, count in enumerate(other.favor_counts[seat]):
+                    self.favor_counts[seat][geisha] += count
+        self.games += other.games
+        self.wins[0] += other.wins[0]
+        self.wins[1] += other.wins[1]
+        self.draws += other.draws
+        self.rounds += other.rounds
+
+    def to_dict(self, geisha_ids: Sequence[str]) -> Dict:
+        games = self.games or 1
+        return {
+            "games": self.games,
+            "elapsed_seconds": round(self.elapsed, 3),
+            "games_per_second": round(self.games / self.elapsed, 1) if self.elapsed else None,
+            "win_rate_by_seat": [round(self.wins[0] / games, 4), round(self.wins[1] / games, 4)],
+            "draw_rate": round(self.draws / games, 4),
+            "average_rounds": round(self.rounds / games, 3),
+            "geisha_favor_rate": {
+                geisha_id: [
+                    round(self.favor_counts[0][i] / games, 4) if self.favor_counts else 0.0,
+                    round(self.favor_counts[1][i] / games, 4) if self.favor_counts else 0.0,
+                ]
+                for i, geisha_id in enumerate(geisha_ids)
+            },
+        }
+
+
+def play_game(state: GameState, policies: Sequence[Policy], rng: random.Random,
+              max_rounds: int = DEFAULT_MAX_ROUNDS) -> GameResult:
+    """以兩個策略把一局遊戲下完"""
+    while not state.is_finished and state.round_number <= max_rounds:
+        if state.phase == PHASE_RESPOND:
+            state.respond(policies[state.to_move].choose_response(state, rng))
+        else:
+            action, cards, split = policies[state.current].choose_action(state, rng)
+            state.apply_action(action, cards, split)
+    return GameResult(state.winner, min(state.round_number, max_rounds), (state.favor[0], state.favor[1]))
+
+
+def batch_seed(seed: int, batch_index: int) -> int:
+    """每個批次獨立且可重現的種子 (與工作行程數量無關)"""
+    return (seed << 32) ^ batch_index
+
+
+def run_batch(policy_names: Tuple[str, str], seed: int, games: int,
+              max_rounds: int = DEFAULT_MAX_ROUNDS, data_dir: str = "app/domain/data") -> SimulationStats:
+    """在單一行程中執行一批對局"""
+    factory = GameFactory(data_dir)
+    layout = factory.card_factory.layout
+    policies = [create_policy(name) for name in policy_names]
+    rng = random.Random(seed)
+    stats = SimulationStats()
+
+    started = time.perf_counter()
+    results = []
+    for _ in range(games):
+        state = factory.create_game_state(random.Random(rng.getrandbits(64)))
+        results.append(play_game(state, policies, rng, max_rounds))
+    stats.record_batch(results, layout.geisha_count)
+    stats.elapsed = time.perf_counter() - started
+    return stats
+
+
+def run_simulation(games: int, policy_names: Tuple[str, str] = ("random", "random"),
+                   seed: int = 0, workers: Optional[int] = None,
+                   batch_size: int = DEFAULT_BATCH_SIZE,
+                   max_rounds: int = DEFAULT_MAX_ROUNDS,
+                   data_dir: str = "app/domain/data") -> SimulationStats:
+    """將對局分批交給行程池執行並合併統計
+
+    結果只取決於 seed 與 batch_size，與 workers 數量無關。
+    """
+    for name in policy_names:
+        create_policy(name)  # 提早驗證策略名稱
+
+    batches = []
+    remaining = games
+    while remaining > 0:
+        size = min(batch_size, remaining)
+        batches.append((batch_seed(seed, len(batches)), size))
+        remaining -= size
+
+    total = SimulationStats()
+    started = time.perf_counter()
+    if workers == 1:
+        for batch_seed_value, size in batches:
+            total.merge(run_batch(policy_names, batch_seed_value, size, max_rounds, data_dir))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(run_batch, policy_names, batch_seed_value, size, max_rounds, data_dir)
+                for batch_seed_value, size in batches
+            ]
+            for future in futures:
+                total.merge(future.result())
+    total.elapsed = time.perf_counter() - started
+    return total
@@ -0,0 +1,308 @@
+"""電腦玩家錦標賽 - 循環賽/瑞士制、Elo 評分
+
+只使用遊戲工廠與位元棋盤引擎 (不經過 HTTP 或 MongoDB)，對戰分批交給行程池執行；
+每局結果以 NDJSON 逐行輸出，Elo 依提交順序逐局更新，因此結果只取決於種子。
+同一批對局兩兩使用相同的發牌並交換座位，降低發牌運氣造成的變異。
+
+用法: python -m app.simulation.tournament --policies random greedy table mcts --games-per-pair 200 --output results.ndjson
+"""
+
+import argparse
+import contextlib
+import json
+import math
+import random
+import sys
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, IO, Iterator, List, Optional, Sequence, Tuple
+
+from app.domain.engine.state import NO_WINNER
+from app.domain.factories.game_factory import GameFactory
+from app.simulation.opening_book import DEFAULT_BOOK_PATH, get_opening_book, load_opening_book
+from app.simulation.policies import POLICIES, create_policy
+from app.simulation.simulator import DEFAULT_MAX_ROUNDS, batch_seed, play_game
+
+INITIAL_RATING = 1500.0
+ELO_K = 16.0
+# 95% 信賴區間
+Z_95 = 1.96
+DEFAULT_MATCH_SIZE = 20
+
+
+@dataclass
+class MatchGame:
+    """錦標賽中的單局結果"""
+    seats: Tuple[str, str]
+    winner: int
+    rounds: int
+    seed: int
+
+
+@dataclass
+class Rating:
+    """單一策略的評分與戰績"""
+    name: str
+    rating: float = INITIAL_RATING
+    games: int = 0
+    wins: int = 0
+    draws: int = 0
+    losses: int = 0
+
+    @property
+    def score(self) -> float:
+        return self.wins + 0.5 * self.draws
+
+
+def elo_difference(score: float) -> float:
+    """平均得分 (0~1) 對應的 Elo 差距"""
+    return -400.0 * math.log10(1.0 / score - 1.0)
+
+
+class EloTable:
+    """逐局更新的 Elo 評分表
+
+    信賴區間以該策略的平均得分 p 與標準誤 sqrt(p(1-p)/n) 換算成 Elo 差距的寬度。
+    """
+
+    def __init__(self, names: Sequence[str], k: float = ELO_K):
+        self.k = k
+        self.ratings: Dict[str, Rating] = {name: Rating(name) for name in names}
+
+    def expected(self, a: str, b: str) -> float:
+        return 1.0 / (1.0 + 10 ** ((self.ratings[b].rating - self.ratings[a].rating) / 400.0))
+
+    def record(self, game: MatchGame) -> None:
+        first, second = game.seats
+        score = 0.5 if game.winner == NO_WINNER else 1.0 if game.winner == 0 else 0.0
+        delta = self.k * (score - self.expected(first, second))
+        self.ratings[first].rating += delta
+        self.ratings[second].rating -= delta
+        for name, own in ((first, score), (second, 1.0 - score)):
+            rating = self.ratings[name]
+            rating.games += 1
+            if own == 1.0:
+                rating.wins += 1
+            elif own == 0.0:
+                rating.losses += 1
+            else:
+                rating.draws += 1
+
+    def margin(self, name: str) -> Optional[float]:
+        """95% 信賴區間的半寬 (局數不足時回傳 None)"""
+        rating = self.ratings[name]
+        n = rating.games
+        if n < 2:
+            return None
+        # 全勝/全敗時以半局修正，避免對數發散
+        p = min(max(rating.score / n, 0.5 / n), 1.0 - 0.5 / n)
+        sigma = math.sqrt(p * (1.0 - p) / n)
+        low = max(p - Z_95 * sigma, 0.5 / n)
+        high = min(p + Z_95 * sigma, 1.0 - 0.5 / n)
+        return (elo_difference(high) - elo_difference(low)) / 2
+
+    def standings(self) -> List[Dict]:
+        rows = []
+        for rating in sorted(self.ratings.values(), key=lambda r: r.rating, reverse=True):
+            margin = self.margin(rating.name)
+            rows.append({
+                "policy": rating.name,
+                "elo": round(rating.rating, 1),
+                "ci95": round(margin, 1) if margin is not None else None,
+                "games": rating.games,
+                "wins": rating.wins,
+                "draws": rating.draws,
+                "losses": rating.losses,
+                "score_rate": round(rating.score / rating.games, 4) if rating.games else None,
+            })
+        return rows
+
+
+def _init_worker(book_path: Optional[str]) -> None:
+    """工作行程初始化：載入開局庫 (table / mcts 策略使用)
+
+    訊息改印到標準錯誤，避免混入輸出到標準輸出的 NDJSON。
+    """
+    if book_path and get_opening_book() is None:
+        with contextlib.redirect_stdout(sys.stderr):
+            load_opening_book(book_path)
+
+
+def play_match(pair: Tuple[str, str], seed: int, games: int, max_rounds: int = DEFAULT_MAX_ROUNDS,
+               data_dir: str = "app/domain/data") -> List[MatchGame]:
+    """兩個策略對戰 games 局 (每兩局同一副牌交換座位)，在單一行程中執行"""
+    factory = GameFactory(data_dir)
+    policies = {name: create_policy(name) for name in pair}
+    rng = random.Random(seed)
+    results: List[MatchGame] = []
+    deal_seed = 0
+    for index in range(games):
+        seats = pair if index % 2 == 0 else (pair[1], pair[0])
+        if index % 2 == 0:
+            deal_seed = rng.getrandbits(64)
+        state = factory.create_game_state(random.Random(deal_seed))
+        result = play_game(state, [policies[name] for name in seats], rng, max_rounds)
+        results.append(MatchGame(seats, result.winner, result.rounds, deal_seed))
+    return results
+
+
+def round_robin_pairs(names: Sequence[str]) -> List[Tuple[str, str]]:
+    return [(a, b) for i, a in enumerate(names) for b in names[i + 1:]]
+
+
+def swiss_pairs(table: EloTable, met: Dict[Tuple[str, str], int]) -> List[Tuple[str, str]]:
+    """依目前得分與評分排序，與相鄰且交手次數最少的對手配對 (奇數時最後一名輪空)"""
+    order = sorted(table.ratings.values(), key=lambda r: (r.score / r.games if r.games else 0.0, r.rating), reverse=True)
+    remaining = [rating.name for rating in order]
+    pairs = []
+    while len(remaining) >= 2:
+        first = remaining.pop(0)
+        opponent = min(remaining, key=lambda name: met.get(tuple(sorted((first, name))), 0))
+        remaining.remove(opponent)
+        pairs.append((first, opponent))
+    return pairs
+
+
+def _split(games: int, size: int) -> Iterator[int]:
+    """把一組對戰切成多批 (每批為偶數局，維持交換座位)"""
+    size = max(2, size - size % 2)
+    while games > 0:
+        yield min(size, games)
+        games -= size
+
+
+class Tournament:
+    """錦標賽排程與記錄"""
+
+    def __init__(self, names: Sequence[str], games_per_pair: int, seed: int = 0,
+                 match_size: int = DEFAULT_MATCH_SIZE, max_rounds: int = DEFAULT_MAX_ROUNDS,
+                 data_dir: str = "app/domain/data", output: Optional[IO[str]] = None):
+        for name in names:
+            create_policy(name)  # 提早驗證策略名稱
+        if len(set(names)) != len(names) or len(names) < 2:
+            raise ValueError("至少需要兩個不同的策略")
+        self.names = list(names)
+        self.games_per_pair = games_per_pair
+        self.seed = seed
+        self.match_size = match_size
+        self.max_rounds = max_rounds
+        self.data_dir = data_dir
+        self.output = output
+        self.table = EloTable(self.names)
+        self.met: Dict[Tuple[str, str], int] = {}
+        self._batches = 0
+        self.games_played = 0
+
+    def run_pairs(self, executor: Optional[Executor], pairs: Sequence[Tuple[str, str]]) -> None:
+        """執行一組配對，依提交順序記錄結果"""
+        jobs = []
+        for pair in pairs:
+            for games in _split(self.games_per_pair, self.match_size):
+                jobs.append((pair, batch_seed(self.seed, self._batches), games))
+                self._batches += 1
+        if executor is None:
+            results = (play_match(pair, seed, games, self.max_rounds, self.data_dir) for pair, seed, games in jobs)
+        else:
+            futures = [
+                executor.submit(play_match, pair, seed, games, self.max_rounds, self.data_dir)
+                for pair, seed, games in jobs
+            ]
+            results = (future.result() for future in futures)
+        for games in results:
+            for game in games:
+                self.record(game)
+
+    def record(self, game: MatchGame) -> None:
+        self.games_played += 1
+        key = tuple(sorted(game.seats))
+        self.met[key] = self.met.get(key, 0) + 1
+        self.table.record(game)
+        if self.output is not None:
+            winner = None if game.winner == NO_WINNER else game.seats[game.winner]
+            self.output.write(json.dumps({
+                "type": "game",
+                "game": self.games_played,
+                "seats": list(game.seats),
+                "winner": winner,
+                "rounds": game.rounds,
+                "deal_seed": game.seed,
+                "elo": {name: round(self.table.ratings[name].rating, 1) for name in game.seats},
+            }, ensure_ascii=False) + "\n")
+
+    def round_robin(self, executor: Optional[Executor], cycles: int = 1) -> None:
+        """循環賽 (cycles 為 0 時持續進行直到中斷)"""
+        cycle = 0
+        while cycles == 0 or cycle < cycles:
+            self.run_pairs(executor, round_robin_pairs(self.names))
+            cycle += 1
+            self.write_standings(f"cycle {cycle}")
+
+    def swiss(self, executor: Optional[Executor], rounds: int) -> None:
+        """瑞士制：每輪依目前成績重新配對"""
+        for round_index in range(1, rounds + 1):
+            self.run_pairs(executor, swiss_pairs(self.table, self.met))
+            self.write_standings(f"round {round_index}")
+
+    def write_standings(self, stage: str) -> None:
+        if self.output is not None:
+            self.output.write(json.dumps({"type": "standings", "stage": stage, "games": self.games_played,
+                                          "standings": self.table.standings()}, ensure_ascii=False) + "\n")
+            self.output.flush()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="花見小路電腦玩家錦標賽")
+    parser.add_argument("--policies", nargs="+", default=sorted(POLICIES), choices=sorted(POLICIES),
+                        metavar="POLICY", help=f"參賽策略 ({', '.join(sorted(POLICIES))})")
+    parser.add_argument("--format", choices=("round-robin", "swiss"), default="round-robin", help="賽制")
+    parser.add_argument("--games-per-pair", type=int, default=100, help="每組配對的對局數 (每輪)")
+    parser.add_argument("--cycles", type=int, default=1, help="循環賽輪數 (0 表示持續進行直到中斷)")
+    parser.add_argument("--rounds", type=int, default=5, help="瑞士制輪數")
+    parser.add_argument("--match-size", type=int, default=DEFAULT_MATCH_SIZE, help="每個工作單位的對局數")
+    parser.add_argument("--workers", type=int, default=None, help="工作行程數 (預設為CPU數，1 表示不開行程池)")
+    parser.add_argument("--seed", type=int, default=0, help="隨機種子")
+    parser.add_argument("--max-rounds", type=int, default=DEFAULT_MAX_ROUNDS, help="每局最多回合數")
+    parser.add_argument("--output", default="-", help="NDJSON 輸出檔案 (- 表示標準輸出)")
+    parser.add_argument("--opening-book", default=DEFAULT_BOOK_PATH, help="開局庫檔案")
+    parser.add_argument("--data-dir", default="app/domain/data", help="遊戲資料目錄")
+    args = parser.parse_args()
+
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    tournament = Tournament(args.policies, args.games_per_pair, args.seed, args.match_size,
+                            args.max_rounds, args.data_dir, output)
+    started = time.perf_counter()
+    executor = None
+    try:
+        if args.workers != 1:
+            executor = ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                                           initargs=(args.opening_book,))
+        else:
+            _init_worker(args.opening_book)
+        if args.format == "swiss":
+            tournament.swiss(executor, args.rounds)
+        else:
+            tournament.round_robin(executor, args.cycles)
+    except KeyboardInterrupt:
+        print("⏹️ 錦標賽已中斷", file=sys.stderr)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        elapsed = time.perf_counter() - started
+        summary = {
+            "type": "summary",
+            "format": args.format,
+            "seed": args.seed,
+            "games": tournament.games_played,
+            "elapsed_seconds": round(elapsed, 3),
+            "games_per_minute": round(tournament.games_played / elapsed * 60, 1) if elapsed else None,
+            "standings": tournament.table.standings(),
+        }
+        output.write(json.dumps(summary, ensure_ascii=False) + "\n")
+        if output is not sys.stdout:
+            output.close()
+            print(json.dumps(summary, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""勝率估計 - 以旁觀者視角隨機分配隱藏卡牌後快速模擬到終局"""
+
+import random
+import time
+from typing import Optional, Tuple
+
+from app.domain.engine.state import GameState, iter_bits, mask_of
+from app.simulation.mcts import rollout
+
+# 模擬最多再進行的回合數 (超過視為平手)
+MAX_EXTRA_ROUNDS = 10
+
+
+def determinize_public(state: GameState, rng: random.Random) -> GameState:
+    """旁觀者視角的確定化：只有已分配的卡與展示中的獻禮/競爭是公開的"""
+    sample = state.copy(rng)
+    public = state.allocated[0] | state.allocated[1] | state.pending_offer
+    hidden = list(iter_bits(state.layout.full_mask & ~public))
+    rng.shuffle(hidden)
+
+    pos = 0
+    for masks in (sample.hands, sample.secrets, sample.discards):
+        for seat in (0, 1):
+            count = masks[seat].bit_count()
+            masks[seat] = mask_of(hidden[pos:pos + count])
+            pos += count
+
+    sample.order = tuple(state.order[:state.draw_pos]) + tuple(hidden[pos:-1]) + (hidden[-1],)
+    sample.removed = 1 << hidden[-1]
+    return sample
+
+
+def estimate_wins(state: GameState, seed: int, time_limit: float,
+                  max_rollouts: Optional[int] = None) -> Tuple[int, int, int]:
+    """在時間上限內反覆確定化並隨機模擬到終局，回傳 (模擬局數, 座位0勝局, 座位1勝局)"""
+    if state.is_finished:
+        return 1, int(state.winner == 0), int(state.winner == 1)
+    rng = random.Random(seed)
+    deadline = time.perf_counter() + time_limit
+    last_round = state.round_number + MAX_EXTRA_ROUNDS
+    rollouts = 0
+    wins = [0, 0]
+    while time.perf_counter() < deadline and (max_rollouts is None or rollouts < max_rollouts):
+        sample = determinize_public(state, rng)
+        while not sample.is_finished and sample.round_number <= last_round:
+            rollout(sample, rng, sample.round_number)
+        rollouts += 1
+        if sample.is_finished:
+            wins[sample.winner] += 1
+    return rollouts, wins[0], wins[1]
@@ -1,3 +1,5 @@
+from contextlib import asynccontextmanager
+
 import uvicorn
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
@@ -7,17 +9,34 @@ from sqlalchemy.orm import Session
 from app.config.settings import settings
 from app.database.connection import get_db
 from app.database.mongodb import init_mongodb
-from app.domain.factories.game_factory import GameInitializationService
+from app.domain.factories.game_factory import GameInitializationService, get_template_registry
+from app.simulation.opening_book import load_opening_book
+from app.simulation.pool import shutdown_process_pool
 from app.api.routes import game, room
+from app.api.websocket import game as game_ws, room as room_ws
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """應用程式生命週期：啟動時預先載入遊戲模板與開局庫，關閉時釋放搜尋用的行程池"""
+    get_template_registry()
+    load_opening_book(settings.opening_book_path)
+    yield
+    shutdown_process_pool()
+
 
 # 建立 FastAPI 應用程式
 app = FastAPI(
     title=settings.app_name,
     description="花見小路卡牌遊戲後端 API",
     version="1.0.0",
-    debug=settings.debug
+    debug=settings.debug,
+    lifespan=lifespan
 )
 
+# 遊戲初始化服務 (模板由行程共用的註冊表提供)
+game_init_service = GameInitializationService()
+
 # CORS 設定（讓前端可以連接）
 app.add_middleware(
     CORSMiddleware,
@@ -61,13 +80,16 @@ async def health_check(db: Session = Depends(get_db)):
 
 @app.get("/games")
 async def games():
-    service = GameInitializationService()
-    return service.initialize_new_game("玩家1", "玩家2")
+    return game_init_service.initialize_new_game("玩家1", "玩家2")
 
 # API 路由組
 app.include_router(game.router, prefix="/api/v1/games", tags=["games"])
 app.include_router(room.router, prefix="/api/v1/rooms", tags=["rooms"])
 
+# WebSocket 即時通訊
+app.include_router(game_ws.router, tags=["websocket"])
+app.include_router(room_ws.router, tags=["websocket"])
+
 # 靜態檔案服務（如果需要）
 # app.mount("/static", StaticFiles(directory="static"), name="static")
 
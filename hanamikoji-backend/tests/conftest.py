@@ -0,0 +1,92 @@
+"""測試共用 fixture (pip install -r requirements-dev.txt 後在 hanamikoji-backend 目錄執行 python -m pytest)"""
+
+import random
+from typing import Dict, List, Optional
+
+import pytest
+
+from app.api.routes import room as room_routes
+from app.config.settings import settings
+from app.database.mongodb import mongodb
+from app.domain.engine.layout import DeckLayout
+from app.domain.engine.moves import apply_move, legal_actions, legal_responses
+from app.domain.engine.state import PHASE_RESPOND, GameState
+from app.domain.factories.game_factory import get_template_registry
+from app.schemas.game import ActionRequest
+from app.services.game_service import GameService
+
+# 各行動需要的卡牌張數
+ACTION_CARD_COUNTS = {"SECRET": 1, "DISCARD": 2, "GIFT": 3, "COMPETE": 4}
+
+
+@pytest.fixture(scope="session")
+def layout() -> DeckLayout:
+    return get_template_registry().layout
+
+
+def deal_state(layout: DeckLayout, order: Optional[List[int]] = None) -> GameState:
+    """依指定順序發牌 (預設為索引順序：座位0拿 0~5 並抽 12，座位1拿 6~11，20 被移除)"""
+    state = GameState(layout, random.Random(0))
+    state.deal(list(range(layout.card_count)) if order is None else order)
+    return state
+
+
+@pytest.fixture
+def state(layout: DeckLayout) -> GameState:
+    return deal_state(layout)
+
+
+@pytest.fixture
+def game_service() -> GameService:
+    return GameService()
+
+
+@pytest.fixture
+def game_id(game_service: GameService) -> str:
+    """固定種子、沒有電腦玩家的新遊戲"""
+    return game_service.create_game("甲", "乙", seed=7)["game_id"]
+
+
+def play_random_move(state: GameState, rng: random.Random) -> None:
+    """替需要做決定的玩家在引擎上隨機走一步"""
+    if state.phase == PHASE_RESPOND:
+        state.respond(rng.choice(legal_responses(state)))
+    else:
+        apply_move(state, rng.choice(legal_actions(state)))
+
+
+def random_request(full: Dict, rng: random.Random) -> ActionRequest:
+    """依完整狀態替需要做決定的玩家隨機組出一個合法的動作請求"""
+    offer = full["pending_offer"]
+    if offer:
+        chosen = rng.choice(offer["groupings"]) if offer["groupings"] else [rng.choice(offer["cards"])["id"]]
+        return ActionRequest(player_id=offer["responder_id"], action_type=offer["action_type"], card_ids=chosen)
+
+    player_id = full["current_player_id"]
+    player = full["players"][player_id]
+    hand = [card["id"] for card in player["hand_cards"]]
+    action = rng.choice([action for action, count in ACTION_CARD_COUNTS.items()
+                         if action not in player["used_actions"] and len(hand) >= count])
+    cards = rng.sample(hand, ACTION_CARD_COUNTS[action])
+    groupings = [cards[:2], cards[2:]] if action == "COMPETE" else None
+    return ActionRequest(player_id=player_id, action_type=action, card_ids=cards, groupings=groupings)
+
+
+def play_random_action(game_service: GameService, game_id: str, rng: random.Random) -> Dict:
+    """替需要做決定的玩家隨機執行一個合法動作，回傳狀態差異"""
+    full = game_service._serialize(game_service.get_game(game_id))
+    return game_service.execute_action(game_id, random_request(full, rng))
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture
+def offline_mongodb(monkeypatch) -> None:
+    """讓房間流程立即退回記憶體儲存 (無效的連線網址使每次連線馬上失敗)，並使用新的房間服務"""
+    monkeypatch.setattr(settings, "mongodb_url", "offline://")
+    monkeypatch.setattr(mongodb, "client", None)
+    monkeypatch.setattr(mongodb, "database", None)
+    monkeypatch.setattr(room_routes, "room_service", None)
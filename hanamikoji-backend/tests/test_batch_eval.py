@@ -0,0 +1,63 @@
+"""批次評估：與逐局的引擎計算一致"""
+
+import random
+
+from conftest import play_random_move
+
+from app.domain.engine.replay import initial_state
+from app.domain.engine.state import NO_WINNER
+from app.simulation.batch_eval import favor_totals, get_batch_evaluator, round_values
+from app.simulation.mcts import VALUE_SCALE, round_value
+
+
+def round_end_states(layout, count: int):
+    """隨機下完第一回合 (停在回合結束) 的局面"""
+    states = []
+    for seed in range(count):
+        rng = random.Random(seed)
+        state = initial_state(layout, seed)
+        state.stop_at_round_end = True
+        while state.round_number == 1 and not state.is_finished:
+            play_random_move(state, rng)
+        states.append(state)
+    return states
+
+
+def test_evaluate_matches_the_engine(layout):
+    states = round_end_states(layout, 200)
+    result = get_batch_evaluator(layout).evaluate_states(states, reveal_secrets=False)
+
+    for i, state in enumerate(states):
+        assert result.favor[i].tolist() == [state.favored_seat(g) for g in range(layout.geisha_count)]
+        assert result.charm[i].tolist() == [state.charm_total(0), state.charm_total(1)]
+        assert result.geishas[i].tolist() == [state.geisha_count(0), state.geisha_count(1)]
+        assert result.winner[i] == state._winner_of(state.favor)
+    assert any(w != NO_WINNER for w in result.winner)
+
+
+def test_reveal_secrets_counts_hidden_cards(layout):
+    rng = random.Random(1)
+    state = initial_state(layout, 1)
+    while not (state.secrets[0] and state.secrets[1]):
+        play_random_move(state, rng)
+    evaluator = get_batch_evaluator(layout)
+
+    hidden = evaluator.stack([state], reveal_secrets=False)
+    revealed = evaluator.stack([state])
+
+    assert int((revealed - hidden).sum()) == 2
+    for seat in (0, 1):
+        card = state.secrets[seat].bit_length() - 1
+        assert revealed[0, layout.card_geisha[card], seat] == hidden[0, layout.card_geisha[card], seat] + 1
+
+
+def test_round_values_match_scalar(layout):
+    states = round_end_states(layout, 100)
+    for seat in (0, 1):
+        batched = round_values(states, seat, VALUE_SCALE)
+        assert batched == [round_value(state, seat) for state in states]
+    assert round_values([], 0, VALUE_SCALE) == []
+
+
+def test_favor_totals():
+    assert favor_totals([0b101, 0b001, 0], 3) == [2, 0, 1]
@@ -0,0 +1,52 @@
+"""電腦玩家：背景搜尋與失敗時的備用動作"""
+
+import random
+
+import pytest
+
+from conftest import play_random_action
+
+from app.config.settings import settings
+from app.services import game_service as game_service_module
+from app.simulation.pool import shutdown_process_pool
+
+
+def failing_worker(policy, state, seed):
+    raise RuntimeError("搜尋失敗")
+
+
+@pytest.fixture
+def bot_game(game_service, monkeypatch):
+    """座位1由電腦玩家操作的新遊戲"""
+    monkeypatch.setattr(settings, "bot_time_limit", 0.05)
+    game_id = game_service.create_game("甲", "電腦", bot_seats=[1], seed=7)["game_id"]
+    yield game_service.get_game(game_id)
+    shutdown_process_pool()
+
+
+async def wait_for_human(game_service, game) -> None:
+    while game.state.to_move == 1 and not game.state.is_finished:
+        assert await game_service.wait_for_update(game.game_id, game.version, 30)
+
+
+@pytest.mark.anyio
+async def test_bot_reply_is_published_as_a_later_version(game_service, bot_game):
+    delta = play_random_action(game_service, bot_game.game_id, random.Random(0))
+
+    # 動作立即回應，電腦玩家在行程池中思考後才推進版本
+    assert delta["version"] == 1
+    await wait_for_human(game_service, bot_game)
+    assert bot_game.version > 1
+
+
+@pytest.mark.anyio
+async def test_failed_search_falls_back_to_a_legal_move(game_service, bot_game, monkeypatch, caplog):
+    monkeypatch.setattr(game_service_module, "best_move_worker", failing_worker)
+
+    play_random_action(game_service, bot_game.game_id, random.Random(0))
+    await wait_for_human(game_service, bot_game)
+
+    # 遊戲沒有卡在電腦玩家的回合，人類玩家可以繼續行動
+    assert bot_game.version > 1
+    assert "改用貪婪策略" in caplog.text
+    play_random_action(game_service, bot_game.game_id, random.Random(1))
@@ -0,0 +1,94 @@
+"""對稱正規化：正規鍵與動作的來回轉換"""
+
+import random
+
+import pytest
+
+from app.domain.engine.canonical import canonical_move, canonicalize, resolve_move
+from app.domain.engine.replay import initial_state
+from app.domain.engine.state import PHASE_RESPOND
+from app.simulation.mcts import move_signature, play_move, state_moves
+
+
+def random_states(layout, count: int, seed: int = 0):
+    """隨機對局途中的局面 (包含等待回應的局面)"""
+    rng = random.Random(seed)
+    states = []
+    for game in range(count):
+        state = initial_state(layout, seed + game)
+        for _ in range(rng.randrange(12)):
+            if state.is_finished:
+                break
+            play_move(state, rng.choice(state_moves(state)))
+        if not state.is_finished:
+            states.append(state)
+    return states
+
+
+def test_resolve_inverts_canonical_move(layout):
+    for state in random_states(layout, 40):
+        _, perm = canonicalize(state)
+        for move in state_moves(state):
+            resolved = resolve_move(state, canonical_move(state, move, perm), perm)
+            # 同一位藝妓的卡牌可互換，因此比較藝妓組合
+            assert move_signature(layout, resolved) == move_signature(layout, move)
+            if resolved[0] is not None:
+                action, cards, split = resolved
+                assert cards & ~state.hands[state.current] == 0
+                assert split & ~cards == 0
+
+
+def test_resolved_responses_are_legal(layout):
+    responses = [state for state in random_states(layout, 80, seed=1) if state.phase == PHASE_RESPOND]
+    assert responses
+    for state in responses:
+        _, perm = canonicalize(state)
+        legal = {chosen for _, chosen, _ in state_moves(state)}
+        for move in state_moves(state):
+            _, chosen, _ = resolve_move(state, canonical_move(state, move, perm), perm)
+            if state.pending_split:
+                assert chosen in legal
+            else:
+                assert chosen & state.pending_offer and chosen.bit_count() == 1
+
+
+def swap_geishas(state, layout, first: int, second: int):
+    """交換兩位可互換藝妓的所有卡牌 (青睞不變，只用於沒有青睞的局面)"""
+    a = [card for card, geisha in enumerate(layout.card_geisha) if geisha == first]
+    b = [card for card, geisha in enumerate(layout.card_geisha) if geisha == second]
+    mapping = list(range(layout.card_count))
+    for x, y in zip(a, b):
+        mapping[x], mapping[y] = y, x
+
+    def remap(mask: int) -> int:
+        return sum(1 << mapping[card] for card in range(layout.card_count) if mask >> card & 1)
+
+    other = state.copy()
+    for masks in (other.hands, other.secrets, other.discards, other.allocated):
+        for seat in (0, 1):
+            masks[seat] = remap(masks[seat])
+    other.pending_offer = remap(state.pending_offer)
+    other.pending_split = remap(state.pending_split)
+    return other
+
+
+@pytest.mark.parametrize("first, second", [(2, 3), (4, 6)])
+def test_interchangeable_geishas_share_a_key(layout, first, second):
+    for state in random_states(layout, 20, seed=2):
+        if state.favor[0] | state.favor[1]:
+            continue
+        swapped = swap_geishas(state, layout, first, second)
+        assert canonicalize(swapped)[0] == canonicalize(state)[0]
+
+
+def test_key_ignores_what_the_mover_cannot_see(layout):
+    state = next(s for s in random_states(layout, 20, seed=3) if s.phase != PHASE_RESPOND)
+    other = 1 - state.to_move
+    shuffled = state.copy()
+    # 對手的一張手牌與牌庫互換，行動玩家看不到差異
+    deck = state.deck_mask()
+    hand = state.hands[other]
+    low_deck, low_hand = deck & -deck, hand & -hand
+    shuffled.hands[other] = hand ^ low_hand | low_deck
+
+    assert canonicalize(shuffled)[0] == canonicalize(state)[0]
@@ -0,0 +1,90 @@
+"""狀態差異：把差異套用到舊的完整狀態，應與新的完整狀態一致"""
+
+import random
+from typing import Any, Dict
+
+from conftest import play_random_action
+
+from app.config.settings import settings
+
+# 完整狀態中列出的卡牌狀態 (棄牌、移除與牌庫中的卡牌不會出現)
+VISIBLE = ("IN_HAND", "SECRET", "ALLOCATED")
+
+
+def view(full: Dict[str, Any]) -> Dict[str, Any]:
+    """完整狀態中差異會涵蓋的部分"""
+    groups = []
+    for player in full["players"].values():
+        groups += [player["hand_cards"], player["secret_cards"], *player["allocated_gifts"].values()]
+    if full["pending_offer"]:
+        # 展示中的卡牌仍算在出牌者手中
+        groups.append(full["pending_offer"]["cards"])
+    cards = {card["id"]: (card["status"], card["owner_id"]) for group in groups for card in group}
+    return {
+        "version": full["version"],
+        "status": full["status"],
+        "current_player_id": full["current_player_id"],
+        "round_number": full["round_number"],
+        "winner": full["winner"],
+        "pending_offer": full["pending_offer"],
+        "cards": cards,
+        "favor": {geisha["id"]: geisha["favor"] for geisha in full["geishas"]},
+        "used_actions": {player_id: player["used_actions"] for player_id, player in full["players"].items()},
+        "scores": {player_id: player["score"] for player_id, player in full["players"].items()},
+    }
+
+
+def apply_delta(full: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    """客戶端的套用方式"""
+    assert delta["base_version"] == full["version"]
+    state = view(full)
+    for move in delta["card_moves"]:
+        if move["to"]["status"] in VISIBLE:
+            state["cards"][move["card_id"]] = (move["to"]["status"], move["to"]["owner_id"])
+        else:
+            state["cards"].pop(move["card_id"], None)
+    for change in delta["favor_changes"]:
+        state["favor"][change["geisha_id"]] = change["favor"]
+    state["used_actions"].update(delta["used_actions"])
+    for key in ("version", "status", "current_player_id", "round_number", "winner", "pending_offer", "scores"):
+        state[key] = delta[key]
+    return state
+
+
+def test_delta_applied_to_previous_state_matches_full_state(game_service, game_id):
+    rng = random.Random(1)
+    game = game_service.get_game(game_id)
+    previous = game_service._serialize(game)
+    while previous["status"] != "FINISHED":
+        delta = play_random_action(game_service, game_id, rng)
+        current = game_service._serialize(game)
+
+        assert apply_delta(previous, delta) == view(current)
+        previous = current
+
+
+def test_update_from_older_versions(game_service, game_id):
+    rng = random.Random(2)
+    game = game_service.get_game(game_id)
+    history = [game_service._serialize(game)]
+    for _ in range(settings.delta_max_gap):
+        play_random_action(game_service, game_id, rng)
+        history.append(game_service._serialize(game))
+
+    # 舊版本以種子與動作記錄重播後比較
+    for since, full in enumerate(history):
+        update = game_service.get_state_update(game_id, since)
+        assert update["game_state"] is None
+        assert apply_delta(full, update["delta"]) == view(history[-1])
+
+
+def test_update_falls_back_to_full_state(game_service, game_id):
+    rng = random.Random(3)
+    for _ in range(settings.delta_max_gap + 1):
+        play_random_action(game_service, game_id, rng)
+    version = game_service.get_version(game_id)
+
+    for since in (None, -1, version + 1, 0):
+        update = game_service.get_state_update(game_id, since)
+        assert update["delta"] is None
+        assert update["game_state"]["version"] == version
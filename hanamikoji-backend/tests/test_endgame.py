@@ -0,0 +1,105 @@
+"""殘局求解：增量 Zobrist 雜湊、與暴力解比對、置換表容量"""
+
+import random
+
+import pytest
+
+from conftest import play_random_move
+
+from app.domain.engine.replay import initial_state
+from app.domain.engine.state import NO_WINNER
+from app.domain.engine.zobrist import zobrist_keys
+from app.simulation.endgame import ENTRY_BYTES, EndgameSolver, TranspositionTable, is_endgame
+from app.simulation.mcts import play_move, round_value, state_moves
+
+
+def test_incremental_key_matches_full_hash(layout):
+    keys = zobrist_keys(layout)
+    for seed in range(20):
+        rng = random.Random(seed)
+        state = initial_state(layout, seed)
+        state.enable_zobrist(keys)
+        while not state.is_finished:
+            play_random_move(state, rng)
+            assert state.zobrist_key == keys.hash(state)
+            assert state.copy().zobrist_key == state.zobrist_key
+
+
+def test_favor_changes_update_the_key(state, layout):
+    keys = zobrist_keys(layout)
+    state.enable_zobrist(keys)
+    for geisha, seat in ((0, 0), (0, 1), (0, NO_WINNER), (3, 1)):
+        state.set_favor(geisha, seat)
+        assert state.zobrist_key == keys.hash(state)
+    state.allocate(1 << 9, 0)
+    state.settle_favor(2)
+    assert state.zobrist_key == keys.hash(state)
+
+
+def minimax(state, round_number: int) -> float:
+    """不使用置換表與剪枝的完全搜尋 (座位0的觀點)"""
+    if state.is_finished or state.round_number != round_number:
+        return round_value(state, 0)
+    values = []
+    for move in state_moves(state):
+        child = state.copy()
+        play_move(child, move)
+        values.append(minimax(child, round_number))
+    return max(values) if state.to_move == 0 else min(values)
+
+
+def endgame_positions(layout, max_samples: int = 60):
+    """隨機對局中牌庫只剩一張以內、且有多種選擇的局面"""
+    solver = EndgameSolver(layout)
+    for seed in range(30):
+        rng = random.Random(seed)
+        state = initial_state(layout, seed)
+        while state.round_number == 1 and not state.is_finished:
+            if is_endgame(state, 1) and len(state_moves(state)) > 1:
+                samples = list(solver.assignments(state, state.to_move))
+                if len(samples) <= max_samples:
+                    yield state.copy(), samples
+            play_random_move(state, rng)
+
+
+@pytest.mark.parametrize("max_bytes", [64 * 1024 * 1024, ENTRY_BYTES * 8])
+def test_best_move_matches_brute_force(layout, max_bytes):
+    positions = 0
+    for state, samples in endgame_positions(layout):
+        seat = state.to_move
+        values = {}
+        for move in state_moves(state):
+            total = 0.0
+            for sample in samples:
+                child = sample.copy()
+                play_move(child, move)
+                total += minimax(child, state.round_number)
+            value = total / len(samples)
+            values[move] = value if seat == 0 else 1.0 - value
+
+        # 置換表很小時仍須得到相同的結果
+        best = EndgameSolver(layout, max_bytes).best_move(state)
+        assert values[best] == pytest.approx(max(values.values()))
+        positions += 1
+    assert positions >= 10
+
+
+def test_table_stays_within_its_byte_cap(layout):
+    max_bytes = ENTRY_BYTES * 50
+    solver = EndgameSolver(layout, max_bytes)
+    for state, _ in endgame_positions(layout):
+        solver.best_move(state)
+        assert len(solver.table) * ENTRY_BYTES <= max_bytes
+
+    assert solver.table.stats()["entries"] == solver.table.max_entries == 50
+
+
+def test_table_evicts_least_recently_used():
+    table = TranspositionTable(ENTRY_BYTES * 2)
+    table.put(1, 0.1, 0)
+    table.put(2, 0.2, 0)
+    table.get(1)
+    table.put(3, 0.3, 0)
+
+    assert table.get(2) is None
+    assert table.get(1) == (0.1, 0) and table.get(3) == (0.3, 0)
@@ -0,0 +1,174 @@
+"""位元棋盤引擎：行動、回應、回合結算與勝負判定"""
+
+import random
+
+import pytest
+
+from conftest import play_random_move
+
+from app.domain.engine.replay import initial_state
+from app.domain.engine.state import (
+    ALL_ACTIONS_MASK, HAND_SIZE, NO_WINNER, PHASE_ACTION, PHASE_FINISHED, PHASE_RESPOND, mask_of,
+)
+from app.domain.enums.game_enums import ActionType
+
+
+def test_deal(state):
+    assert state.hands[0] == mask_of(range(HAND_SIZE)) | 1 << 12
+    assert state.hands[1] == mask_of(range(HAND_SIZE, HAND_SIZE * 2))
+    assert state.removed == 1 << 20
+    assert state.current == 0 and state.phase == PHASE_ACTION
+    assert state.deck_mask() == mask_of(range(13, 20))
+
+
+def test_secret_ends_turn_and_opponent_draws(state):
+    state.apply_action(ActionType.SECRET, 1 << 0)
+
+    assert state.secrets[0] == 1 << 0
+    assert not state.hands[0] & 1
+    assert state.has_used(0, ActionType.SECRET)
+    assert state.current == 1
+    assert state.hands[1] & 1 << 13
+
+
+def test_discard_does_not_count_as_influence(state):
+    state.apply_action(ActionType.DISCARD, mask_of([0, 1]))
+
+    assert state.discards[0] == mask_of([0, 1])
+    assert state.influence(0, 0) == 0
+
+
+def test_gift_response(state):
+    # 卡牌 0~4 屬於藝妓0，5~8 屬於藝妓1
+    state.apply_action(ActionType.GIFT, mask_of([0, 1, 5]))
+    assert state.phase == PHASE_RESPOND
+    assert state.to_move == 1
+    assert state.pending_offer == mask_of([0, 1, 5])
+
+    state.respond(1 << 0)
+
+    assert state.allocated[1] == 1 << 0
+    assert state.allocated[0] == mask_of([1, 5])
+    assert [state.influence(0, 0), state.influence(0, 1), state.influence(1, 0)] == [1, 1, 1]
+    assert state.pending_action is None and state.phase == PHASE_ACTION
+    assert state.current == 1
+
+
+def test_compete_response(state):
+    state.apply_action(ActionType.COMPETE, mask_of([0, 1, 4, 5]), mask_of([0, 1]))
+    state.respond(mask_of([4, 5]))
+
+    assert state.allocated[1] == mask_of([4, 5])
+    assert state.allocated[0] == mask_of([0, 1])
+
+
+@pytest.mark.parametrize("action, cards, split", [
+    (ActionType.SECRET, 0b11, 0),                           # 張數不符
+    (ActionType.GIFT, mask_of([0, 1, 6]), 0),               # 不在手牌中
+    (ActionType.COMPETE, mask_of([0, 1, 2, 3]), 1 << 0),    # 分組不是兩張
+])
+def test_invalid_action_raises(state, action, cards, split):
+    with pytest.raises(ValueError):
+        state.apply_action(action, cards, split)
+
+
+def test_action_marker_used_once(state):
+    state.apply_action(ActionType.SECRET, 1 << 0)
+    state.apply_action(ActionType.SECRET, 1 << 6)
+    with pytest.raises(ValueError):
+        state.apply_action(ActionType.SECRET, 1 << 1)
+
+
+@pytest.mark.parametrize("chosen", [1 << 1, mask_of([4, 5])])
+def test_invalid_response_raises(state, chosen):
+    state.apply_action(ActionType.GIFT, mask_of([0, 4, 5]))
+    with pytest.raises(ValueError):
+        state.respond(chosen)
+
+
+def test_tie_leaves_geisha_neutral(state, layout):
+    # 前一回合座位0獲得青睞，本回合平手仍為中立
+    state.set_favor(0, 0)
+    state.allocate(1 << 0, 0)
+    assert state.projected_favored_seat(0) == 0
+    state.allocate(1 << 1, 1)
+    assert state.projected_favored_seat(0) == NO_WINNER
+
+    state.settle_favor(0)
+
+    assert state.favored_seat(0) == NO_WINNER
+
+
+def play_round(state, seed):
+    """隨機下完目前的回合"""
+    rng = random.Random(seed)
+    round_number = state.round_number
+    while state.round_number == round_number and not state.is_finished:
+        play_random_move(state, rng)
+
+
+def test_round_end_reveals_secrets_and_settles_favor(layout):
+    state = initial_state(layout, 3)
+    state.stop_at_round_end = True
+    secrets = []
+    rng = random.Random(3)
+    while state.round_number == 1 and not state.is_finished:
+        secrets.append(state.secrets[0] | state.secrets[1])
+        play_random_move(state, rng)
+
+    # 秘密卡翻開後計入影響力；青睞只取決於本回合的張數，平手為中立
+    assert state.secrets == [0, 0]
+    assert max(secrets) & ~(state.allocated[0] | state.allocated[1]) == 0
+    for geisha in range(layout.geisha_count):
+        mine, theirs = state.influence(geisha, 0), state.influence(geisha, 1)
+        expected = 0 if mine > theirs else 1 if theirs > mine else NO_WINNER
+        assert state.favored_seat(geisha) == expected
+
+
+def test_stop_at_round_end_skips_the_next_deal(layout):
+    state = initial_state(layout, 3)
+    state.stop_at_round_end = True
+    play_round(state, 3)
+
+    assert state.round_number == 2 or state.is_finished
+    assert state.used == [ALL_ACTIONS_MASK, ALL_ACTIONS_MASK]
+
+
+def test_next_round_is_dealt(layout):
+    for seed in range(20):
+        state = initial_state(layout, seed)
+        play_round(state, seed)
+        if not state.is_finished:
+            break
+    else:
+        pytest.fail("找不到第一回合沒有分出勝負的種子")
+
+    # 後手成為新回合的先手並抽牌，本回合的分配與行動標記重置
+    assert state.round_number == 2
+    assert state.round_starter == 1 and state.current == 1
+    assert state.hands[1].bit_count() == HAND_SIZE + 1
+    assert state.hands[0].bit_count() == HAND_SIZE
+    assert state.allocated == [0, 0] and state.used == [0, 0]
+    assert state.projected == [0, 0]
+
+
+@pytest.mark.parametrize("favor, winner", [
+    ((0b0000111, 0), 0),          # 魅力 5+4+3 = 12
+    ((0, 0b1111000), 1),          # 四位藝妓
+    ((0b0000111, 0b1111000), 1),  # 雙方都達成時比藝妓數
+    ((0b0000011, 0b0000100), NO_WINNER),
+])
+def test_winner_rules(state, favor, winner):
+    assert state._winner_of(list(favor)) == winner
+
+
+def test_game_ends_with_a_winner(layout):
+    state = initial_state(layout, 5)
+    while not state.is_finished:
+        play_round(state, state.round_number)
+
+    assert state.phase == PHASE_FINISHED
+    assert state.winner == state._winner_of(state.favor)
+    assert state.winner != NO_WINNER
+    with pytest.raises(ValueError):
+        state.apply_action(ActionType.SECRET, 1 << 0)
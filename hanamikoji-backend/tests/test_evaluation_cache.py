@@ -0,0 +1,63 @@
+"""評估快取：電腦玩家與提示搜尋共用"""
+
+import random
+
+import pytest
+
+from conftest import play_random_move
+
+from app.domain.engine.canonical import canonicalize
+from app.domain.engine.replay import initial_state
+from app.domain.engine.state import PHASE_ACTION
+from app.simulation.evaluation_cache import EvaluationCache, get_evaluation_cache
+from app.simulation.mcts import MCTSPolicy, SearchTree, grow_tree_worker, move_signature
+
+
+@pytest.fixture
+def cache() -> EvaluationCache:
+    cache = get_evaluation_cache()
+    cache.clear()
+    yield cache
+    cache.clear()
+
+
+@pytest.fixture
+def mid_round(layout):
+    """回合中途輪到行動的局面 (不查開局庫、也不是殘局)"""
+    rng = random.Random(4)
+    state = initial_state(layout, 4)
+    while state.used[0] == 0 or state.used[1] == 0 or state.phase != PHASE_ACTION:
+        play_random_move(state, rng)
+    return state
+
+
+def test_bot_search_is_cached(layout, cache, mid_round):
+    policy = MCTSPolicy(iterations=100)
+    move = policy.best_move(mid_round, random.Random(0))
+
+    assert cache.get(canonicalize(mid_round)[0]) is not None
+    assert policy.best_move(mid_round, random.Random(1)) == move
+
+
+def test_hint_search_seeds_the_cache_for_bots(layout, cache, mid_round):
+    tree, _ = grow_tree_worker(SearchTree(mid_round), mid_round, 0, 0.05)
+    assert cache.get(canonicalize(mid_round)[0]) is not None
+    hits = cache.hits
+
+    move = MCTSPolicy(iterations=100).best_move(mid_round, random.Random(0))
+
+    # 電腦玩家直接採用提示樹上造訪最多的動作，不再搜尋
+    assert cache.hits == hits + 1
+    visits = {move_signature(layout, ranked): count for ranked, _, count in tree.ranked(mid_round)}
+    assert visits[move_signature(layout, move)] == max(visits.values())
+
+
+def test_cache_evicts_least_recently_used():
+    cache = EvaluationCache(max_entries=2)
+    cache.put("a", {})
+    cache.put("b", {})
+    cache.get("a")
+    cache.put("c", {})
+
+    assert cache.get("b") is None
+    assert len(cache) == 2
@@ -0,0 +1,74 @@
+"""條件式 GET：遊戲與房間狀態的 ETag/304"""
+
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+
+from conftest import play_random_action
+
+from main import app
+
+
+@pytest.fixture
+def client() -> TestClient:
+    # 不執行 lifespan，遊戲 API 只使用記憶體中的 GameService
+    return TestClient(app)
+
+
+def test_game_state_not_modified(client, game_service, game_id):
+    response = client.get(f"/api/v1/games/{game_id}")
+    etag = response.headers["etag"]
+    assert response.status_code == 200
+    assert etag == '"0-joiner"'
+    assert response.headers["cache-control"] == "no-cache"
+
+    response = client.get(f"/api/v1/games/{game_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+
+
+def test_creator_gets_its_own_etag(client, game_service, game_id):
+    joiner = client.get(f"/api/v1/games/{game_id}").headers["etag"]
+    creator_token = game_service._game_sessions[game_id]["creator_token"]
+
+    response = client.get(f"/api/v1/games/{game_id}", params={"creator_token": creator_token},
+                          headers={"If-None-Match": joiner})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] == '"0-creator"'
+
+
+def test_action_changes_etag(client, game_service, game_id):
+    etag = client.get(f"/api/v1/games/{game_id}").headers["etag"]
+    play_random_action(game_service, game_id, random.Random(0))
+
+    response = client.get(f"/api/v1/games/{game_id}", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] == '"1-joiner"'
+    assert response.json()["version"] == 1
+
+
+@pytest.mark.parametrize("header, status", [('"0"', 304), ('W/"0", "x"', 304), ("*", 304), ('"1"', 200)])
+def test_status_not_modified(client, game_id, header, status):
+    response = client.get(f"/api/v1/games/{game_id}/status", headers={"If-None-Match": header})
+
+    assert response.status_code == status
+
+
+def test_missing_game_is_not_a_match(client):
+    assert client.get("/api/v1/games/nope", headers={"If-None-Match": "*"}).status_code == 404
+
+
+
+
+def test_room_not_modified(offline_mongodb, client):
+    room = client.post("/api/v1/rooms/join", json={"player_name": "甲", "player_id": "p1"}).json()
+    etag = client.get(f"/api/v1/rooms/{room['room_id']}").headers["etag"]
+    assert client.get(f"/api/v1/rooms/{room['room_id']}", headers={"If-None-Match": etag}).status_code == 304
+
+    client.post("/api/v1/rooms/join", json={"player_name": "乙", "player_id": "p2"})
+    response = client.get(f"/api/v1/rooms/{room['room_id']}", headers={"If-None-Match": etag})
+    assert response.status_code == 200 and response.headers["etag"] != etag
@@ -0,0 +1,76 @@
+"""遊戲建立基準測試：各階段量測與基準比較"""
+
+import json
+
+import pytest
+
+from app.benchmarks import game_creation
+from app.benchmarks.game_creation import DEFAULT_BASELINE_PATH, bench, compare, percentile, run
+
+STAGES = ["load", "geishas", "deck", "deal", "serialize", "end_to_end"]
+
+
+def test_percentile():
+    values = list(range(101))
+    assert percentile(values, 0.5) == 50
+    assert percentile(values, 0.99) == 99
+    assert percentile([7], 0.99) == 7
+
+
+def test_bench_reports_every_field():
+    result = bench(lambda: [0] * 100, iterations=50, warmup=5)
+
+    assert result["iterations"] == 50
+    assert result["ops_per_sec"] > 0
+    assert result["p50_us"] <= result["p99_us"]
+    # 每次建立一個 100 個元素的串列
+    assert result["alloc_bytes_per_op"] >= 800
+
+
+def test_run_measures_each_stage():
+    report = run(iterations=20, warmup=2)
+    assert list(report["stages"]) == STAGES
+
+    only = run(iterations=5, warmup=0, only=["deck", "deal"])
+    assert list(only["stages"]) == ["deck", "deal"]
+
+
+def test_compare_flags_regressions():
+    def stage(ops):
+        return {"ops_per_sec": ops, "alloc_bytes_per_op": 100.0}
+
+    baseline = {"stages": {"deck": stage(1000.0), "deal": stage(1000.0)}}
+    report = {"stages": {"deck": stage(700.0), "deal": stage(900.0), "load": stage(10.0)}}
+    comparison = compare(report, baseline, tolerance=0.2)
+
+    assert comparison["deck"]["regression"] is True and comparison["deck"]["ratio"] == 0.7
+    assert comparison["deal"]["regression"] is False
+    assert "load" not in comparison
+
+
+def test_shipped_baseline_covers_every_stage():
+    with open(DEFAULT_BASELINE_PATH, encoding="utf-8") as f:
+        baseline = json.load(f)
+    assert list(baseline["stages"]) == STAGES
+
+
+def test_cli_saves_and_compares_baseline(tmp_path, monkeypatch, capsys):
+    path = str(tmp_path / "baseline.json")
+    argv = ["game_creation", "--iterations", "5", "--warmup", "0", "--stages", "deck", "--baseline", path]
+    monkeypatch.setattr("sys.argv", argv + ["--save-baseline"])
+    game_creation.main()
+    assert json.loads(capsys.readouterr().out)["baseline_saved"] == path
+
+    monkeypatch.setattr("sys.argv", argv)
+    game_creation.main()
+    assert set(json.loads(capsys.readouterr().out)["comparison"]) == {"deck"}
+
+    # 基準快到不可能達到時回報退步
+    with open(path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    baseline["stages"]["deck"]["ops_per_sec"] *= 1000
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f)
+    monkeypatch.setattr("sys.argv", argv + ["--fail-on-regression"])
+    with pytest.raises(SystemExit):
+        game_creation.main()
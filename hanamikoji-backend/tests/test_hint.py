@@ -0,0 +1,85 @@
+"""動作提示：延續的搜尋樹與座位隔離"""
+
+import random
+
+import pytest
+
+from conftest import play_random_action
+
+from app.config.settings import settings
+from app.domain.engine.replay import initial_state
+from app.domain.engine.validation import ActionValidationError
+from app.schemas.game import ActionRequest
+from app.services.analysis_service import AnalysisService
+from app.simulation.mcts import SearchTree
+from app.simulation.pool import shutdown_process_pool
+
+
+@pytest.fixture
+def analysis_service(game_service, monkeypatch):
+    monkeypatch.setattr(settings, "hint_time_limit", 0.05)
+    yield AnalysisService(game_service)
+    shutdown_process_pool()
+
+
+def current_player(game_service, game_id: str) -> str:
+    full = game_service._serialize(game_service.get_game(game_id))
+    offer = full["pending_offer"]
+    return offer["responder_id"] if offer else full["current_player_id"]
+
+
+def test_advance_keeps_statistics_of_searched_moves(layout):
+    state = initial_state(layout, 0)
+    tree = SearchTree(state)
+    tree.search(state, random.Random(0), iterations=300)
+    move = max(tree.root.children.values(), key=lambda child: child.visits).move
+    visits = tree.root.children[move].visits
+
+    assert tree.advance(layout, [move]) is True
+    assert tree.root.visits == visits and tree.root.parent is None
+
+    # 沒有展開過的動作建立新節點
+    assert tree.advance(layout, [(None, 0, 0)]) is False
+
+
+@pytest.mark.anyio
+async def test_hint_ranks_legal_moves(analysis_service, game_service, game_id):
+    player_id = current_player(game_service, game_id)
+    result = await analysis_service.hint(game_id, player_id, max_results=3)
+
+    assert result["iterations"] > 0 and result["tree_reused"] is False
+    assert 0 < len(result["hints"]) <= 3
+    visits = [hint["visits"] for hint in result["hints"]]
+    assert visits == sorted(visits, reverse=True)
+    # 提示的動作可以直接送出
+    game_service.execute_action(game_id, ActionRequest(**result["hints"][0]["action"]))
+
+
+@pytest.mark.anyio
+async def test_hint_rejects_the_waiting_player(analysis_service, game_service, game_id):
+    game = game_service.get_game(game_id)
+    waiting = game.players[1 - game.state.to_move].id
+
+    with pytest.raises(ActionValidationError):
+        await analysis_service.hint(game_id, waiting)
+
+
+@pytest.mark.anyio
+async def test_opponent_never_reuses_the_tree(analysis_service, game_service, game_id):
+    game = game_service.get_game(game_id)
+    first = current_player(game_service, game_id)
+    seat = game.player_by_id(first).seat
+    result = await analysis_service.hint(game_id, first)
+    game_service.execute_action(game_id, ActionRequest(**result["hints"][0]["action"]))
+
+    # 第一位玩家的樹可以接到目前局面，但它是依第一位玩家的手牌搜尋的
+    state, actions = game.state.copy(), list(game.actions)
+    assert analysis_service._reroot((game_id, seat), state, actions, game.version, game.version_base)[1] is True
+
+    second = current_player(game_service, game_id)
+    assert second != first
+    result = await analysis_service.hint(game_id, second)
+    assert result["tree_reused"] is False
+    keys = {key for key in analysis_service._trees if key[0] == game_id}
+    assert keys == {(game_id, seat), (game_id, 1 - seat)}
+    assert analysis_service._trees[(game_id, 1 - seat)][1].root.visits == result["iterations"]
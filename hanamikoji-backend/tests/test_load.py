@@ -0,0 +1,59 @@
+"""行程內負載測試：隨機動作、統計與完整的配對/對局流程"""
+
+import argparse
+import random
+
+import httpx
+import pytest
+
+from app.schemas.game import ActionRequest
+from app.benchmarks.load import LoadRunner, LoadStats, choose_action, summarize
+from main import app
+
+
+def test_choose_action_plays_a_whole_game(game_service, game_id):
+    rng = random.Random(0)
+    game = game_service.get_game(game_id)
+    while not game.state.is_finished:
+        full = game_service._serialize(game)
+        offer = full["pending_offer"]
+        actor = offer["responder_id"] if offer else full["current_player_id"]
+        if offer:
+            # 提出獻禮/競爭的一方等待回應
+            offerer = next(pid for pid in full["players"] if pid != actor)
+            assert choose_action(full, offerer, rng) is None
+        game_service.execute_action(game_id, ActionRequest(**choose_action(full, actor, rng)))
+    assert game.state.winner is not None
+
+
+def test_summarize():
+    assert summarize([]) == {"p50_ms": 0.0, "p90_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    summary = summarize([float(i) for i in range(1, 101)])
+    assert (summary["p50_ms"], summary["p99_ms"], summary["max_ms"]) == (51.0, 99.0, 100.0)
+
+
+def test_report_counts_requests_per_route():
+    stats = LoadStats()
+    stats.latencies["GET /a"] += [1.0, 2.0]
+    stats.latencies["POST /b"] += [3.0]
+    stats.errors["POST /b"] += 1
+    report = stats.report(elapsed=0.5)
+
+    assert report["requests"] == 3 and report["throughput_rps"] == 6.0
+    assert report["routes"]["POST /b"]["errors"] == 1
+    assert report["routes"]["GET /a"]["count"] == 2
+
+
+@pytest.mark.anyio
+async def test_players_are_matched_and_play(offline_mongodb):
+    args = argparse.Namespace(players=4, arrival_rate=0, think_time=0, poll_interval=0.005, rounds=1,
+                              match_timeout=5, timeout=60, seed=0)
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://load") as client:
+        report = await LoadRunner(client, args).run()
+
+    assert report["players_joined"] == 4 and report["failed_players"] == 0
+    assert report["games_started"] == report["games_finished"] == 2
+    assert report["actions"] > 0 and report["crashed_players"] == report["timed_out_players"] == 0
+    assert all(route["errors"] == 0 for route in report["routes"].values())
+    assert report["event_loop_lag"]["max_ms"] >= 0
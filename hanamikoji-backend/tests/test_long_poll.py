@@ -0,0 +1,62 @@
+"""長輪詢：等待新版本、逾時與喚醒"""
+
+import asyncio
+import random
+import time
+
+import httpx
+import pytest
+
+from conftest import play_random_action
+
+from app.services.version_waiters import game_waiters
+from main import app
+
+
+@pytest.mark.anyio
+async def test_wait_times_out(game_service, game_id):
+    started = time.perf_counter()
+
+    assert await game_service.wait_for_update(game_id, 0, 0.05) is False
+    assert time.perf_counter() - started >= 0.05
+    assert game_waiters.waiting(game_id) == 0
+
+
+@pytest.mark.anyio
+async def test_wait_wakes_on_action(game_service, game_id):
+    waiters = [asyncio.create_task(game_service.wait_for_update(game_id, 0, 5)) for _ in range(3)]
+    await asyncio.sleep(0.01)
+    assert game_waiters.waiting(game_id) == 3
+
+    play_random_action(game_service, game_id, random.Random(0))
+
+    assert await asyncio.wait_for(asyncio.gather(*waiters), 1) == [True, True, True]
+    assert game_waiters.waiting(game_id) == 0
+
+
+@pytest.mark.anyio
+async def test_wait_returns_at_once(game_service, game_id):
+    play_random_action(game_service, game_id, random.Random(0))
+
+    # 已有更新的版本，或客戶端的版本不屬於這局
+    assert await game_service.wait_for_update(game_id, 0, 5) is True
+    assert await game_service.wait_for_update(game_id, 99, 5) is True
+    with pytest.raises(ValueError):
+        await game_service.wait_for_update("nope", 0, 5)
+
+
+@pytest.mark.anyio
+async def test_wait_route(game_service, game_id):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get(f"/api/v1/games/{game_id}/wait", params={"since": 0, "timeout": 0.05})
+        assert response.status_code == 204
+
+        waiter = asyncio.create_task(client.get(f"/api/v1/games/{game_id}/wait", params={"since": 0, "timeout": 5}))
+        await asyncio.sleep(0.05)
+        play_random_action(game_service, game_id, random.Random(0))
+        response = await asyncio.wait_for(waiter, 1)
+
+        assert response.status_code == 200
+        assert response.json()["version"] == 1
+        assert response.json()["delta"]["base_version"] == 0
+
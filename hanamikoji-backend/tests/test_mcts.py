@@ -0,0 +1,87 @@
+"""MCTS：確定化、搜尋預算與根平行"""
+
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from conftest import play_random_move
+
+from app.domain.engine.replay import initial_state
+from app.domain.engine.state import PHASE_RESPOND
+from app.simulation.mcts import (
+    MCTSPolicy, determinize, move_signature, parallel_search, search, state_moves,
+)
+
+
+def mid_round_states(layout, count: int, seed: int = 0):
+    """隨機走到回合中途的局面"""
+    rng = random.Random(seed)
+    states = []
+    for game in range(count):
+        state = initial_state(layout, seed + game)
+        for _ in range(rng.randrange(1, 6)):
+            play_random_move(state, rng)
+        if not state.is_finished:
+            states.append(state)
+    return states
+
+
+def test_determinize_keeps_what_the_mover_knows(layout):
+    for state in mid_round_states(layout, 20):
+        seat = state.to_move
+        other = 1 - seat
+        sample = determinize(state, seat, random.Random(0))
+
+        assert sample.hands[seat] == state.hands[seat]
+        assert sample.secrets[seat] == state.secrets[seat]
+        assert sample.allocated == state.allocated
+        assert sample.pending_offer == state.pending_offer
+        for masks, original in ((sample.hands, state.hands), (sample.secrets, state.secrets)):
+            assert masks[other].bit_count() == original[other].bit_count()
+        # 每張卡牌恰好在一個位置 (展示中的卡牌不在手牌中)
+        zones = [*sample.hands, *sample.secrets, *sample.discards, *sample.allocated,
+                 sample.pending_offer, sample.deck_mask(), sample.removed]
+        assert sum(zone.bit_count() for zone in zones) == layout.card_count
+        assert sum(zones) == layout.full_mask
+        assert sample.stop_at_round_end and not state.stop_at_round_end
+
+
+def test_search_visits_only_legal_moves(layout):
+    for state in mid_round_states(layout, 5, seed=1):
+        visits = search(state, random.Random(0), iterations=200)
+
+        assert set(visits) <= set(state_moves(state))
+        assert sum(visits.values()) == 200
+
+
+def test_search_respects_time_limit(state):
+    started = time.perf_counter()
+    visits = search(state, random.Random(0), time_limit=0.05)
+
+    assert time.perf_counter() - started < 0.5
+    assert sum(visits.values()) > 0
+
+
+def test_parallel_search_merges_root_visits(state):
+    with ThreadPoolExecutor(2) as executor:
+        visits = parallel_search(state, random.Random(0), executor, workers=2, iterations=100)
+
+    assert set(visits) <= set(state_moves(state))
+    assert sum(visits.values()) == 200
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_best_move_is_legal(layout, workers):
+    with ThreadPoolExecutor(2) as executor:
+        policy = MCTSPolicy(iterations=100, workers=workers, executor=executor, use_cache=False)
+        for state in mid_round_states(layout, 10, seed=2):
+            move = policy.best_move(state, random.Random(0))
+            if state.phase == PHASE_RESPOND:
+                assert move[0] is None and move[1] in {chosen for _, chosen, _ in state_moves(state)}
+            else:
+                # 開局庫與快取回傳的卡牌可能是同藝妓的另一張，比較等價類別
+                legal = {move_signature(layout, m) for m in state_moves(state)}
+                assert move_signature(layout, move) in legal
+                state.copy().apply_action(*move)
@@ -0,0 +1,61 @@
+"""精簡實體：__slots__、延遲時間戳記與記憶體基準"""
+
+from datetime import datetime
+
+import pytest
+
+from app.benchmarks import memory
+from app.domain.entities.room import Room, RoomPlayer
+from app.domain.entities.user import ActionMarker, Player
+from app.domain.enums.game_enums import ActionType
+from app.domain.factories.game_factory import GameFactory
+
+
+@pytest.fixture
+def game():
+    return GameFactory("app/domain/data").create_new_game("甲", "乙", seed=1)
+
+
+def test_entities_have_no_instance_dict(game):
+    room = Room()
+    room.add_player("player_1", "玩家1")
+    for obj in (game, game.player1, game.geishas[0], game.player1.hand_cards[0],
+                ActionMarker(ActionType.SECRET), room, room.players[0]):
+        assert not hasattr(obj, "__dict__"), type(obj).__name__
+        with pytest.raises(AttributeError):
+            obj.unexpected = 1
+
+
+def test_timestamps_are_stored_as_seconds():
+    player = Player("p1", "甲")
+    assert isinstance(player._join_time, float)
+    assert isinstance(player.join_time, datetime)
+
+    marker = ActionMarker(ActionType.GIFT)
+    assert marker.used_time is None
+    marker.used_time = datetime(2024, 1, 2, 3, 4, 5)
+    assert marker._used_time == marker.used_time.timestamp()
+    assert marker.used_time == datetime(2024, 1, 2, 3, 4, 5)
+
+
+def test_room_timestamps_round_trip():
+    joined = datetime(2024, 5, 6, 7, 8, 9)
+    player = RoomPlayer("player_1", "玩家1", joined_at=joined)
+    assert player.joined_at == joined
+    seen = player._last_seen
+    player.touch()
+    assert player._last_seen >= seen > joined.timestamp()
+
+    room = Room(created_at=joined)
+    assert room.created_at == joined and room.started_at is None
+    room.add_player("player_1", "玩家1")
+    assert room.to_dict()["players"][0]["joined_at"]
+
+
+def test_memory_benchmark_reports_per_object_bytes():
+    result = memory.run(games=20, rooms=20)
+
+    for key in ("per_game", "per_room"):
+        assert result[key]["count"] == 20
+        assert result[key]["bytes_per_object"] > 0
+    assert set(result["instance_bytes"]) >= {"Game", "Player", "Geisha", "GiftCard", "Room", "RoomPlayer"}
@@ -0,0 +1,57 @@
+"""開局庫：緊密格式的寫入與查詢"""
+
+import os
+import random
+
+import pytest
+
+from app.domain.engine.canonical import canonicalize, resolve_move, symmetry_classes
+from app.domain.engine.replay import initial_state
+from app.simulation.opening_book import (
+    DEFAULT_BOOK_PATH, ENTRY, HEADER, INDEX, OpeningBook, _encode, iter_opening_hands, opening_state,
+    slot_radices, solve_opening, write_opening_book,
+)
+
+
+@pytest.fixture(scope="module")
+def hands(layout):
+    return list(iter_opening_hands(slot_radices(layout), symmetry_classes(layout)))
+
+
+def test_lookup_returns_what_the_generator_wrote(layout, hands, tmp_path):
+    rng = random.Random(0)
+    entries = dict(solve_opening(counts, seed, 5, "app/domain/data") for seed, counts in enumerate(hands))
+    path = str(tmp_path / "book.bin")
+    write_opening_book(path, layout, entries)
+    book = OpeningBook(path, layout)
+
+    assert len(book) == len(hands) == 212
+    assert os.path.getsize(path) == HEADER.size + len(slot_radices(layout)) + len(hands) * (INDEX.size + ENTRY.size)
+    for counts, entry in entries.items():
+        state = opening_state(layout, counts, rng)
+        move, perm = book.lookup(state)
+        assert _encode(move) == entry
+        assert perm == canonicalize(state)[1]
+    book.close()
+
+
+def test_missing_hand_is_not_found(layout, hands, tmp_path):
+    path = str(tmp_path / "book.bin")
+    write_opening_book(path, layout, {hands[0]: solve_opening(hands[0], 0, 5, "app/domain/data")[1]})
+    book = OpeningBook(path, layout)
+
+    assert book.lookup(opening_state(layout, hands[0], random.Random(0))) is not None
+    assert book.lookup(opening_state(layout, hands[1], random.Random(0))) is None
+    book.close()
+
+
+def test_shipped_book_covers_every_opening(layout):
+    book = OpeningBook(DEFAULT_BOOK_PATH, layout)
+    for seed in range(200):
+        state = initial_state(layout, seed)
+        move, perm = book.lookup(state)
+        state.copy().apply_action(*resolve_move(state, move, perm))
+    # 不是第一手時不查表
+    state.apply_action(*resolve_move(state, move, perm))
+    assert book.lookup(state) is None
+    book.close()
@@ -0,0 +1,78 @@
+"""種子建局與重播：相同的 (種子, 動作序列) 得到相同的狀態"""
+
+import random
+
+from fastapi.testclient import TestClient
+
+from conftest import play_random_action
+
+from app.domain.engine.replay import decode_actions, encode_actions, initial_state, replay
+from app.domain.factories.game_factory import GameFactory
+from main import app
+
+# 重播需要比對的狀態欄位 (不含 rng 與 Zobrist)
+STATE_FIELDS = (
+    "order", "draw_pos", "removed", "hands", "secrets", "discards", "allocated", "used",
+    "favor", "counts", "current", "round_starter", "round_number",
+    "phase", "pending_action", "pending_offer", "pending_split", "winner",
+)
+
+
+def snapshot(state):
+    values = {name: getattr(state, name) for name in STATE_FIELDS}
+    # 引擎就地修改串列，需要複製
+    return {name: value[:] if isinstance(value, list) else value for name, value in values.items()}
+
+
+def test_same_seed_deals_the_same_game(layout):
+    factory = GameFactory("app/domain/data")
+    first = factory.create_new_game("甲", "乙", seed=42)
+    second = factory.create_new_game("甲", "乙", seed=42)
+    other = factory.create_new_game("甲", "乙", seed=43)
+
+    assert first.seed == 42
+    assert snapshot(first.state) == snapshot(second.state) == snapshot(initial_state(layout, 42))
+    assert snapshot(first.state) != snapshot(other.state)
+
+
+def test_replay_rebuilds_every_position(game_service, game_id):
+    rng = random.Random(2)
+    game = game_service.get_game(game_id)
+    positions = [snapshot(game.state)]
+    while not game.state.is_finished:
+        play_random_action(game_service, game_id, rng)
+        positions.append(snapshot(game.state))
+
+    # 跨越回合結束的重新洗牌也能重現
+    assert game.state.round_number > 1
+    for upto, position in enumerate(positions):
+        assert snapshot(replay(game.state.layout, game.seed, game.actions, upto)) == position
+    assert snapshot(game.replay().state) == positions[-1]
+
+
+def test_encoded_actions_round_trip(game_service, game_id):
+    rng = random.Random(4)
+    game = game_service.get_game(game_id)
+    for _ in range(12):
+        play_random_action(game_service, game_id, rng)
+
+    rows = encode_actions(game.actions)
+    assert all(isinstance(value, int) for row in rows for value in row)
+    assert decode_actions(rows) == game.actions
+
+
+def test_replay_route(game_service, game_id):
+    client = TestClient(app)
+    rng = random.Random(5)
+    for _ in range(4):
+        play_random_action(game_service, game_id, rng)
+
+    opening = client.get(f"/api/v1/games/{game_id}/replay", params={"upto": 0})
+    current = client.get(f"/api/v1/games/{game_id}/replay")
+    assert opening.status_code == current.status_code == 200
+    served = game_service._serialize(game_service.get_game(game_id))
+    assert {key: current.json()[key] for key in served} == served
+    assert opening.json() != current.json()
+
+    assert client.get(f"/api/v1/games/{game_id}/replay", params={"upto": 5}).status_code == 422
+    assert client.get("/api/v1/games/nope/replay").status_code == 404
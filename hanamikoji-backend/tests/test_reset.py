@@ -0,0 +1,101 @@
+"""重置遊戲：重新發牌、版本接續並通知等待中的客戶端"""
+
+import asyncio
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+
+from conftest import play_random_action
+
+from app.config.settings import settings
+from app.domain.engine.replay import initial_state
+from app.services.analysis_service import AnalysisService
+from app.services.channels import Connection, game_channels
+from app.simulation.pool import shutdown_process_pool
+from main import app
+
+
+def play_actions(game_service, game_id: str, count: int) -> None:
+    rng = random.Random(0)
+    for _ in range(count):
+        play_random_action(game_service, game_id, rng)
+
+
+def test_reset_deals_a_new_game(game_service, game_id):
+    game = game_service.get_game(game_id)
+    players = [player.id for player in game.players]
+    play_actions(game_service, game_id, 5)
+
+    state = game_service.reset_game(game_id)
+
+    assert game.version == state["version"] == 6
+    assert game.actions == [] and game.seed != 7
+    assert [player.id for player in game.players] == players
+    assert game.state.hands == initial_state(game.state.layout, game.seed).hands
+    assert game.replay().state.hands == game.state.hands
+    with pytest.raises(ValueError):
+        game_service.reset_game("nope")
+
+
+def test_deltas_after_reset(game_service, game_id):
+    play_actions(game_service, game_id, 3)
+    game_service.reset_game(game_id)
+    play_actions(game_service, game_id, 2)
+
+    # 重置前的版本無法以差異表示
+    assert game_service.get_state_update(game_id, 2)["delta"] is None
+    update = game_service.get_state_update(game_id, 4)
+    assert update["version"] == 6
+    assert update["delta"]["base_version"] == 4
+
+
+@pytest.mark.anyio
+async def test_reset_wakes_waiters_and_subscribers(game_service, game_id):
+    class Socket:
+        async def send_text(self, text):
+            pass
+
+    connection = Connection(Socket(), max_queue=8)
+    game_channels.subscribe(game_id, connection)
+    try:
+        waiter = asyncio.create_task(game_service.wait_for_update(game_id, 0, 5))
+        await asyncio.sleep(0.01)
+        game_service.reset_game(game_id)
+
+        assert await asyncio.wait_for(waiter, 1) is True
+        assert '"game_state_update"' in connection.queue.get_nowait()
+    finally:
+        game_channels.unsubscribe(game_id, connection)
+
+
+def test_reset_route(game_service, game_id):
+    client = TestClient(app)
+    etag = client.get(f"/api/v1/games/{game_id}").headers["etag"]
+
+    response = client.post(f"/api/v1/games/{game_id}/reset")
+    assert response.status_code == 200 and response.json()["game_state"]["version"] == 1
+
+    # 版本沒有歸零，舊的 ETag 不會誤判為未變更
+    response = client.get(f"/api/v1/games/{game_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200 and response.headers["etag"] != etag
+    assert client.post("/api/v1/games/nope/reset").status_code == 404
+
+
+@pytest.mark.anyio
+async def test_analysis_is_not_reused_after_reset(game_service, game_id, monkeypatch):
+    monkeypatch.setattr(settings, "hint_time_limit", 0.05)
+    monkeypatch.setattr(settings, "analysis_time_limit", 0.05)
+    analysis_service = AnalysisService(game_service)
+    game = game_service.get_game(game_id)
+    try:
+        before = await analysis_service.win_probability(game_id)
+        await analysis_service.hint(game_id, game.players[game.state.to_move].id)
+        game_service.reset_game(game_id)
+
+        after = await analysis_service.win_probability(game_id)
+        assert after["cached"] is False and after["action_count"] == before["action_count"] == 0
+        hint = await analysis_service.hint(game_id, game.players[game.state.to_move].id)
+        assert hint["tree_reused"] is False
+    finally:
+        shutdown_process_pool()
@@ -0,0 +1,81 @@
+"""回應表：查表結果與搜尋的比較"""
+
+import random
+
+import pytest
+
+from conftest import play_random_move
+
+from app.domain.engine.replay import initial_state
+from app.domain.engine.state import PHASE_RESPOND, iter_bits
+from app.simulation import response_tables
+from app.simulation.mcts import MCTSPolicy, search, state_moves
+from app.simulation.response_tables import (
+    ResponseTables, geisha_sizes, get_response_tables, read_tables, solve_tables, write_tables,
+)
+
+
+def response_positions(layout, count: int):
+    """第一回合中第一個有多種回應選擇的局面"""
+    positions = []
+    for seed in range(count):
+        rng = random.Random(seed)
+        state = initial_state(layout, seed)
+        while state.round_number == 1 and not state.is_finished:
+            if state.phase == PHASE_RESPOND and len(state_moves(state)) > 1:
+                positions.append((seed, state))
+                break
+            play_random_move(state, rng)
+    return positions
+
+
+def offered_geishas(layout, chosen: int):
+    return sorted(layout.card_geisha[card] for card in iter_bits(chosen))
+
+
+def test_round_trip(layout, tmp_path):
+    values = solve_tables(layout)
+    path = str(tmp_path / "tables.bin")
+    write_tables(path, layout, values)
+
+    assert read_tables(path, layout).values == values
+    assert get_response_tables().values == values
+
+
+def test_values_are_antisymmetric(layout):
+    tables = ResponseTables(layout, solve_tables(layout))
+    for geisha, size in enumerate(geisha_sizes(layout)):
+        for mine in range(size + 1):
+            for theirs in range(size + 1 - mine):
+                assert tables.value(geisha, mine, theirs) == -tables.value(geisha, theirs, mine)
+
+
+def test_table_picks_against_search(layout):
+    # 回應表只看單一藝妓，與搜尋的選擇約六成相同 (因此 MCTS 的回應仍以搜尋決定)
+    positions = response_positions(layout, 20)
+    tables = get_response_tables()
+    agree = 0
+    for seed, state in positions:
+        visits = search(state, random.Random(seed), iterations=300)
+        searched = max(visits.items(), key=lambda item: item[1])[0][1]
+        agree += offered_geishas(layout, tables.best_response(state)) == offered_geishas(layout, searched)
+
+    assert len(positions) == 20
+    assert agree >= len(positions) // 2
+
+
+def test_mcts_searches_responses(layout, monkeypatch):
+    def unavailable(*args, **kwargs):
+        raise AssertionError("MCTS 不應查回應表")
+
+    monkeypatch.setattr(response_tables, "get_response_tables", unavailable)
+    policy = MCTSPolicy(iterations=100, use_cache=False)
+    for seed, state in response_positions(layout, 5):
+        action, chosen, _ = policy.best_move(state, random.Random(seed))
+        legal = [offered_geishas(layout, move[1]) for move in state_moves(state)]
+        assert action is None and offered_geishas(layout, chosen) in legal
+
+
+def test_best_response_requires_an_offer(state):
+    with pytest.raises(ValueError):
+        get_response_tables().best_response(state)
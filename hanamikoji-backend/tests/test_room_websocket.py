@@ -0,0 +1,99 @@
+"""房間 WebSocket：配對流程中的加入、離開與遊戲開始事件"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config.settings import settings
+from app.simulation.pool import shutdown_process_pool
+from main import app
+
+
+@pytest.fixture
+def client(offline_mongodb) -> TestClient:
+    return TestClient(app)
+
+
+def join(client, player_id: str, name: str):
+    response = client.post("/api/v1/rooms/join", json={"player_name": name, "player_id": player_id})
+    assert response.status_code == 200
+    return response.json()
+
+
+def room_socket(client, room_id: str, player_id=None):
+    params = f"?player_id={player_id}" if player_id else ""
+    return client.websocket_connect(f"/ws/room/{room_id}{params}")
+
+
+def test_second_player_starts_the_game(client, game_service):
+    room = join(client, "p1", "甲")
+    assert room["status"] == "waiting" and room["game_id"] is None
+
+    with room_socket(client, room["room_id"], "p1") as socket:
+        established = socket.receive_json()
+        assert established["type"] == "connection_established"
+        assert [p["player_id"] for p in established["data"]["room"]["players"]] == ["p1"]
+
+        started_room = join(client, "p2", "乙")
+        joined = socket.receive_json()
+        assert joined["type"] == "player_joined" and joined["data"]["player_id"] == "p2"
+        assert joined["data"]["player_count"] == 2
+
+        started = socket.receive_json()
+        assert started["type"] == "game_started"
+        assert started["data"]["game_id"] == started_room["game_id"]
+        assert [p["player_id"] for p in started["data"]["players"]] == ["p1", "p2"]
+
+    # 房間中的玩家對應到遊戲中各座位的玩家
+    game = game_service.get_game(started["data"]["game_id"])
+    assert [p["game_player_id"] for p in started["data"]["players"]] == [game.player1.id, game.player2.id]
+    current = game_service._serialize(game)["current_player_id"]
+    seated = {p["game_player_id"]: p["player_id"] for p in started["data"]["players"]}
+    assert started["data"]["current_player"] == seated[current]
+
+
+def test_join_twice_is_rejected(client):
+    join(client, "p1", "甲")
+    response = client.post("/api/v1/rooms/join", json={"player_name": "甲", "player_id": "p1"})
+    assert response.status_code == 409
+
+
+def test_leave_over_the_socket(client):
+    room = join(client, "p1", "甲")
+    with room_socket(client, room["room_id"]) as spectator, room_socket(client, room["room_id"], "p1") as player:
+        spectator.receive_json(), player.receive_json()
+
+        player.send_json({"type": "leave_room"})
+        for socket in (spectator, player):
+            left = socket.receive_json()
+            assert left["type"] == "player_left" and left["data"]["room_status"] == "abandoned"
+
+        # 旁觀連線不能離開房間
+        spectator.send_json({"type": "leave_room"})
+        assert spectator.receive_json()["data"]["error_code"] == "UNKNOWN_MESSAGE"
+
+
+@pytest.mark.parametrize("player_id, code", [(None, "ROOM_NOT_FOUND"), ("nope", "PLAYER_NOT_IN_ROOM")])
+def test_rejects_unknown_room_or_player(client, player_id, code):
+    room_id = join(client, "p1", "甲")["room_id"] if player_id else "room_missing"
+    with room_socket(client, room_id, player_id) as socket:
+        assert socket.receive_json()["data"]["error_code"] == code
+
+
+def test_bot_fills_the_room(client, monkeypatch):
+    monkeypatch.setattr(settings, "bot_time_limit", 0.05)
+    room = join(client, "p1", "甲")
+    try:
+        with room_socket(client, room["room_id"], "p1") as socket:
+            socket.receive_json()
+            response = client.post(f"/api/v1/rooms/{room['room_id']}/bot")
+            assert response.status_code == 200 and response.json()["game_id"]
+
+            assert socket.receive_json()["type"] == "player_joined"
+            started = socket.receive_json()
+            assert started["type"] == "game_started"
+            assert [p["is_bot"] for p in started["data"]["players"]] == [False, True]
+
+        # 已開始的房間不能再加入電腦玩家
+        assert client.post(f"/api/v1/rooms/{room['room_id']}/bot").status_code != 200
+    finally:
+        shutdown_process_pool()
@@ -0,0 +1,91 @@
+"""錦標賽：Elo 更新、配對與可重現的排程"""
+
+import io
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from app.domain.engine.state import NO_WINNER
+from app.simulation.tournament import (
+    ELO_K, INITIAL_RATING, EloTable, MatchGame, Tournament, play_match, round_robin_pairs, swiss_pairs,
+)
+
+
+def test_elo_update_is_zero_sum():
+    table = EloTable(["a", "b"])
+    table.record(MatchGame(("a", "b"), 0, 3, 0))
+
+    assert table.ratings["a"].rating == INITIAL_RATING + ELO_K / 2
+    assert table.ratings["b"].rating == INITIAL_RATING - ELO_K / 2
+    assert (table.ratings["a"].wins, table.ratings["b"].losses) == (1, 1)
+
+    # 平手時評分高的一方失分
+    table.record(MatchGame(("b", "a"), NO_WINNER, 3, 0))
+    assert table.ratings["a"].rating < INITIAL_RATING + ELO_K / 2
+    assert table.ratings["a"].rating + table.ratings["b"].rating == pytest.approx(2 * INITIAL_RATING)
+    assert table.ratings["a"].draws == table.ratings["b"].draws == 1
+
+
+def test_margin_narrows_with_more_games():
+    table = EloTable(["a", "b"])
+    table.record(MatchGame(("a", "b"), 0, 3, 0))
+    assert table.margin("a") is None
+
+    margins = []
+    for games in range(20):
+        table.record(MatchGame(("a", "b"), games % 2, 3, 0))
+        margins.append(table.margin("a"))
+    assert margins[-1] < margins[1]
+    # 全勝時仍有有限的區間
+    table = EloTable(["a", "b"])
+    for _ in range(10):
+        table.record(MatchGame(("a", "b"), 0, 3, 0))
+    assert table.margin("a") > 0
+
+
+def test_play_match_swaps_seats_on_the_same_deal():
+    games = play_match(("random", "greedy"), seed=3, games=6)
+
+    assert [game.seats for game in games] == [("random", "greedy"), ("greedy", "random")] * 3
+    for first, second in zip(games[::2], games[1::2]):
+        assert first.seed == second.seed
+    assert len({game.seed for game in games}) == 3
+
+
+def test_pairings():
+    assert round_robin_pairs(["a", "b", "c"]) == [("a", "b"), ("a", "c"), ("b", "c")]
+
+    table = EloTable(["a", "b", "c", "d"])
+    table.record(MatchGame(("a", "b"), 0, 3, 0))
+    table.record(MatchGame(("c", "d"), 0, 3, 0))
+    # 兩位勝者已分別與 b、d 交手，配對時避開重複的對手
+    pairs = swiss_pairs(table, {("a", "b"): 1, ("c", "d"): 1})
+    assert len(pairs) == 2 and {frozenset(pair) for pair in pairs} & {frozenset("ab"), frozenset("cd")} == set()
+
+
+def test_rejects_duplicate_or_unknown_policies():
+    with pytest.raises(ValueError):
+        Tournament(["random", "random"], 2)
+    with pytest.raises(ValueError):
+        Tournament(["random", "nope"], 2)
+
+
+def run_tournament(executor):
+    output = io.StringIO()
+    tournament = Tournament(["random", "greedy", "table"], games_per_pair=4, seed=5, match_size=2, output=output)
+    tournament.round_robin(executor)
+    return tournament, [json.loads(line) for line in output.getvalue().splitlines()]
+
+
+def test_results_depend_only_on_the_seed():
+    serial, lines = run_tournament(None)
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        parallel, parallel_lines = run_tournament(executor)
+
+    assert lines == parallel_lines
+    assert serial.games_played == 12 and sum(serial.met.values()) == 12
+    assert [line["type"] for line in lines] == ["game"] * 12 + ["standings"]
+    standings = lines[-1]["standings"]
+    assert sum(row["games"] for row in standings) == 24
+    assert [row["elo"] for row in standings] == sorted((row["elo"] for row in standings), reverse=True)
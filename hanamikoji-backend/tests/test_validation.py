@@ -0,0 +1,106 @@
+"""動作驗證的錯誤代碼"""
+
+import pytest
+
+from app.domain.engine.state import PHASE_FINISHED, mask_of
+from app.domain.engine.validation import (
+    ActionValidationError, resolve_cards, resolve_split, validate_action, validate_response,
+)
+from app.domain.enums.game_enums import ActionErrorCode, ActionType
+
+
+def error_code(call, *args) -> ActionErrorCode:
+    with pytest.raises(ActionValidationError) as info:
+        call(*args)
+    return info.value.code
+
+
+def test_valid_action_passes(state):
+    validate_action(state, 0, ActionType.COMPETE, mask_of([0, 1, 2, 3]), mask_of([0, 2]), 3)
+
+
+@pytest.mark.parametrize("seat, action, cards, split, target, code", [
+    (1, ActionType.SECRET, 1 << 6, 0, None, ActionErrorCode.NOT_YOUR_TURN),
+    (0, ActionType.GIFT, mask_of([0, 1]), 0, None, ActionErrorCode.WRONG_CARD_COUNT),
+    (0, ActionType.DISCARD, mask_of([0, 6]), 0, None, ActionErrorCode.CARD_NOT_IN_HAND),
+    (0, ActionType.COMPETE, mask_of([0, 1, 2, 3]), mask_of([0, 6]), None, ActionErrorCode.INVALID_GROUPING),
+    (0, ActionType.COMPETE, mask_of([0, 1, 2, 3]), 1 << 0, None, ActionErrorCode.INVALID_GROUPING),
+    (0, ActionType.SECRET, 1 << 0, 0, 99, ActionErrorCode.UNKNOWN_GEISHA),
+])
+def test_action_errors(state, seat, action, cards, split, target, code):
+    assert error_code(validate_action, state, seat, action, cards, split, target) == code
+
+
+def test_action_already_used(state):
+    state.apply_action(ActionType.SECRET, 1 << 0)
+    state.apply_action(ActionType.SECRET, 1 << 6)
+
+    assert error_code(validate_action, state, 0, ActionType.SECRET, 1 << 1) == ActionErrorCode.ACTION_ALREADY_USED
+
+
+def test_game_finished(state):
+    state.phase = PHASE_FINISHED
+
+    assert error_code(validate_action, state, 0, ActionType.SECRET, 1 << 0) == ActionErrorCode.GAME_FINISHED
+
+
+def test_action_while_response_pending(state):
+    state.apply_action(ActionType.GIFT, mask_of([0, 1, 5]))
+
+    assert error_code(validate_action, state, 1, ActionType.SECRET, 1 << 6) == ActionErrorCode.RESPONSE_REQUIRED
+
+
+@pytest.mark.parametrize("seat, action, chosen, code", [
+    (0, ActionType.GIFT, 1 << 0, ActionErrorCode.NOT_YOUR_TURN),
+    (1, ActionType.COMPETE, 1 << 0, ActionErrorCode.RESPONSE_REQUIRED),
+    (1, ActionType.GIFT, mask_of([0, 1]), ActionErrorCode.WRONG_CARD_COUNT),
+    (1, ActionType.GIFT, 1 << 2, ActionErrorCode.INVALID_RESPONSE),
+])
+def test_gift_response_errors(state, seat, action, chosen, code):
+    state.apply_action(ActionType.GIFT, mask_of([0, 1, 5]))
+
+    assert error_code(validate_response, state, seat, action, chosen) == code
+
+
+def test_compete_response_must_pick_a_group(state):
+    state.apply_action(ActionType.COMPETE, mask_of([0, 1, 2, 3]), mask_of([0, 1]))
+
+    validate_response(state, 1, ActionType.COMPETE, mask_of([2, 3]))
+    code = error_code(validate_response, state, 1, ActionType.COMPETE, mask_of([0, 2]))
+    assert code == ActionErrorCode.INVALID_RESPONSE
+
+
+def test_response_without_offer(state):
+    assert error_code(validate_response, state, 0, ActionType.GIFT, 1 << 0) == ActionErrorCode.RESPONSE_REQUIRED
+
+
+@pytest.mark.parametrize("card_ids, code", [
+    (["card_0", "card_99"], ActionErrorCode.UNKNOWN_CARD),
+    (["card_0", "card_0"], ActionErrorCode.DUPLICATE_CARD),
+])
+def test_resolve_cards_errors(layout, card_ids, code):
+    assert error_code(resolve_cards, layout, card_ids) == code
+
+
+def test_resolve_cards(layout):
+    assert resolve_cards(layout, ["card_3", "card_0"]) == mask_of([0, 3])
+
+
+@pytest.mark.parametrize("groupings", [
+    None,
+    [["card_0", "card_1"]],
+    [["card_0", "card_1"], ["card_1", "card_2"]],
+    [["card_0", "card_1"], ["card_2", "card_4"]],
+    [["card_0"], ["card_1", "card_2", "card_3"]],
+])
+def test_resolve_split_errors(layout, groupings):
+    cards = mask_of([0, 1, 2, 3])
+
+    assert error_code(resolve_split, layout, cards, groupings) == ActionErrorCode.INVALID_GROUPING
+
+
+def test_error_dict(state):
+    with pytest.raises(ActionValidationError) as info:
+        validate_action(state, 1, ActionType.SECRET, 1 << 6)
+
+    assert info.value.to_dict() == {"error": "NOT_YOUR_TURN", "message": "不是當前玩家的回合"}
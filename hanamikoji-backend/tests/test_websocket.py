@@ -0,0 +1,148 @@
+"""遊戲 WebSocket：訂閱推送、連線上的動作與慢速連線的處理"""
+
+import asyncio
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+
+from conftest import play_random_action, random_request
+
+from app.services.channels import ChannelHub, Connection, make_message
+from main import app
+
+
+@pytest.fixture
+def client() -> TestClient:
+    return TestClient(app)
+
+
+def connect(client, game_id: str, player_id=None):
+    params = f"?player_id={player_id}" if player_id else ""
+    return client.websocket_connect(f"/ws/game/{game_id}{params}")
+
+
+def test_connect_sends_the_full_state(client, game_service, game_id):
+    with connect(client, game_id) as socket:
+        established = socket.receive_json()
+        assert established["type"] == "connection_established" and established["data"]["player_id"] is None
+        update = socket.receive_json()
+        assert update["type"] == "game_state_update" and update["data"]["game_id"] == game_id
+
+        socket.send_json({"type": "ping"})
+        assert socket.receive_json()["type"] == "pong"
+        socket.send_text("not json")
+        assert socket.receive_json()["data"]["error_code"] == "INVALID_MESSAGE"
+        socket.send_json({"type": "nope"})
+        assert socket.receive_json()["data"]["error_code"] == "UNKNOWN_MESSAGE"
+
+
+@pytest.mark.parametrize("path, code", [
+    ("/ws/game/nope", "GAME_NOT_FOUND"),
+    ("/ws/game/{game_id}?player_id=nope", "UNKNOWN_PLAYER"),
+])
+def test_rejects_unknown_game_or_player(client, game_id, path, code):
+    with client.websocket_connect(path.format(game_id=game_id)) as socket:
+        assert socket.receive_json()["data"]["error_code"] == code
+
+
+def test_action_is_pushed_to_every_subscriber(client, game_service, game_id):
+    full = game_service._serialize(game_service.get_game(game_id))
+    request = random_request(full, random.Random(0))
+    with connect(client, game_id, request.player_id) as player, connect(client, game_id) as spectator:
+        for socket in (player, spectator):
+            socket.receive_json(), socket.receive_json()
+
+        data = request.model_dump(mode="json", exclude={"player_id"}, exclude_none=True)
+        player.send_json({"type": "player_action", "data": data})
+        for socket in (player, spectator):
+            message = socket.receive_json()
+            assert message["type"] == "game_state_delta" and message["from"] == request.player_id
+            assert message["data"]["version"] == 1
+            assert message["data"]["last_action"]["action_type"] == request.action_type.value
+
+        # 動作不合法時只回覆送出者
+        player.send_json({"type": "player_action", "data": data})
+        assert player.receive_json()["type"] == "error"
+
+        spectator.send_json({"type": "player_action", "data": data})
+        assert spectator.receive_json()["data"]["error_code"] == "SPECTATOR"
+
+
+def test_sync_sends_missed_versions(client, game_service, game_id):
+    rng = random.Random(1)
+    with connect(client, game_id) as socket:
+        socket.receive_json(), socket.receive_json()
+        for _ in range(3):
+            play_random_action(game_service, game_id, rng)
+            socket.receive_json()
+
+        socket.send_json({"type": "sync", "data": {"since": 1}})
+        message = socket.receive_json()
+        assert message["type"] == "game_state_delta" and message["data"]["version"] == 3
+        socket.send_json({"type": "sync", "data": {}})
+        assert socket.receive_json()["type"] == "game_state_update"
+
+
+class SlowSocket:
+    """送出時卡住直到放行的 WebSocket"""
+
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.sent = []
+        self.closed = None
+
+    async def send_text(self, text: str) -> None:
+        await self.release.wait()
+        self.sent.append(text)
+
+    async def close(self, code: int) -> None:
+        self.closed = code
+
+
+@pytest.mark.anyio
+async def test_slow_connection_is_closed():
+    hub = ChannelHub()
+    slow, fast = SlowSocket(), SlowSocket()
+    fast.release.set()
+    connections = [Connection(slow, "slow", max_queue=2), Connection(fast, "fast", max_queue=2)]
+    for connection in connections:
+        connection.start()
+        hub.subscribe("game", connection)
+
+    delivered = []
+    for n in range(4):
+        await asyncio.sleep(0)
+        delivered.append(hub.publish("game", make_message("tick", {"n": n})))
+    await asyncio.sleep(0.01)
+
+    # 慢速連線手上一則、佇列兩則，第四則溢出後被移出頻道並以 1013 關閉
+    assert delivered == [2, 2, 2, 1]
+    assert slow.closed == 1013 and connections[0].overflowed
+    assert hub.subscriber_count("game") == 1 and len(fast.sent) == 4
+    for connection in connections:
+        await connection.close()
+
+
+def test_overflow_outside_the_event_loop():
+    # 同步執行的電腦玩家回合沒有執行中的事件迴圈，溢出時不能拋出例外
+    connection = Connection(SlowSocket(), "p1", max_queue=1)
+    assert connection.send("a") is True
+    assert connection.send("b") is False
+    assert connection.overflowed and connection.send("c") is False
+
+
+def test_overflow_from_another_thread_closes_on_the_writer_loop():
+    async def scenario():
+        socket = SlowSocket()
+        connection = Connection(socket, "p1", max_queue=1)
+        connection.start()
+        await asyncio.sleep(0)
+        loop = asyncio.get_running_loop()
+        sent = await loop.run_in_executor(None, lambda: [connection.send(text) for text in "abc"])
+        await asyncio.sleep(0.01)
+        return sent, socket.closed
+
+    sent, closed = asyncio.run(scenario())
+    assert sent[0] is True and sent[-1] is False
+    assert closed == 1013
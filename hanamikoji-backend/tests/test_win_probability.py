@@ -0,0 +1,80 @@
+"""勝率估計：旁觀者確定化、模擬與結果快取"""
+
+import asyncio
+import random
+
+import pytest
+
+from conftest import play_random_action, play_random_move
+
+from app.config.settings import settings
+from app.domain.engine.replay import initial_state
+from app.services.analysis_service import AnalysisService
+from app.simulation.pool import shutdown_process_pool
+from app.simulation.win_probability import determinize_public, estimate_wins
+
+
+def test_determinize_public_keeps_public_cards(layout):
+    rng = random.Random(0)
+    state = initial_state(layout, 0)
+    for _ in range(9):
+        play_random_move(state, rng)
+
+    sample = determinize_public(state, random.Random(1))
+
+    assert sample.allocated == state.allocated
+    assert sample.pending_offer == state.pending_offer
+    for zone in ("hands", "secrets", "discards"):
+        assert [m.bit_count() for m in getattr(sample, zone)] == [m.bit_count() for m in getattr(state, zone)]
+    zones = [*sample.hands, *sample.secrets, *sample.discards, *sample.allocated,
+             sample.pending_offer, sample.deck_mask(), sample.removed]
+    assert sum(zones) == layout.full_mask
+
+
+def test_estimate_wins_is_reproducible(state):
+    result = estimate_wins(state, 7, time_limit=5, max_rollouts=50)
+
+    assert result[0] == 50
+    assert result[1] + result[2] <= 50
+    assert estimate_wins(state, 7, time_limit=5, max_rollouts=50) == result
+
+
+def test_finished_game_is_certain(layout):
+    rng = random.Random(2)
+    state = initial_state(layout, 2)
+    while not state.is_finished:
+        play_random_move(state, rng)
+
+    rollouts, wins0, wins1 = estimate_wins(state, 0, time_limit=1)
+    assert rollouts == 1 and [wins0, wins1][state.winner] == 1
+
+
+@pytest.fixture
+def analysis_service(game_service, monkeypatch):
+    monkeypatch.setattr(settings, "analysis_time_limit", 0.05)
+    yield AnalysisService(game_service)
+    shutdown_process_pool()
+
+
+@pytest.mark.anyio
+async def test_result_is_cached_per_action_count(analysis_service, game_service, game_id):
+    first, second = await asyncio.gather(
+        analysis_service.win_probability(game_id), analysis_service.win_probability(game_id)
+    )
+
+    # 同時的請求共用同一次計算
+    assert [first["cached"], second["cached"]] == [False, True]
+    assert first["rollouts"] == second["rollouts"] > 0
+    probabilities = [player["win_probability"] for player in first["players"]]
+    assert sum(probabilities) + first["draw_probability"] == pytest.approx(1, abs=1e-3)
+    assert (await analysis_service.win_probability(game_id))["cached"] is True
+
+    play_random_action(game_service, game_id, random.Random(0))
+    result = await analysis_service.win_probability(game_id)
+    assert result["cached"] is False and result["action_count"] == 1
+
+
+@pytest.mark.anyio
+async def test_missing_game(analysis_service):
+    with pytest.raises(ValueError):
+        await analysis_service.win_probability("nope")